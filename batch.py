@@ -0,0 +1,286 @@
+"""
+Processamento em lote, sem interface gráfica, de gravações de profundidade.
+
+Distribui os frames entre processos (ordem dos resultados preservada) e grava
+perfis, normais e estatísticas de qualidade em arquivos. Com --acoustic, os
+arquivos de entrada são sinais do piezo pontuados contra um modelo de
+referência (sound.anomaly).
+
+Exemplos:
+    python batch.py capturas/2025-06-10/*.npy -o resultados/
+    python batch.py --synthetic 300 -o resultados/ --workers 8
+    python batch.py capturas/varredura.npy --poses capturas/poses.npy -o resultados/
+    python batch.py --acoustic piezo/*.npy --baseline modelo.npz --sample-rate 8000 -o resultados/
+"""
+import argparse
+import csv
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+
+from vision.depth_stream import filter_depth_range, analyze_depth_quality
+from vision.normals import compute_profile_normals
+from vision.frame_context import DepthFrameContext
+from vision.fusion import TSDFVolume, default_intrinsics
+from vision.simulate_stream import simulated_depth_frame
+from sound.anomaly import BaselineModel, score_signal
+
+QUALITY_FIELDS = ['frame', 'source', 'profile_ok', 'valid_points', 'close_points',
+                  'validity_ratio', 'close_ratio', 'mean_depth', 'depth_std', 'seconds']
+ACOUSTIC_FIELDS = ['source', 'signal', 'window', 'rr', 'det', 'entropy', 'anomaly_score', 'passed']
+
+
+def list_recorded_frames(paths):
+    """
+    Lista os frames de arquivos .npy (um frame HxW ou uma sequência NxHxW).
+    Diretórios são expandidos para os .npy que contêm.
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "*.npy"))))
+        else:
+            files.extend(sorted(glob.glob(path)) or [path])
+
+    tasks = []
+    for file_path in files:
+        # mmap: só lê o cabeçalho aqui, os dados são lidos pelos workers
+        data = np.load(file_path, mmap_mode='r')
+        if data.ndim == 2:
+            tasks.append(('npy', file_path, None))
+        elif data.ndim == 3:
+            tasks.extend(('npy', file_path, i) for i in range(data.shape[0]))
+        else:
+            print(f"[WARNING] Formato não suportado em {file_path}: {data.shape}")
+    return tasks
+
+
+def list_synthetic_frames(count):
+    return [('synthetic', None, i) for i in range(count)]
+
+
+def load_frame(task):
+    kind, path, index = task
+    if kind == 'synthetic':
+        # superfície próxima, dentro da faixa útil do filtro
+        return simulated_depth_frame(index, base=300, amplitude=80)
+    data = np.load(path, mmap_mode='r')
+    frame = data if index is None else data[index]
+    return np.asarray(frame, dtype=np.uint16)
+
+
+def process_frame(task, keep_depth=False):
+    """
+    Executa o pipeline de visão em um frame; roda dentro dos processos do pool
+    """
+    start = time.perf_counter()
+    depth_frame = DepthFrameContext(filter_depth_range(load_frame(task)))
+    analysis = compute_profile_normals(depth_frame)
+    quality = analyze_depth_quality(depth_frame)
+    return {
+        'analysis': analysis,
+        'quality': quality,
+        'width': depth_frame.shape[1],
+        'depth': depth_frame.raw if keep_depth else None,
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def run_batch(tasks, output_dir, workers=None, chunksize=4, poses=None):
+    """
+    Processa os frames em paralelo e grava profiles.npy, normals.npy e quality.csv.
+    Frames sem perfil válido ficam com NaN nos arrays.
+    Com poses (N, 4, 4), os frames também são fundidos em ordem num volume TSDF
+    e a superfície resultante é gravada em surface.npz.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    n_frames = len(tasks)
+    profiles = normals = None
+    volume = TSDFVolume() if poses is not None else None
+    worker = partial(process_frame, keep_depth=volume is not None)
+    start = time.perf_counter()
+
+    csv_path = os.path.join(output_dir, "quality.csv")
+    with open(csv_path, "w", newline="") as csv_file, \
+            ProcessPoolExecutor(max_workers=workers) as executor:
+        writer = csv.DictWriter(csv_file, fieldnames=QUALITY_FIELDS)
+        writer.writeheader()
+
+        # map preserva a ordem dos frames mesmo com vários processos
+        for i, (task, result) in enumerate(zip(tasks, executor.map(worker, tasks, chunksize=chunksize))):
+            if profiles is None:
+                width = result['width']
+                profiles = np.lib.format.open_memmap(
+                    os.path.join(output_dir, "profiles.npy"), mode='w+',
+                    dtype=np.float32, shape=(n_frames, width))
+                normals = np.lib.format.open_memmap(
+                    os.path.join(output_dir, "normals.npy"), mode='w+',
+                    dtype=np.float32, shape=(n_frames, width, 2))
+
+            analysis = result['analysis']
+            if analysis is not None:
+                profiles[i] = analysis['profile']
+                normals[i] = analysis['normals']
+            else:
+                profiles[i] = np.nan
+                normals[i] = np.nan
+
+            if volume is not None:
+                depth = result['depth']
+                volume.integrate(depth, default_intrinsics(depth.shape[1], depth.shape[0]), poses[i])
+
+            quality = result['quality']
+            writer.writerow({
+                'frame': i,
+                'source': task[1] or 'synthetic',
+                'profile_ok': analysis is not None,
+                'valid_points': quality['valid_points'],
+                'close_points': quality['close_points'],
+                'validity_ratio': f"{quality['validity_ratio']:.4f}",
+                'close_ratio': f"{quality['close_ratio']:.4f}",
+                'mean_depth': f"{quality['mean_depth']:.2f}",
+                'depth_std': f"{quality['depth_std']:.2f}",
+                'seconds': f"{result['seconds']:.4f}",
+            })
+
+    if profiles is not None:
+        profiles.flush()
+        normals.flush()
+
+    if volume is not None:
+        surface = volume.extract_surface()
+        np.savez_compressed(os.path.join(output_dir, "surface.npz"), **surface)
+        print(f"[INFO] Superfície fundida: {len(surface['points'])} pontos, "
+              f"{len(volume)} voxels ({volume.memory_bytes / 1e6:.1f} MB)")
+
+    elapsed = time.perf_counter() - start
+    fps = n_frames / elapsed if elapsed > 0 else 0.0
+    print(f"[INFO] {n_frames} frames processados em {elapsed:.1f} s ({fps:.1f} frames/s)")
+    print(f"[INFO] Resultados gravados em {output_dir}")
+
+
+def list_acoustic_signals(paths):
+    """
+    Lista os sinais do piezo em arquivos .npy (um sinal 1D ou N sinais NxM)
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "*.npy"))))
+        else:
+            files.extend(sorted(glob.glob(path)) or [path])
+
+    tasks = []
+    for file_path in files:
+        data = np.load(file_path, mmap_mode='r')
+        if data.ndim == 1:
+            tasks.append((file_path, None))
+        elif data.ndim == 2:
+            tasks.extend((file_path, i) for i in range(data.shape[0]))
+        else:
+            print(f"[WARNING] Formato não suportado em {file_path}: {data.shape}")
+    return tasks
+
+
+def score_acoustic_signal(task, baseline_path, sample_rate, window_size=1024):
+    """
+    Pontua as janelas de um sinal; roda dentro dos processos do pool
+    """
+    path, index = task
+    data = np.load(path, mmap_mode='r')
+    signal = np.asarray(data if index is None else data[index], dtype=np.float32)
+    result = score_signal(signal, BaselineModel.load(baseline_path), sample_rate, window_size)
+    return {'metrics': result['metrics'], 'passed': result['passed']}
+
+
+def run_acoustic_batch(tasks, output_dir, baseline_path, sample_rate, window_size=1024, workers=None):
+    """
+    Pontua os sinais do piezo em paralelo e grava acoustic.csv, uma linha por janela
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    worker = partial(score_acoustic_signal, baseline_path=baseline_path,
+                     sample_rate=sample_rate, window_size=window_size)
+    start = time.perf_counter()
+    windows = rejected = 0
+
+    csv_path = os.path.join(output_dir, "acoustic.csv")
+    with open(csv_path, "w", newline="") as csv_file, \
+            ProcessPoolExecutor(max_workers=workers) as executor:
+        writer = csv.DictWriter(csv_file, fieldnames=ACOUSTIC_FIELDS)
+        writer.writeheader()
+
+        for (path, index), result in zip(tasks, executor.map(worker, tasks)):
+            for window, (metrics, passed) in enumerate(zip(result['metrics'], result['passed'])):
+                writer.writerow({
+                    'source': path,
+                    'signal': 0 if index is None else index,
+                    'window': window,
+                    'rr': f"{metrics['rr']:.4f}",
+                    'det': f"{metrics['det']:.4f}",
+                    'entropy': f"{metrics['entropy']:.4f}",
+                    'anomaly_score': f"{metrics['anomaly_score']:.4f}",
+                    'passed': bool(passed),
+                })
+            windows += len(result['metrics'])
+            rejected += int((~result['passed']).sum())
+
+    elapsed = time.perf_counter() - start
+    print(f"[INFO] {len(tasks)} sinais ({windows} janelas) pontuados em {elapsed:.1f} s, "
+          f"{rejected} janelas fora do modelo")
+    print(f"[INFO] Resultados gravados em {csv_path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Processamento em lote do pipeline de visão RAISE")
+    parser.add_argument("inputs", nargs="*", help="arquivos .npy de profundidade ou diretórios")
+    parser.add_argument("-o", "--output", required=True, help="diretório de saída")
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="processa N frames sintéticos em vez de gravações")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="número de processos (padrão: todos os núcleos)")
+    parser.add_argument("--chunksize", type=int, default=4)
+    parser.add_argument("--poses", help="arquivo .npy (N, 4, 4) com as poses câmera->mundo para fusão")
+    parser.add_argument("--acoustic", action="store_true",
+                        help="as entradas são sinais do piezo (.npy) a pontuar contra --baseline")
+    parser.add_argument("--baseline", help="modelo de referência acústico (.npz de BaselineModel.save)")
+    parser.add_argument("--sample-rate", type=float, help="taxa de amostragem do piezo (Hz)")
+    parser.add_argument("--window-size", type=int, default=1024, help="amostras por janela acústica")
+    args = parser.parse_args(argv)
+
+    if args.acoustic:
+        if not args.inputs or not args.baseline or not args.sample_rate:
+            parser.error("--acoustic requer arquivos de entrada, --baseline e --sample-rate")
+        tasks = list_acoustic_signals(args.inputs)
+        if not tasks:
+            print("[WARNING] Nenhum sinal encontrado")
+            return
+        run_acoustic_batch(tasks, args.output, args.baseline, args.sample_rate,
+                           window_size=args.window_size, workers=args.workers)
+        return
+
+    if args.synthetic > 0:
+        tasks = list_synthetic_frames(args.synthetic)
+    elif args.inputs:
+        tasks = list_recorded_frames(args.inputs)
+    else:
+        parser.error("informe arquivos de entrada ou --synthetic N")
+
+    if not tasks:
+        print("[WARNING] Nenhum frame encontrado")
+        return
+
+    poses = None
+    if args.poses:
+        poses = np.load(args.poses)
+        if poses.shape != (len(tasks), 4, 4):
+            parser.error(f"--poses deve ter formato ({len(tasks)}, 4, 4), recebido {poses.shape}")
+
+    run_batch(tasks, args.output, workers=args.workers, chunksize=args.chunksize, poses=poses)
+
+
+if __name__ == "__main__":
+    main()
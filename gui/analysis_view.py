@@ -0,0 +1,96 @@
+"""
+Janela da análise detalhada de profundidade (sob demanda ou periódica)
+"""
+import tkinter as tk
+
+import customtkinter as ctk
+
+from gui.analysis_worker import EnhancedAnalysisWorker
+from vision.acquisition import META_LINE_Y
+from utils.conversions import get_display_surface
+
+VIEW_SIZE = (720, 480)
+
+
+class EnhancedAnalysisWindow(ctk.CTkToplevel):
+    """
+    Mostra a figura 2x2 do render_enhanced_depth_analysis, calculada pelo
+    EnhancedAnalysisWorker sobre o último frame exibido pelo stream ao vivo.
+    """
+
+    def __init__(self, gui, period_ms=2000):
+        super().__init__(gui)
+        self.gui = gui
+        self.period_ms = period_ms
+        self.title("Análise Detalhada de Profundidade")
+        self._closed = False
+        self.worker = EnhancedAnalysisWorker(on_result=self._on_result)
+        self._periodic_job = None
+
+        self.image_label = ctk.CTkLabel(self, text="(Análise ainda não calculada)", text_color="gray",
+                                        width=VIEW_SIZE[0], height=VIEW_SIZE[1])
+        self.image_label.grid(row=0, column=0, columnspan=3, padx=10, pady=10)
+
+        self.refresh_button = ctk.CTkButton(self, text="Atualizar", command=self.request_analysis)
+        self.refresh_button.grid(row=1, column=0, padx=10, pady=(0, 10))
+
+        self.periodic_switch = ctk.CTkSwitch(
+            self, text=f"Atualizar a cada {period_ms / 1000:.0f} s", command=self._toggle_periodic)
+        self.periodic_switch.grid(row=1, column=1, padx=10, pady=(0, 10))
+
+        self.status_label = ctk.CTkLabel(self, text="", text_color="gray")
+        self.status_label.grid(row=1, column=2, padx=10, pady=(0, 10))
+
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        self.request_analysis()
+
+    def request_analysis(self):
+        last_depth = getattr(self.gui, 'last_depth', None)
+        if last_depth is None:
+            self.status_label.configure(text="Nenhum frame de profundidade disponível")
+            return
+        depth_frame, meta = last_depth
+        # mesma linha do perfil exibido; o stream simulado não tem metadados
+        line_y = int(meta[META_LINE_Y]) if meta is not None and meta[META_LINE_Y] >= 0 else 240
+        self.worker.request(depth_frame, line_y=min(line_y, depth_frame.shape[0] - 1),
+                            min_depth=self.gui.min_depth, max_depth=self.gui.max_depth)
+        self.status_label.configure(text="Calculando...")
+
+    def _toggle_periodic(self):
+        if self.periodic_switch.get():
+            self._periodic_tick()
+        elif self._periodic_job is not None:
+            self.after_cancel(self._periodic_job)
+            self._periodic_job = None
+
+    def _periodic_tick(self):
+        # sem acumular pedidos: o próximo só sai quando o anterior terminou
+        if not self.worker.busy:
+            self.request_analysis()
+        self._periodic_job = self.after(self.period_ms, self._periodic_tick)
+
+    def _on_result(self, image, render_ms, request_id):
+        # chamado na thread do executor: a janela pode ter sido fechada
+        if self._closed:
+            return
+        try:
+            self.after(0, lambda: self._show(image, render_ms, request_id))
+        except (tk.TclError, RuntimeError):
+            pass
+
+    def _show(self, image, render_ms, request_id):
+        if self._closed or not self.winfo_exists():
+            return
+        get_display_surface(self.image_label, VIEW_SIZE).update(image, order="rgba")
+        self.status_label.configure(
+            text=f"Pedido {request_id}: {render_ms:.0f} ms de renderização, "
+                 f"{self.worker.superseded} superado(s)")
+
+    def close(self):
+        self._closed = True
+        if self._periodic_job is not None:
+            self.after_cancel(self._periodic_job)
+            self._periodic_job = None
+        self.worker.close()
+        self.gui.analysis_window = None
+        self.destroy()
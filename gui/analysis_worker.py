@@ -0,0 +1,99 @@
+"""
+Análise detalhada de profundidade renderizada em um processo separado
+"""
+import multiprocessing as mp
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+def _render_enhanced_analysis(depth_frame, line_y, min_depth, max_depth):
+    from gui.plot_utils import enhanced_depth_analysis_image
+
+    start = time.perf_counter()
+    image = enhanced_depth_analysis_image(depth_frame, line_y, min_depth, max_depth)
+    return image, (time.perf_counter() - start) * 1000
+
+
+class EnhancedAnalysisWorker:
+    """
+    Renderiza a figura da análise detalhada em um processo dedicado, a
+    partir de uma cópia do frame: a interface nunca espera pelo matplotlib.
+
+    Há no máximo um pedido em execução e um pendente. Um pedido novo
+    substitui o pendente (que nem chega a rodar), e o resultado de um pedido
+    que terminou depois de ser superado é descartado. on_result(image,
+    render_ms, request_id) é chamado na thread do executor.
+    """
+
+    def __init__(self, on_result):
+        self.on_result = on_result
+        self._executor = ProcessPoolExecutor(max_workers=1, mp_context=mp.get_context("spawn"))
+        self._lock = threading.Lock()
+        self._running = None
+        self._pending = None
+        self._request_id = 0
+        self.completed = 0
+        self.superseded = 0
+        self.last_render_ms = 0.0
+
+    def request(self, depth_frame, line_y=240, min_depth=None, max_depth=None):
+        """
+        Pede uma nova renderização e retorna o id do pedido
+        """
+        from vision.quality import DEPTH_MIN, DEPTH_MAX
+
+        job = (np.array(depth_frame), line_y,
+               DEPTH_MIN if min_depth is None else min_depth,
+               DEPTH_MAX if max_depth is None else max_depth)
+        with self._lock:
+            self._request_id += 1
+            if self._pending is not None:
+                self.superseded += 1
+            self._pending = (self._request_id, job)
+            if self._running is None:
+                self._submit_pending()
+            return self._request_id
+
+    @property
+    def busy(self):
+        with self._lock:
+            return self._running is not None
+
+    def _submit_pending(self):
+        request_id, job = self._pending
+        self._pending = None
+        try:
+            future = self._executor.submit(_render_enhanced_analysis, *job)
+        except RuntimeError as e:
+            # processo morto (BrokenProcessPool) ou executor já encerrado
+            print(f"[WARNING] Análise detalhada indisponível: {e}")
+            return
+        self._running = request_id
+        future.add_done_callback(lambda f: self._finished(request_id, f))
+
+    def _finished(self, request_id, future):
+        with self._lock:
+            self._running = None
+            superseded = self._pending is not None
+            if superseded:
+                self.superseded += 1
+                self._submit_pending()
+
+        if superseded or future.cancelled():
+            return
+        try:
+            image, render_ms = future.result()
+        except Exception as e:
+            print(f"[WARNING] Erro na análise detalhada: {e}")
+            return
+        self.completed += 1
+        self.last_render_ms = render_ms
+        self.on_result(image, render_ms, request_id)
+
+    def close(self):
+        with self._lock:
+            self._pending = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
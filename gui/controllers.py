@@ -6,20 +6,165 @@ import os
 sys.path.append(os.path.abspath(".."))
 
 import threading
-from vision.camera_stream import start_camera_stream
-from vision.simulate_stream import start_simulated_stream
+from utils.startup import lazy_import, load_vision_backend, mark_milestone, print_startup_report
+
+# um único banco (e sessão) por interface, mesmo com várias capturas em paralelo
+_database_lock = threading.Lock()
 
 
 def start_debug_mode(gui):
     print("Modo debug (simulado)")
-    threading.Thread(target=lambda: start_simulated_stream(
-        gui), daemon=True).start()
+    threading.Thread(target=lambda: _run_simulated_stream(gui),
+                     daemon=True).start()
 
 def start_system(gui):
     print("Sistema iniciado")
-    threading.Thread(target=lambda: start_camera_stream(gui),
+    threading.Thread(target=lambda: _run_camera_stream(gui),
                      daemon=True).start()
 
+
+def preload_camera_pipeline(gui):
+    """
+    Carrega as dependências da câmera e inicia o processo de aquisição em
+    standby (pipeline pré-criado, dispositivo ainda fechado).
+    Deve ser chamado apenas depois que a janela já está respondendo.
+    """
+    def worker():
+        load_vision_backend()
+        try:
+            camera_stream = lazy_import("vision.camera_stream")
+            devices = camera_stream.prepare_acquisition(gui)
+            print(f"[INFO] {len(devices)} processo(s) de aquisição pronto(s) em standby")
+        except Exception as e:
+            print(f"[WARNING] Falha ao preparar aquisição: {e}")
+        mark_milestone("backend de visão carregado")
+        print_startup_report()
+        gui.after(0, lambda: gui.set_status("Pronto"))
+
+    threading.Thread(target=worker, daemon=True).start()
+
+
+def _run_camera_stream(gui):
+    camera_stream = lazy_import("vision.camera_stream")
+    camera_stream.start_camera_stream(gui)
+
+
+def _run_simulated_stream(gui):
+    simulate_stream = lazy_import("vision.simulate_stream")
+    simulate_stream.start_simulated_stream(gui)
+
+
+def request_surface_analysis(gui):
+    governor = getattr(gui, 'governor', None)
+    if governor is None:
+        print("[AVISO] Nenhum stream ativo para analisar")
+        return
+    governor.request("surface")
+
+
+def open_enhanced_analysis(gui):
+    """
+    Abre (ou traz para frente) a janela da análise detalhada, calculada em
+    um processo separado sobre o último frame
+    """
+    window = getattr(gui, 'analysis_window', None)
+    if window is not None:
+        window.lift()
+        window.request_analysis()
+        return
+    analysis_view = lazy_import("gui.analysis_view")
+    gui.analysis_window = analysis_view.EnhancedAnalysisWindow(gui)
+
+
+def toggle_surface_scan(gui):
+    gui.surface_scan_mode = bool(gui.surface_scan_switch.get())
+
+
+def set_scan_cursor(gui, value):
+    gui.scan_cursor_row = int(value)
+    gui.cursor_label.configure(text=f"Linha do cursor: {gui.scan_cursor_row}")
+
+
+def select_device(gui, device_id):
+    devices = getattr(gui, 'devices', None)
+    if devices is not None and device_id in devices.acquisitions:
+        devices.select(device_id)
+
+
+def save_capture(gui):
+    devices = getattr(gui, 'devices', None)
+    if devices is None or devices.current.state != "running":
+        print("[AVISO] Nenhuma câmera ativa para capturar")
+        return
+    # disco e banco fora da thread da interface
+    threading.Thread(target=lambda: _save_capture(gui, devices), daemon=True).start()
+
+
+def _inspection_session(gui, captures):
+    """
+    Banco e sessão da interface, abertos uma única vez; as threads de
+    captura compartilham o mesmo escritor
+    """
+    with _database_lock:
+        if getattr(gui, 'inspection_db', None) is None:
+            database = captures.open_inspection_database()
+            gui.inspection_session = database.start_session()
+            gui.inspection_db = database
+        return gui.inspection_db, gui.inspection_session
+
+
+def _save_capture(gui, devices):
+    captures = lazy_import("storage.captures")
+    try:
+        database, session_id = _inspection_session(gui, captures)
+        rgb_frame, depth_frame, meta = devices.current.snapshot()
+        point_id = captures.record_capture(
+            database, session_id, rgb_frame, depth_frame, meta,
+            device_id=devices.selected, surface_analysis=getattr(gui, 'surface_analysis', None))
+        print(f"[INFO] Captura salva (ponto {point_id}, sessão {session_id})")
+        gui.after(0, lambda: gui.set_status(f"Captura salva: ponto {point_id}"))
+    except Exception as e:
+        print(f"[ERROR] Falha ao salvar captura: {e}")
+
+
+def toggle_telemetry(gui):
+    """
+    Liga/desliga o servidor de telemetria alimentado pelo loop da câmera.
+    Ouve em gui.telemetry_host (padrão: só a máquina local)
+    """
+    server = getattr(gui, 'telemetry', None)
+    if server is not None:
+        gui.telemetry = None
+        server.close()
+        print("[INFO] Servidor de telemetria encerrado")
+        return
+    telemetry_server = lazy_import("telemetry.server")
+    try:
+        host = getattr(gui, 'telemetry_host', None) or telemetry_server.DEFAULT_HOST
+        gui.telemetry = telemetry_server.TelemetryServer(host=host).start()
+    except OSError as e:
+        print(f"[ERROR] Não foi possível iniciar o servidor de telemetria: {e}")
+
+
+def shutdown(gui):
+    server = getattr(gui, 'telemetry', None)
+    if server is not None:
+        gui.telemetry = None
+        server.close()
+    window = getattr(gui, 'analysis_window', None)
+    if window is not None:
+        window.close()
+    camera_stream = sys.modules.get("vision.camera_stream")
+    if camera_stream is not None:
+        camera_stream.cleanup_camera_stream(gui)
+    with _database_lock:
+        database = getattr(gui, 'inspection_db', None)
+        gui.inspection_db = None
+    if database is not None:
+        database.end_session(gui.inspection_session)
+        database.close()
+    gui.destroy()
+
+
 def reset_robot(gui): pass
-def save_capture(gui): pass
 def toggle_debug(gui): pass
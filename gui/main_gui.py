@@ -8,8 +8,11 @@ import customtkinter as ctk
 import tkinter as tk
 from tkinter import *
 from gui.layout import create_section
-from gui.widgets import create_depth_slider
-from gui.controllers import start_system, save_capture, start_debug_mode, reset_robot
+from gui.widgets import create_depth_slider, create_row_slider, set_row_slider_range
+from gui.controllers import (start_system, save_capture, start_debug_mode, reset_robot,
+                             preload_camera_pipeline, request_surface_analysis,
+                             toggle_surface_scan, set_scan_cursor, select_device, toggle_telemetry,
+                             open_enhanced_analysis, shutdown)
 from gui.assets import README_URL, ABOUT_TEXT, TITLE
 
 
@@ -36,8 +39,9 @@ class RaiseGui(ctk.CTk):
         self.grid_columnconfigure((0, 1, 2), weight=1)
         self.grid_rowconfigure((0, 1, 2), weight=1)
         
+        # faixa de trabalho; atualizada pelo monitor de qualidade durante o stream
         self.min_depth = 100 # mm
-        self.max_depth = 1000 # mm
+        self.max_depth = 430 # mm
         
         # scroller
         container = ctk.CTkFrame(self)
@@ -60,9 +64,17 @@ class RaiseGui(ctk.CTk):
         self.config(menu=self.menu_bar)
 
         file_menu = Menu(self.menu_bar, tearoff=0)
-        file_menu.add_command(label="Exit", command=self.quit)
+        file_menu.add_command(label="Exit", command=lambda: shutdown(self))
         self.menu_bar.add_cascade(label="File", menu=file_menu)
 
+        analysis_menu = Menu(self.menu_bar, tearoff=0)
+        analysis_menu.add_command(label="Análise detalhada", command=lambda: open_enhanced_analysis(self))
+        self.menu_bar.add_cascade(label="Análise", menu=analysis_menu)
+
+        telemetry_menu = Menu(self.menu_bar, tearoff=0)
+        telemetry_menu.add_command(label="Iniciar/parar servidor", command=lambda: toggle_telemetry(self))
+        self.menu_bar.add_cascade(label="Telemetria", menu=telemetry_menu)
+
         help_menu = Menu(self.menu_bar, tearoff=0)
         help_menu.add_command(label="Ver README", command=self.open_readme)
         help_menu.add_command(label="Sobre", command=self.show_about)
@@ -91,6 +103,20 @@ class RaiseGui(ctk.CTk):
         self.normals_canvas.grid_rowconfigure(0, weight=1)
         self.normals_canvas.grid_columnconfigure(0, weight=1)
 
+        # modo superfície: todas as linhas como mapa, com linha de cursor
+        self.surface_scan_mode = False
+        # faixa provisória até o primeiro frame; set_frame_height() ajusta
+        self.frame_height = 480
+        self.scan_cursor_row = self.frame_height // 2
+        self.surface_scan_switch = ctk.CTkSwitch(
+            self.normals_frame, text="Modo Superfície", command=lambda: toggle_surface_scan(self))
+        self.surface_scan_switch.pack(pady=(0, 2))
+        self.cursor_slider, self.cursor_label = create_row_slider(
+            self.normals_frame, "Linha do cursor", self.scan_cursor_row, self.frame_height - 1,
+            lambda value: set_scan_cursor(self, value))
+        self.cursor_label.pack()
+        self.cursor_slider.pack(pady=(0, 5))
+
         # ---------- PARTE DO MEIO: SINAIS DINÂMICOS ----------
         self.frame_middle = ctk.CTkFrame(scrollable_frame, height=250)
         self.frame_middle.grid(row=1, column=0, columnspan=3,
@@ -114,7 +140,7 @@ class RaiseGui(ctk.CTk):
         self.frame_bottom = ctk.CTkFrame(scrollable_frame, height=100)
         self.frame_bottom.grid(row=2, column=0, columnspan=3,
                                sticky="nsew", padx=10, pady=5)
-        self.frame_bottom.grid_columnconfigure((0, 1, 2, 3), weight=1)
+        self.frame_bottom.grid_columnconfigure((0, 1, 2, 3, 4), weight=1)
 
         self.start_button = ctk.CTkButton(
             self.frame_bottom, text="Iniciar Sistema", command=lambda: start_system(self))
@@ -131,7 +157,51 @@ class RaiseGui(ctk.CTk):
         self.debug_button = ctk.CTkButton(
             self.frame_bottom, text="Modo Debug", command=lambda: start_debug_mode(self))
         self.debug_button.grid(row=0, column=3, padx=10, pady=10)
-        
+
+        self.surface_button = ctk.CTkButton(
+            self.frame_bottom, text="Analisar Superfície", command=lambda: request_surface_analysis(self))
+        self.surface_button.grid(row=0, column=4, padx=10, pady=10)
+
+        self.status_label = ctk.CTkLabel(
+            self.frame_bottom, text="Carregando módulos de visão...", text_color="gray")
+        self.status_label.grid(row=1, column=0, columnspan=4, padx=10, pady=(0, 10))
+
+        # stream exibido quando há mais de uma câmera
+        self.device_menu = ctk.CTkOptionMenu(
+            self.frame_bottom, values=["Nenhuma câmera"], command=lambda value: select_device(self, value))
+        self.device_menu.grid(row=1, column=4, padx=10, pady=(0, 10))
+
+        # a câmera só é preparada depois que a janela já está respondendo
+        self.devices = None
+        self.inspection_db = None
+        self.inspection_session = None
+        self.telemetry = None
+        # None: telemetry.server.DEFAULT_HOST (local, ou RAISE_TELEMETRY_HOST)
+        self.telemetry_host = None
+        self.analysis_window = None
+        self.after(200, lambda: preload_camera_pipeline(self))
+        self.protocol("WM_DELETE_WINDOW", lambda: shutdown(self))
+
+    def set_status(self, text):
+        self.status_label.configure(text=text)
+
+    def set_frame_height(self, height):
+        """
+        Ajusta a faixa do slider do cursor à altura dos frames do stream
+        """
+        if height == self.frame_height:
+            return
+        self.frame_height = height
+        set_row_slider_range(self.cursor_slider, height - 1)
+        row = min(self.scan_cursor_row, height - 1)
+        self.cursor_slider.set(row)
+        set_scan_cursor(self, row)
+
+    def set_devices(self, device_ids):
+        labels = [device_id or "Câmera" for device_id in device_ids]
+        self.device_menu.configure(values=labels)
+        self.device_menu.set(labels[0])
+
 
     def open_readme(self):
         webbrowser.open(README_URL)
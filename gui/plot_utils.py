@@ -1,12 +1,11 @@
-from io import BytesIO
-from PIL import Image
 import numpy as np
 import cv2
 import matplotlib.pyplot as plt
 from scipy.ndimage import gaussian_filter1d
-import customtkinter as ctk
 import matplotlib
 matplotlib.use("Agg")
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 
 """Importar função do depth_stream atualizado"""
 try:
@@ -16,72 +15,32 @@ except ImportError:
     def extract_stable_profile_line(depth_frame, line_y=240, window_size=5):
         return depth_frame[line_y, :].astype(np.float32)
 
+from vision.normals import compute_profile_normals, extract_surface_profiles
+from vision.frame_context import as_frame_context
+from vision.segmentation import depth_discontinuities
+from utils.conversions import get_display_surface, figure_to_rgba, DEPTH_VIEW_SIZE
+from utils.buffers import pool_buffer
+from vision.quality import DEPTH_MIN, DEPTH_MAX
 
-def render_profile_plot(depth_frame, target_widget, parent_gui):
+OUT_OF_RANGE_BGR = np.array([0, 0, 128], dtype=np.uint8)
+
+
+def render_profile_plot(depth_frame, target_widget, parent_gui, line_y=240,
+                        min_depth=DEPTH_MIN, max_depth=DEPTH_MAX):
     """
     Renderiza gráfico de perfil otimizado para objetos próximos
     """
-    # Usar função otimizada para extrair linha estável
-    z_raw = extract_stable_profile_line(depth_frame, line_y=240, window_size=7)
-
-    z_raw[z_raw == 0] = np.nan # Converter zeros para nan
-    
-    # Filtrando apenas objetos próximos (100-400mm) com tolerância maior
-    z_raw[(z_raw < 100) | (z_raw > 400)] = np.nan
-
-    # Verificando se há pontos suficientes
-    valid_count = np.count_nonzero(~np.isnan(z_raw))
-    if valid_count < 15:
-        print(f"[AVISO] Apenas {valid_count} pontos válidos. Pulando frame.")
+    analysis = compute_profile_normals(depth_frame, line_y=line_y, window_size=7,
+                                       min_depth=min_depth, max_depth=max_depth)
+    if analysis is None:
         return
 
-    # Aplicar suavização adicional
-    z = np.copy(z_raw)
-
-    # Interpolando melhor pontos faltantes
-    valid_mask = ~np.isnan(z)
-    if np.sum(valid_mask) > 10:
-        x_coords = np.arange(len(z))
-        valid_coords = x_coords[valid_mask]
-        valid_values = z[valid_mask]
-
-        try:
-            # Interp. linear
-            z = np.interp(x_coords, valid_coords, valid_values)
-
-            # filtro gaussiano para suavizar - revisar depois
-            z = gaussian_filter1d(z, sigma=2.0)
-
-        except Exception as e:
-            print(f"[ERRO] Falha na interpolação: {e}")
-            return
-    else:
-        print("[AVISO] Poucos pontos válidos para interpolação.")
-        return
-
-    # Detectar região de interesse (objetos próximos)
-    close_mask = (z > 100) & (z < 400)
-    close_points = np.sum(close_mask)
-
-    if close_points < 10:
-        print(f"[AVISO] Apenas {close_points} pontos próximos detectados.")
-        return
-
-    """Calcular normais de forma mais estável
-    Usar janela maior para gradiente mais suave"""
-    dx = 2  # Espaçamento para os gradientes
-    dz = np.gradient(z, dx)
-
-    # Limitando gradientes extremos
-    dz = np.clip(dz, -40, 40)
-    # Suavizanso gradiente
-    dz = gaussian_filter1d(dz, sigma=1.0)
-    # Calculando normais 2D
-    normals = np.stack([-dz, np.ones_like(dz)], axis=1)
-    # Normalizando os vetores
-    norms = np.linalg.norm(normals, axis=1, keepdims=True)
-    norms[norms == 0] = 1  # Evitar divisão por zero
-    normals = normals / norms
+    z = analysis['profile']
+    dz = analysis['gradient']
+    normals = analysis['normals']
+    close_mask = analysis['close_mask']
+    valid_count = analysis['valid_count']
+    close_points = analysis['close_points']
 
     # Criar plot com informações de debug
     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 6), dpi=80)
@@ -112,7 +71,7 @@ def render_profile_plot(depth_frame, target_widget, parent_gui):
             width=0.003, alpha=0.8, label="Normais"
         )
 
-    ax1.set_ylim(100, 700)
+    ax1.set_ylim(min_depth, max_depth)
     ax1.set_xlim(0, len(z))
     ax1.set_title(
         f"Perfil de Superfície - {valid_count} pontos válidos, {close_points} próximos")
@@ -144,15 +103,8 @@ def render_profile_plot(depth_frame, target_widget, parent_gui):
 
     plt.tight_layout()
 
-    # Converter para imagem e exibir
-    buf = BytesIO()
-    fig.savefig(buf, format="png", bbox_inches='tight')
-    buf.seek(0)
-    img = Image.open(buf)
-    imgtk = ctk.CTkImage(light_image=img, size=(440, 300)
-                         )  # Altura maior para 2 subplots
-    target_widget.configure(image=imgtk, text="")
-    target_widget.image = imgtk
+    # Exibir direto do buffer RGBA da figura (altura maior para 2 subplots)
+    get_display_surface(target_widget, (440, 300)).update(figure_to_rgba(fig), order="rgba")
     plt.close(fig)
 
 
@@ -161,9 +113,8 @@ def compute_surface_normals_3d(depth_frame, focal_length=525.0, baseline=75.0):
     Calcula normais 3D da superfície a partir do mapa de profundidade completo
     Útil para análise mais detalhada da superfície
     """
-    # Converter para float e filtrar
-    depth = depth_frame.astype(np.float32)
-    depth[depth == 0] = np.nan
+    # Visão float com zeros como NaN (compartilhada no frame)
+    depth = as_frame_context(depth_frame).nan_view
 
     # Calcular gradientes em X e Y
     grad_x = np.gradient(depth, axis=1)
@@ -201,9 +152,13 @@ def analyze_surface_curvature(depth_profile):
     # Calcular curvatura: κ = |f''| / (1 + f'^2)^(3/2)
     curvature = np.abs(second_deriv) / np.power(1 + first_deriv**2, 1.5)
 
-    # Detectar pontos de alta curvatura (bordas, cantos)
-    high_curvature_threshold = np.percentile(
-        curvature[~np.isnan(curvature)], 90)
+    # Detectar pontos de alta curvatura (bordas, cantos): percentil 90 por
+    # seleção O(n) com np.partition, sem ordenar o perfil inteiro
+    valid_curvature = curvature[~np.isnan(curvature)]
+    if len(valid_curvature) == 0:
+        return None
+    k = int(0.9 * (len(valid_curvature) - 1))
+    high_curvature_threshold = np.partition(valid_curvature, k)[k]
     high_curvature_points = curvature > high_curvature_threshold
 
     return {
@@ -214,21 +169,16 @@ def analyze_surface_curvature(depth_profile):
     }
 
 
-def extract_object_boundaries(depth_frame, min_depth=100, max_depth=430):
+def extract_object_boundaries(depth_frame, min_depth=DEPTH_MIN, max_depth=DEPTH_MAX):
     """
     Detecta bordas de objetos próximos para melhor compreensão da cena
     """
     # Filtrar apenas objetos próximos
-    filtered = depth_frame.astype(np.float32)
-    filtered[(filtered < min_depth) | (filtered > max_depth)] = np.nan
+    ctx = as_frame_context(depth_frame)
+    mask = ctx.range_mask(min_depth, max_depth)
 
-    # Converter para formato adequado para detecção de bordas
-    depth_for_edges = np.copy(filtered)
-    depth_for_edges[np.isnan(depth_for_edges)] = 0
-    depth_for_edges = depth_for_edges.astype(np.uint8)
-
-    # Aplicar detecção de bordas Canny
-    edges = cv2.Canny(depth_for_edges, 50, 150)
+    # Descontinuidades direto no uint16 (converter para uint8 estourava acima de 255 mm)
+    edges = (depth_discontinuities(ctx) & mask).astype(np.uint8) * 255
 
     # Aplicar operações morfológicas para limpar bordas
     kernel = np.ones((3, 3), np.uint8)
@@ -239,24 +189,44 @@ def extract_object_boundaries(depth_frame, min_depth=100, max_depth=430):
 
 def render_enhanced_depth_analysis(depth_frame, target_widget, parent_gui):
     """
-    Versão melhorada do render_profile_plot com análises adicionais
+    Versão melhorada do render_profile_plot com análises adicionais.
+    Roda na thread da interface; para uso ao vivo, a mesma figura é
+    gerada em segundo plano por gui.analysis_worker.
+    """
+    image = enhanced_depth_analysis_image(
+        depth_frame, min_depth=getattr(parent_gui, 'min_depth', DEPTH_MIN),
+        max_depth=getattr(parent_gui, 'max_depth', DEPTH_MAX))
+    get_display_surface(target_widget, (440, 350)).update(image, order="rgba")
+
+
+def enhanced_depth_analysis_image(depth_frame, line_y=240, min_depth=DEPTH_MIN, max_depth=DEPTH_MAX,
+                                  figsize=(12, 8), dpi=80):
+    """
+    Figura 2x2 da análise detalhada (perfil com normais, curvatura, mapa
+    filtrado e bordas) renderizada fora da tela. Não usa o estado global do
+    pyplot, então pode rodar em qualquer thread ou processo.
+    Retorna a imagem RGBA (uint8).
     """
+    ctx = as_frame_context(depth_frame)
+
     # Análise do perfil principal
     z_profile = extract_stable_profile_line(
-        depth_frame, line_y=240, window_size=7)
+        ctx, line_y=line_y, window_size=7)
 
     # Análise de curvatura
     curvature_data = analyze_surface_curvature(z_profile)
 
     # Detecção de bordas
-    edges = extract_object_boundaries(depth_frame)
+    edges = extract_object_boundaries(ctx, min_depth, max_depth)
 
     # Criar visualização completa
-    fig, axes = plt.subplots(2, 2, figsize=(12, 8), dpi=80)
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    axes = fig.subplots(2, 2)
 
     # Plot 1: Perfil de profundidade com normais
     ax1 = axes[0, 0]
-    valid_mask = ~np.isnan(z_profile) & (z_profile > 99) & (z_profile < 430)
+    valid_mask = ~np.isnan(z_profile) & (z_profile >= min_depth) & (z_profile < max_depth)
     x_coords = np.arange(len(z_profile))
 
     if np.sum(valid_mask) > 10:
@@ -298,10 +268,9 @@ def render_enhanced_depth_analysis(depth_frame, target_widget, parent_gui):
 
     # Plot 3: Mapa de profundidade
     ax3 = axes[1, 0]
-    depth_display = np.copy(depth_frame).astype(np.float32)
-    depth_display[(depth_display < 100) | (depth_display > 430)] = np.nan
-    im3 = ax3.imshow(depth_display, cmap='viridis', aspect='auto')
-    ax3.axhline(y=240, color='red', linestyle='--',
+    depth_display = np.where(ctx.range_mask(min_depth, max_depth), ctx.float_view, np.nan)
+    ax3.imshow(depth_display, cmap='viridis', aspect='auto')
+    ax3.axhline(y=line_y, color='red', linestyle='--',
                 alpha=0.7, label='Linha de análise')
     ax3.set_title("Mapa de Profundidade Filtrado")
     ax3.legend()
@@ -311,44 +280,95 @@ def render_enhanced_depth_analysis(depth_frame, target_widget, parent_gui):
     ax4.imshow(edges, cmap='gray', aspect='auto')
     ax4.set_title("Bordas de Objetos Próximos")
 
-    plt.tight_layout()
+    fig.tight_layout()
+    # cópia: o buffer do canvas some junto com a figura
+    return np.array(figure_to_rgba(fig))
 
-    # Converter e exibir
-    buf = BytesIO()
-    fig.savefig(buf, format="png", bbox_inches='tight')
-    buf.seek(0)
-    img = Image.open(buf)
-    imgtk = ctk.CTkImage(light_image=img, size=(440, 350))
-    target_widget.configure(image=imgtk, text="")
-    target_widget.image = imgtk
-    plt.close(fig)
-
-def render_depth_colormap(depth_frame, target_widget, parent_gui, min_depth=100, max_depth=470):
+def render_depth_colormap(depth_frame, target_widget, parent_gui, min_depth=DEPTH_MIN, max_depth=DEPTH_MAX,
+                          size=DEPTH_VIEW_SIZE):
     """
     Renderiza a imagem de profundidade com colormap visível
     e cores sólidas para regiões além do alcance útil.
+    Os intermediários vêm do parent_gui.buffer_pool, quando existe.
     """
-    depth = depth_frame.astype(np.float32)
-    depth[depth == 0] = np.nan
-    depth_display = np.copy(depth)
+    colormap = depth_colormap(depth_frame, min_depth, max_depth, getattr(parent_gui, 'buffer_pool', None))
+    get_display_surface(target_widget, size).update(colormap, order="bgr")
 
-    # Tudo acima do limite será vermelho escuro
-    red_color = np.array([0, 0, 128], dtype=np.uint8)  # BGR
-    colormap = np.zeros((depth.shape[0], depth.shape[1], 3), dtype=np.uint8)
+
+def depth_colormap(depth_frame, min_depth=DEPTH_MIN, max_depth=DEPTH_MAX, pool=None):
+    """
+    Imagem BGR do colormap de profundidade (JET na faixa, vermelho escuro fora)
+    """
+    ctx = as_frame_context(depth_frame)
+    shape = ctx.shape
 
     # Normalizar para 8 bits para aplicar colormap
-    clipped = np.clip(depth_display, min_depth, max_depth)
-    norm = ((clipped - min_depth) / (max_depth - min_depth)) * 255
-    norm[np.isnan(depth)] = 0
-    norm = norm.astype(np.uint8)
+    norm = pool_buffer(pool, "colormap.norm", shape, np.float32)
+    np.clip(ctx.raw, min_depth, max_depth, out=norm)
+    norm -= min_depth
+    norm *= 255.0 / (max_depth - min_depth)
+    norm8 = pool_buffer(pool, "colormap.norm8", shape, np.uint8)
+    np.copyto(norm8, norm, casting='unsafe')
+
+    colormap = pool_buffer(pool, "colormap.bgr", shape + (3,), np.uint8)
+    cv2.applyColorMap(norm8, cv2.COLORMAP_JET, dst=colormap)
+
+    # Tudo fora da faixa (e inválido) será vermelho escuro
+    outside = np.logical_not(ctx.range_mask(min_depth, max_depth),
+                             out=pool_buffer(pool, "colormap.outside", shape, bool))
+    np.copyto(colormap, OUT_OF_RANGE_BGR, where=outside[..., None])
+    return colormap
+
 
-    jet = cv2.applyColorMap(norm, cv2.COLORMAP_JET)
+def render_surface_scan(depth_frame, target_widget, parent_gui, row_step=4, cursor_row=240,
+                        min_depth=DEPTH_MIN, max_depth=DEPTH_MAX, max_slope=30):
+    """
+    Modo superfície: perfis de todas as linhas como mapas de profundidade e
+    de inclinação, com a linha do cursor destacada. Desenhado com OpenCV,
+    sem matplotlib, para custar o mesmo que o plot de linha única.
+    """
+    scan = extract_surface_profiles(depth_frame, row_step=row_step,
+                                    min_depth=min_depth, max_depth=max_depth)
+    profiles = scan['profiles']
+    gradients = scan['gradients']
+    valid_rows = scan['valid_rows']
+    if not np.any(valid_rows):
+        print("[AVISO] Nenhuma linha válida para o modo superfície.")
+        return
 
-    valid_mask = (depth >= min_depth) & (depth <= max_depth)
-    colormap[valid_mask] = jet[valid_mask]
-    colormap[~valid_mask] = red_color  # Fora da faixa
+    width, height = 440, 300
+    half = height // 2
+
+    depth_norm = (np.clip(profiles, min_depth, max_depth) - min_depth) * (255.0 / (max_depth - min_depth))
+    slope_norm = (np.clip(gradients, -max_slope, max_slope) + max_slope) * (255.0 / (2 * max_slope))
+    depth_norm[~valid_rows] = 0
+    slope_norm[~valid_rows] = 0
+
+    depth_map = cv2.applyColorMap(depth_norm.astype(np.uint8), cv2.COLORMAP_JET)
+    slope_map = cv2.applyColorMap(slope_norm.astype(np.uint8), cv2.COLORMAP_TWILIGHT_SHIFTED)
+    depth_map[~valid_rows] = 0
+    slope_map[~valid_rows] = 0
+
+    canvas = np.empty((height, width, 3), dtype=np.uint8)
+    cv2.resize(depth_map, (width, half), dst=canvas[:half], interpolation=cv2.INTER_NEAREST)
+    cv2.resize(slope_map, (width, height - half), dst=canvas[half:], interpolation=cv2.INTER_NEAREST)
+
+    # linha do cursor nos dois mapas (o slider pode estar fora da altura do frame)
+    frame_height = as_frame_context(depth_frame).shape[0]
+    cursor_row = min(max(int(cursor_row), 0), frame_height - 1)
+    y = cursor_row * half // frame_height
+    for offset in (0, half):
+        cv2.line(canvas, (0, offset + y), (width - 1, offset + y), (255, 255, 255), 1)
+
+    cursor_index = min(int(cursor_row // row_step), len(valid_rows) - 1)
+    if valid_rows[cursor_index]:
+        cursor_profile = profiles[cursor_index]
+        label = f"linha {cursor_row}: {np.min(cursor_profile):.0f}-{np.max(cursor_profile):.0f}mm"
+    else:
+        label = f"linha {cursor_row}: sem dados"
+    cv2.putText(canvas, "Profundidade", (5, 15), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (255, 255, 255), 1)
+    cv2.putText(canvas, label, (5, half - 8), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (255, 255, 255), 1)
+    cv2.putText(canvas, "Gradiente dZ/dx", (5, half + 15), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (255, 255, 255), 1)
 
-    img = Image.fromarray(cv2.cvtColor(colormap, cv2.COLOR_BGR2RGB))
-    imgtk = ctk.CTkImage(light_image=img, size=(440, 300))
-    target_widget.configure(image=imgtk, text="")
-    target_widget.image = imgtk
+    get_display_surface(target_widget, (width, height)).update(canvas, order="bgr")
+    parent_gui.surface_scan = scan
@@ -0,0 +1,153 @@
+"""
+Agendamento adaptativo dos ticks de atualização da interface
+"""
+import time
+from contextlib import contextmanager
+
+
+class FrameGovernor:
+    """
+    Mede o custo de cada frame e a fila pendente para decidir o próximo tick
+    e quais estágios rodam neste frame.
+
+    Cada estágio tem uma prioridade (0 = nunca é descartado) e uma taxa:
+    every=N roda a cada N frames, on_demand=True só quando solicitado.
+    Sob carga, os estágios periódicos de menor prioridade (número maior) são
+    espaçados primeiro; quando a carga cai, voltam à taxa original. Um
+    pedido explícito do usuário (on_demand) roda sempre no próximo frame.
+    """
+
+    def __init__(self, target_fps=30, min_delay_ms=5, max_delay_ms=100,
+                 smoothing=0.2, max_shed_factor=16, adjust_every=10):
+        self.target_period = 1.0 / target_fps
+        self.min_delay_ms = min_delay_ms
+        self.max_delay_ms = max_delay_ms
+        self.smoothing = smoothing
+        self.max_shed_factor = max_shed_factor
+        self.adjust_every = adjust_every
+
+        self.stages = {}
+        self.frame_index = 0
+        self.frame_cost = 0.0
+        self.queue_depth = 0
+        self._frame_start = None
+        self._last_adjust = 0
+
+    def add_stage(self, name, priority=0, every=1, on_demand=False):
+        self.stages[name] = {
+            'priority': priority,
+            'every': max(1, every),
+            'on_demand': on_demand,
+            'shed_factor': 1,
+            'requested': False,
+            'cost': 0.0,
+            'runs': 0,
+        }
+
+    def request(self, name):
+        """
+        Solicita um estágio sob demanda para o próximo frame
+        """
+        self.stages[name]['requested'] = True
+
+    def pending(self, name):
+        """
+        Indica se há uma solicitação ainda não atendida para o estágio
+        """
+        return self.stages[name]['requested']
+
+    def due(self, name):
+        """
+        Indica se o estágio deve rodar no frame atual
+        """
+        stage = self.stages[name]
+        if stage['on_demand']:
+            if stage['requested']:
+                stage['requested'] = False
+                return True
+            return False
+        interval = stage['every'] * stage['shed_factor']
+        return self.frame_index % interval == 0
+
+    @contextmanager
+    def measure(self, name):
+        stage = self.stages[name]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            stage['cost'] += self.smoothing * (elapsed - stage['cost'])
+            stage['runs'] += 1
+
+    def begin_frame(self):
+        self._frame_start = time.perf_counter()
+
+    def end_frame(self, queue_depth=0):
+        """
+        Fecha o frame e retorna o atraso (ms) até o próximo tick
+        """
+        elapsed = 0.0
+        if self._frame_start is not None:
+            elapsed = time.perf_counter() - self._frame_start
+        self.frame_cost += self.smoothing * (elapsed - self.frame_cost)
+        self.queue_depth = queue_depth
+        self.frame_index += 1
+
+        if self.frame_index - self._last_adjust >= self.adjust_every:
+            self._last_adjust = self.frame_index
+            self._adjust_load()
+
+        # frames acumulados na fila: volta o mais rápido possível
+        if queue_depth > 1:
+            return self.min_delay_ms
+        delay_ms = (self.target_period - elapsed) * 1000
+        return int(min(self.max_delay_ms, max(self.min_delay_ms, delay_ms)))
+
+    def _sheddable(self):
+        return sorted((s for s in self.stages.values() if s['priority'] > 0 and not s['on_demand']),
+                      key=lambda s: s['priority'])
+
+    def _adjust_load(self):
+        load = self.frame_cost / self.target_period
+        stages = self._sheddable()
+
+        if load > 1.0 or self.queue_depth > 1:
+            # descarta primeiro o estágio de menor prioridade
+            for stage in reversed(stages):
+                if stage['shed_factor'] < self.max_shed_factor:
+                    stage['shed_factor'] *= 2
+                    return
+        elif load < 0.6 and self.queue_depth == 0:
+            # restaura primeiro o estágio de maior prioridade
+            for stage in stages:
+                if stage['shed_factor'] > 1:
+                    stage['shed_factor'] //= 2
+                    return
+
+    def stats(self):
+        return {
+            'frame_cost_ms': self.frame_cost * 1000,
+            'load': self.frame_cost / self.target_period,
+            'queue_depth': self.queue_depth,
+            'stages': {
+                name: {
+                    'cost_ms': stage['cost'] * 1000,
+                    'interval': stage['every'] * stage['shed_factor'],
+                    'requested': stage['requested'],
+                    'runs': stage['runs'],
+                }
+                for name, stage in self.stages.items()
+            },
+        }
+
+
+def create_display_governor():
+    """
+    Governador com os estágios padrão da visualização ao vivo
+    """
+    governor = FrameGovernor(target_fps=30)
+    governor.add_stage("colormap", priority=0, every=1)
+    governor.add_stage("profile", priority=1, every=3)
+    governor.add_stage("surface", priority=2, on_demand=True)
+    return governor
@@ -7,3 +7,15 @@ def create_depth_slider(parent, label_text, initial_value, command):
     slider.set(initial_value)
     label = ctk.CTkLabel(parent, text=f"{label_text}: {initial_value} mm")
     return slider, label
+
+
+def create_row_slider(parent, label_text, initial_value, max_row, command):
+    slider = ctk.CTkSlider(parent, from_=0, to=max_row, number_of_steps=max_row,
+                           command=command, width=200)
+    slider.set(initial_value)
+    label = ctk.CTkLabel(parent, text=f"{label_text}: {initial_value}")
+    return slider, label
+
+
+def set_row_slider_range(slider, max_row):
+    slider.configure(to=max_row, number_of_steps=max_row)
@@ -1,7 +1,9 @@
-from gui.main_gui import RaiseGui
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from utils.startup import lazy_import, mark_milestone, print_startup_report
 
 
 if __name__ == "__main__":
-    app = RaiseGui()
-    app.mainloop()
\ No newline at end of file
+    main_gui = lazy_import("gui.main_gui")
+    app = main_gui.RaiseGui()
+    mark_milestone("janela criada")
+    app.after_idle(print_startup_report)
+    app.mainloop()
@@ -0,0 +1,166 @@
+"""
+Pontuação de anomalia acústica por janela do piezo: vetor de
+características (espectro + RQA) comparado a um modelo de referência
+"""
+import numpy as np
+
+from sound.fft_winding import (power_spectra, default_bands, band_energies, spectral_centroid,
+                               spectral_flatness, sliding_windows)
+from sound.rqa import rqa_metrics
+
+SPECTRAL_FEATURES = ('centroid', 'flatness', 'log_rms')
+RQA_FEATURES = ('rr', 'det', 'entropy')
+
+
+def acoustic_features(windows, sample_rate, bands=None, rqa=True, **rqa_options):
+    """
+    Matriz de características (n_janelas, n_características) e os nomes das
+    colunas: fração de energia por banda, centroide (fração de Nyquist),
+    planicidade espectral, log do RMS e, com rqa=True, RR, DET e entropia
+    """
+    windows = np.atleast_2d(np.asarray(windows, dtype=np.float32))
+    bands = default_bands(sample_rate, windows.shape[1]) if bands is None else bands
+    frequencies, power = power_spectra(windows, sample_rate)
+
+    columns = [band_energies(frequencies, power, bands),
+               (spectral_centroid(frequencies, power) / (sample_rate / 2))[:, None],
+               spectral_flatness(power)[:, None],
+               np.log(windows.std(axis=1) + 1e-9)[:, None]]
+    names = [f"band_{i}" for i in range(len(bands))] + list(SPECTRAL_FEATURES)
+    if rqa:
+        metrics = rqa_metrics(windows, **rqa_options)
+        columns.extend(metrics[name][:, None] for name in RQA_FEATURES)
+        names.extend(RQA_FEATURES)
+    return np.hstack(columns).astype(np.float64), names
+
+
+class BaselineModel:
+    """
+    Média e covariância das características de peças boas, atualizadas de
+    forma incremental (Welford, um lote por vez com a fórmula de Chan).
+
+    method='mahalanobis' pontua pela distância de Mahalanobis (covariância
+    com encolhimento para a diagonal, para não ficar singular com poucas
+    amostras); method='zscore' usa o maior |z| entre as características.
+    Com reject_outliers=True, janelas acima do limiar não entram no modelo.
+    """
+
+    def __init__(self, method='mahalanobis', shrinkage=0.05, threshold=None, names=None):
+        if method not in ('mahalanobis', 'zscore'):
+            raise ValueError(f"Método desconhecido: {method}")
+        self.method = method
+        self.shrinkage = shrinkage
+        self.threshold = threshold
+        self.names = names
+        self.count = 0
+        self.mean = None
+        self._m2 = None
+        self._factor = None
+
+    def update(self, features, reject_outliers=False):
+        """
+        Incorpora um lote (n, n_características). Retorna quantas janelas entraram.
+        """
+        features = np.atleast_2d(np.asarray(features, dtype=np.float64))
+        if reject_outliers and self.threshold is not None and self.count > features.shape[1]:
+            features = features[self.score(features) <= self.threshold]
+        count = features.shape[0]
+        if count == 0:
+            return 0
+
+        batch_mean = features.mean(axis=0)
+        centered = features - batch_mean
+        batch_m2 = centered.T @ centered
+        if self.count == 0:
+            self.mean, self._m2 = batch_mean, batch_m2
+        else:
+            total = self.count + count
+            delta = batch_mean - self.mean
+            self.mean = self.mean + delta * (count / total)
+            self._m2 = self._m2 + batch_m2 + np.outer(delta, delta) * (self.count * count / total)
+        self.count += count
+        self._factor = None
+        return count
+
+    @property
+    def covariance(self):
+        covariance = self._m2 / max(self.count - 1, 1)
+        diagonal = np.diag(np.diag(covariance))
+        covariance = (1 - self.shrinkage) * covariance + self.shrinkage * diagonal
+        # características constantes no modelo não podem zerar a variância
+        return covariance + np.eye(len(covariance)) * 1e-9
+
+    def _whitening(self):
+        if self._factor is None:
+            if self.method == 'mahalanobis':
+                self._factor = np.linalg.inv(np.linalg.cholesky(self.covariance))
+            else:
+                self._factor = 1.0 / np.sqrt(np.diag(self.covariance))
+        return self._factor
+
+    def score(self, features):
+        """
+        Pontuação de cada linha: uma multiplicação de matriz para o lote todo
+        """
+        if self.count < 2:
+            raise RuntimeError("Modelo de referência sem amostras suficientes")
+        centered = np.atleast_2d(np.asarray(features, dtype=np.float64)) - self.mean
+        factor = self._whitening()
+        if self.method == 'mahalanobis':
+            whitened = centered @ factor.T
+            return np.sqrt(np.einsum('ij,ij->i', whitened, whitened))
+        return np.abs(centered * factor).max(axis=1)
+
+    def calibrate(self, features, quantile=0.995, margin=1.2):
+        """
+        Limiar de aprovação a partir das pontuações de janelas de referência
+        """
+        scores = self.score(features)
+        k = int(quantile * (len(scores) - 1))
+        self.threshold = float(np.partition(scores, k)[k] * margin)
+        return self.threshold
+
+    def evaluate(self, features):
+        """
+        Pontuações e aprovação (True = dentro do modelo) de cada janela
+        """
+        if self.threshold is None:
+            raise RuntimeError("Modelo de referência sem limiar: chame calibrate()")
+        scores = self.score(features)
+        return scores, scores <= self.threshold
+
+    def save(self, path):
+        np.savez(path, method=self.method, shrinkage=self.shrinkage, count=self.count,
+                 mean=self.mean, m2=self._m2, names=np.array(self.names or []),
+                 threshold=np.nan if self.threshold is None else self.threshold)
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        threshold = float(data['threshold'])
+        model = cls(method=str(data['method']), shrinkage=float(data['shrinkage']),
+                    threshold=None if np.isnan(threshold) else threshold,
+                    names=[str(name) for name in data['names']] or None)
+        model.count = int(data['count'])
+        model.mean, model._m2 = data['mean'], data['m2']
+        return model
+
+
+def score_signal(signal, model, sample_rate, window_size=1024, hop=None, **feature_options):
+    """
+    Divide o sinal do piezo em janelas e pontua todas de uma vez. Retorna
+    um dict com características, pontuações, aprovação e as métricas por
+    janela no formato das colunas acústicas do banco de inspeções.
+    """
+    windows = sliding_windows(signal, window_size, hop)
+    features, names = acoustic_features(windows, sample_rate, **feature_options)
+    scores, passed = model.evaluate(features)
+
+    columns = {name: features[:, names.index(name)] for name in RQA_FEATURES if name in names}
+    metrics = [
+        {**{name: float(values[i]) for name, values in columns.items()},
+         'anomaly_score': float(scores[i])}
+        for i in range(len(scores))
+    ]
+    return {'features': features, 'names': names, 'scores': scores, 'passed': passed,
+            'metrics': metrics}
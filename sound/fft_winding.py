@@ -1,3 +1,87 @@
-""" 
+"""
 FFT + geração de curvas winding
-"""
\ No newline at end of file
+"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def sliding_windows(signal, size, hop=None):
+    """
+    Janelas (n_janelas, size) do sinal como view, sem cópia. hop = size
+    (padrão) dá janelas sem sobreposição.
+    """
+    hop = size if hop is None else hop
+    signal = np.asarray(signal)
+    if len(signal) < size:
+        return np.empty((0, size), dtype=signal.dtype)
+    return sliding_window_view(signal, size)[::hop]
+
+
+def power_spectra(windows, sample_rate):
+    """
+    Espectro de potência de várias janelas de uma vez (uma rfft sobre o eixo
+    das amostras), com janela de Hann e sem a componente DC.
+    Retorna (frequências, potência (n_janelas, n_freq)).
+    """
+    windows = np.atleast_2d(np.asarray(windows, dtype=np.float32))
+    size = windows.shape[1]
+    centered = windows - windows.mean(axis=1, keepdims=True)
+    spectrum = np.fft.rfft(centered * np.hanning(size).astype(np.float32), axis=1)
+    power = spectrum.real ** 2 + spectrum.imag ** 2
+    return np.fft.rfftfreq(size, 1.0 / sample_rate), power
+
+
+def default_bands(sample_rate, size, count=8):
+    """
+    count bandas em escala logarítmica, da resolução da FFT até Nyquist
+    """
+    edges = np.geomspace(sample_rate / size, sample_rate / 2, count + 1)
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def band_energies(frequencies, power, bands):
+    """
+    Fração da energia total em cada banda (n_janelas, n_bandas), por somas
+    acumuladas: o custo não depende do número de bandas
+    """
+    cumulative = np.concatenate([np.zeros((power.shape[0], 1), power.dtype),
+                                 np.cumsum(power, axis=1)], axis=1)
+    total = np.maximum(cumulative[:, -1:], 1e-12)
+    edges = np.searchsorted(frequencies, np.asarray(bands, dtype=np.float64))
+    return (cumulative[:, edges[:, 1]] - cumulative[:, edges[:, 0]]) / total
+
+
+def spectral_centroid(frequencies, power):
+    total = np.maximum(power.sum(axis=1), 1e-12)
+    return power @ frequencies / total
+
+
+def spectral_flatness(power):
+    """
+    Média geométrica / média aritmética do espectro: perto de 1 para ruído
+    branco, perto de 0 para sinais tonais
+    """
+    power = power + 1e-12
+    return np.exp(np.log(power).mean(axis=1)) / power.mean(axis=1)
+
+
+def winding_center(signal, frequencies, sample_rate):
+    """
+    Centro de massa da curva winding: o sinal enrolado no plano complexo a
+    cada frequência, g(t) e^(-2πift). O módulo é alto quando a frequência
+    está presente no sinal.
+    """
+    signal = np.asarray(signal, dtype=np.float64)
+    t = np.arange(len(signal)) / sample_rate
+    phases = np.exp(-2j * np.pi * np.outer(frequencies, t))
+    return phases @ (signal - signal.mean()) / len(signal)
+
+
+def winding_curve(signal, frequency, sample_rate):
+    """
+    Pontos (x, y) da curva winding de uma frequência, para o gráfico
+    """
+    signal = np.asarray(signal, dtype=np.float64)
+    t = np.arange(len(signal)) / sample_rate
+    curve = (signal - signal.mean()) * np.exp(-2j * np.pi * frequency * t)
+    return curve.real, curve.imag
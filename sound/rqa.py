@@ -1,3 +1,84 @@
 """
 Recurrence Quantification Analysis
-"""
\ No newline at end of file
+"""
+import numpy as np
+
+from sound.takens import takens_embedding, decimate_windows
+
+
+def recurrence_matrices(embedded, radius):
+    """
+    Matrizes de recorrência (n, m, m) de um lote de trajetórias (n, m, d):
+    R[i, j] = |x_i - x_j| <= raio da janela. As distâncias são acumuladas
+    uma dimensão por vez, sem o tensor (n, m, m, d).
+    """
+    embedded = np.asarray(embedded, dtype=np.float32)
+    count, points, dimension = embedded.shape
+    dist2 = np.zeros((count, points, points), dtype=np.float32)
+    for k in range(dimension):
+        coordinate = embedded[:, :, k]
+        difference = coordinate[:, :, None] - coordinate[:, None, :]
+        dist2 += difference * difference
+    radius = np.broadcast_to(np.asarray(radius, dtype=np.float32), (count,))
+    return dist2 <= (radius * radius)[:, None, None]
+
+
+def _diagonal_lines(recurrence):
+    """
+    Comprimentos das linhas diagonais acima da diagonal principal, de todas
+    as matrizes do lote de uma vez. Retorna (índice da janela, comprimento).
+    """
+    count, points, _ = recurrence.shape
+    rows = np.arange(points)[None, :]
+    offsets = np.arange(1, points)[:, None]
+    cols = rows + offsets
+    valid = cols < points
+    # cada diagonal vira uma linha, com False nas pontas para as
+    # sequências não atravessarem de uma diagonal para a outra
+    diagonals = np.zeros((count, points - 1, points + 2), dtype=np.int8)
+    diagonals[:, :, 1:-1] = recurrence[:, rows, np.minimum(cols, points - 1)] & valid
+    steps = np.diff(diagonals.reshape(count, -1), axis=1)
+    window, starts = np.nonzero(steps == 1)
+    _, ends = np.nonzero(steps == -1)
+    return window, ends - starts
+
+
+def rqa_metrics(windows, dimension=3, delay=1, radius=0.2, min_line=2, points=128, chunk=64):
+    """
+    RR, DET e entropia das linhas diagonais de cada janela (n, amostras).
+
+    As janelas são reduzidas a points amostras (média em blocos) antes do
+    embedding, e o raio é radius vezes o desvio padrão da janela. O lote é
+    processado em blocos de chunk janelas para limitar a memória.
+    A diagonal principal não é contada.
+    """
+    windows = decimate_windows(windows, points)
+    count = windows.shape[0]
+    results = {name: np.zeros(count, dtype=np.float32) for name in ('rr', 'det', 'entropy')}
+
+    for start in range(0, count, chunk):
+        block = windows[start:start + chunk]
+        embedded = takens_embedding(block, dimension, delay)
+        recurrence = recurrence_matrices(embedded, radius * block.std(axis=1))
+        n, m, _ = recurrence.shape
+
+        recurrent = recurrence.sum(axis=(1, 2)) - m
+        rr = recurrent / (m * m - m)
+
+        window, lengths = _diagonal_lines(recurrence)
+        long = lengths >= min_line
+        # a matriz é simétrica: o triângulo superior tem metade dos pontos
+        in_lines = np.bincount(window[long], weights=lengths[long], minlength=n)
+        det = np.divide(in_lines, recurrent / 2, out=np.zeros(n), where=recurrent > 0)
+
+        histogram = np.bincount(window[long] * (m + 1) + lengths[long],
+                                minlength=n * (m + 1)).reshape(n, m + 1).astype(np.float64)
+        totals = histogram.sum(axis=1, keepdims=True)
+        probabilities = np.divide(histogram, totals, out=np.zeros_like(histogram), where=totals > 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            entropy = 0.0 - np.nansum(probabilities * np.log(probabilities), axis=1)
+
+        results['rr'][start:start + n] = rr
+        results['det'][start:start + n] = det
+        results['entropy'][start:start + n] = entropy
+    return results
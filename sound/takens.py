@@ -1,3 +1,31 @@
-""" 
+"""
 Embedding de Takens
-"""
\ No newline at end of file
+"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def takens_embedding(signal, dimension=3, delay=1):
+    """
+    Vetores de atraso [x(t), x(t+τ), ..., x(t+(m-1)τ)] de um sinal ou de
+    várias janelas de uma vez (último eixo = tempo), como view sem cópia.
+    Saída: (..., n_pontos, dimension).
+    """
+    signal = np.asarray(signal)
+    span = (dimension - 1) * delay + 1
+    if signal.shape[-1] < span:
+        raise ValueError(f"Janela curta demais para dimensão {dimension} e atraso {delay}")
+    return sliding_window_view(signal, span, axis=-1)[..., ::delay]
+
+
+def decimate_windows(windows, points):
+    """
+    Reduz cada janela a no máximo points amostras por média em blocos
+    (antes do embedding, para limitar o tamanho da matriz de recorrência)
+    """
+    windows = np.atleast_2d(np.asarray(windows, dtype=np.float32))
+    factor = max(1, windows.shape[1] // points)
+    if factor == 1:
+        return windows
+    usable = windows.shape[1] // factor * factor
+    return windows[:, :usable].reshape(windows.shape[0], -1, factor).mean(axis=2)
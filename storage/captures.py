@@ -0,0 +1,67 @@
+"""
+Gravação das capturas brutas em disco e registro no banco de inspeções
+"""
+import os
+import time
+
+import numpy as np
+
+CAPTURES_DIR = "captures"
+DATABASE_NAME = "inspection.db"
+
+
+def open_inspection_database(directory=CAPTURES_DIR):
+    from storage.inspection_db import InspectionDatabase
+
+    os.makedirs(directory, exist_ok=True)
+    return InspectionDatabase(os.path.join(directory, DATABASE_NAME))
+
+
+def depth_metrics(depth_frame, meta=None, surface_analysis=None):
+    """
+    Métricas de profundidade de um ponto de varredura (colunas DEPTH_FIELDS)
+    """
+    from vision.acquisition import meta_depth_range
+    from vision.depth_stream import analyze_depth_quality
+
+    if meta is not None:
+        quality = analyze_depth_quality(depth_frame, *meta_depth_range(meta))
+    else:
+        quality = analyze_depth_quality(depth_frame)
+    metrics = {
+        'mean_depth': quality['mean_depth'],
+        'depth_std': quality['depth_std'],
+        'validity_ratio': quality['validity_ratio'],
+    }
+    if surface_analysis is not None:
+        metrics['rugosity'] = float(np.nanmean(surface_analysis['rugosity']))
+        metrics['curvature'] = float(np.nanmean(surface_analysis['curvature']))
+    return metrics
+
+
+def record_capture(database, session_id, rgb_frame, depth_frame, meta=None, device_id=None,
+                   pose=None, acoustic=None, surface_analysis=None, directory=CAPTURES_DIR):
+    """
+    Grava RGB (.png) e profundidade (.npy, uint16 mm) da sessão e enfileira
+    o ponto no banco com as métricas. Retorna o id do ponto.
+    """
+    import cv2
+
+    session_dir = os.path.join(directory, f"sessao_{session_id:04d}")
+    os.makedirs(session_dir, exist_ok=True)
+    timestamp = time.time()
+    stem = os.path.join(session_dir, time.strftime("%Y%m%d_%H%M%S", time.localtime(timestamp))
+                        + f"_{int(timestamp * 1000) % 1000:03d}")
+
+    captures = {}
+    if rgb_frame is not None:
+        cv2.imwrite(stem + "_rgb.png", rgb_frame)
+        captures['rgb'] = stem + "_rgb.png"
+    metrics = None
+    if depth_frame is not None:
+        np.save(stem + "_depth.npy", depth_frame)
+        captures['depth'] = stem + "_depth.npy"
+        metrics = depth_metrics(depth_frame, meta, surface_analysis)
+
+    return database.add_point(session_id, pose=pose, depth=metrics, acoustic=acoustic,
+                              captures=captures, device_id=device_id, timestamp=timestamp)
@@ -0,0 +1,274 @@
+"""
+Banco de inspeções em SQLite: sessões, pontos de varredura com pose,
+métricas de profundidade e acústicas e caminhos das capturas brutas
+"""
+import itertools
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id          INTEGER PRIMARY KEY,
+    part        TEXT,
+    started_at  REAL NOT NULL,
+    ended_at    REAL,
+    notes       TEXT
+);
+
+CREATE TABLE IF NOT EXISTS scan_points (
+    id              INTEGER PRIMARY KEY,
+    session_id      INTEGER NOT NULL REFERENCES sessions(id),
+    t               REAL NOT NULL,
+    device_id       TEXT,
+    -- pose do efetuador (mm, graus)
+    x REAL, y REAL, z REAL,
+    rx REAL, ry REAL, rz REAL,
+    -- métricas de profundidade
+    mean_depth      REAL,
+    depth_std       REAL,
+    validity_ratio  REAL,
+    rugosity        REAL,
+    curvature       REAL,
+    -- métricas acústicas
+    rr              REAL,
+    det             REAL,
+    entropy         REAL,
+    anomaly_score   REAL
+);
+
+CREATE TABLE IF NOT EXISTS captures (
+    id          INTEGER PRIMARY KEY,
+    point_id    INTEGER NOT NULL REFERENCES scan_points(id),
+    kind        TEXT NOT NULL,
+    path        TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_sessions_part ON sessions(part, started_at);
+CREATE INDEX IF NOT EXISTS idx_points_session_time ON scan_points(session_id, t);
+CREATE INDEX IF NOT EXISTS idx_points_time ON scan_points(t);
+CREATE INDEX IF NOT EXISTS idx_points_session_det ON scan_points(session_id, det);
+CREATE INDEX IF NOT EXISTS idx_points_position ON scan_points(x, y, z);
+CREATE INDEX IF NOT EXISTS idx_captures_point ON captures(point_id);
+"""
+
+POSE_FIELDS = ('x', 'y', 'z', 'rx', 'ry', 'rz')
+DEPTH_FIELDS = ('mean_depth', 'depth_std', 'validity_ratio', 'rugosity', 'curvature')
+ACOUSTIC_FIELDS = ('rr', 'det', 'entropy', 'anomaly_score')
+POINT_COLUMNS = ('id', 'session_id', 't', 'device_id') + POSE_FIELDS + DEPTH_FIELDS + ACOUSTIC_FIELDS
+
+_INSERT_POINT = (f"INSERT INTO scan_points ({', '.join(POINT_COLUMNS)}) "
+                 f"VALUES ({', '.join('?' * len(POINT_COLUMNS))})")
+_INSERT_CAPTURE = "INSERT INTO captures (point_id, kind, path) VALUES (?, ?, ?)"
+
+_STOP = object()
+
+
+def _connect(path):
+    connection = sqlite3.connect(path, check_same_thread=False)
+    connection.row_factory = sqlite3.Row
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.execute("PRAGMA foreign_keys=ON")
+    return connection
+
+
+class InspectionDatabase:
+    """
+    Escritas passam por uma fila e são gravadas por uma thread dedicada,
+    em lotes (executemany, uma transação por lote) com o banco em modo WAL:
+    quem chama add_point() nunca espera pelo disco.
+
+    Os ids dos pontos são atribuídos na hora da chamada (escritor único),
+    para que pontos e capturas entrem no mesmo lote. Consultas usam uma
+    conexão de leitura separada, que o WAL permite rodar junto com a escrita.
+    """
+
+    def __init__(self, path, batch_size=2000, flush_interval=0.5):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._writer = _connect(path)
+        self._writer.executescript(SCHEMA)
+        self._writer.commit()
+        last_id = self._writer.execute("SELECT COALESCE(MAX(id), 0) FROM scan_points").fetchone()[0]
+        self._point_ids = itertools.count(last_id + 1)
+        self._id_lock = threading.Lock()
+
+        self._reader = _connect(path)
+        self._reader_lock = threading.Lock()
+
+        self._queue = queue.Queue()
+        self.rows_written = 0
+        self.batches_written = 0
+        self._thread = threading.Thread(target=self._write_loop, name="inspection-db", daemon=True)
+        self._thread.start()
+
+    # ---------- escrita (não bloqueante) ----------
+
+    def start_session(self, part=None, notes=None):
+        """
+        Cria uma sessão e retorna o id (espera só por esta transação)
+        """
+        future = Future()
+        self._queue.put(('session', (part, time.time(), notes), future))
+        return future.result()
+
+    def end_session(self, session_id):
+        self._queue.put(('end_session', (time.time(), session_id), None))
+
+    def add_point(self, session_id, pose=None, depth=None, acoustic=None, captures=None,
+                  device_id=None, timestamp=None):
+        """
+        Enfileira um ponto de varredura e retorna o id atribuído.
+        pose: (x, y, z, rx, ry, rz) ou dict; depth/acoustic: dicts com as
+        métricas de DEPTH_FIELDS/ACOUSTIC_FIELDS; captures: {tipo: caminho}
+        """
+        with self._id_lock:
+            point_id = next(self._point_ids)
+
+        if pose is not None and not isinstance(pose, dict):
+            pose = dict(zip(POSE_FIELDS, pose))
+        values = [point_id, session_id, timestamp or time.time(), device_id]
+        for fields, metrics in ((POSE_FIELDS, pose), (DEPTH_FIELDS, depth), (ACOUSTIC_FIELDS, acoustic)):
+            metrics = metrics or {}
+            values.extend(_as_float(metrics.get(field)) for field in fields)
+
+        self._queue.put(('point', tuple(values), None))
+        for kind, path in (captures or {}).items():
+            self._queue.put(('capture', (point_id, kind, str(path)), None))
+        return point_id
+
+    def flush(self, timeout=None):
+        """
+        Espera até tudo que foi enfileirado antes desta chamada estar gravado
+        """
+        future = Future()
+        self._queue.put(('flush', None, future))
+        future.result(timeout)
+
+    def close(self):
+        self._queue.put((_STOP, None, None))
+        self._thread.join()
+        self._writer.close()
+        self._reader.close()
+
+    def _write_loop(self):
+        running = True
+        while running:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            # junta o que já está na fila em um único lote
+            batch = [first]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            points, captures = [], []
+            for kind, values, future in batch:
+                if kind is _STOP:
+                    running = False
+                elif kind == 'point':
+                    points.append(values)
+                elif kind == 'capture':
+                    captures.append(values)
+                else:
+                    # sessões e flush: grava o lote pendente antes, para manter a ordem
+                    self._write_batch(points, captures)
+                    points, captures = [], []
+                    self._run_control(kind, values, future)
+            self._write_batch(points, captures)
+
+    def _write_batch(self, points, captures):
+        if not points and not captures:
+            return
+        try:
+            with self._writer:
+                if points:
+                    self._writer.executemany(_INSERT_POINT, points)
+                if captures:
+                    self._writer.executemany(_INSERT_CAPTURE, captures)
+            self.rows_written += len(points) + len(captures)
+            self.batches_written += 1
+        except sqlite3.Error as e:
+            print(f"[ERROR] Falha ao gravar {len(points)} ponto(s) no banco de inspeções: {e}")
+
+    def _run_control(self, kind, values, future):
+        try:
+            result = None
+            with self._writer:
+                if kind == 'session':
+                    cursor = self._writer.execute(
+                        "INSERT INTO sessions (part, started_at, notes) VALUES (?, ?, ?)", values)
+                    result = cursor.lastrowid
+                elif kind == 'end_session':
+                    self._writer.execute("UPDATE sessions SET ended_at = ? WHERE id = ?", values)
+            if future is not None:
+                future.set_result(result)
+        except sqlite3.Error as e:
+            print(f"[ERROR] Erro no banco de inspeções: {e}")
+            if future is not None:
+                future.set_exception(e)
+
+    # ---------- consultas ----------
+
+    def query_points(self, part=None, session_id=None, min_det=None, since=None, until=None,
+                     bbox=None, limit=None):
+        """
+        Pontos filtrados por peça, sessão, DET mínimo, intervalo de tempo e
+        caixa de posição ((x0, y0, z0), (x1, y1, z1)). Retorna lista de dicts.
+        """
+        clauses, params = [], []
+        if part is not None:
+            clauses.append("p.session_id IN (SELECT id FROM sessions WHERE part = ?)")
+            params.append(part)
+        if session_id is not None:
+            clauses.append("p.session_id = ?")
+            params.append(session_id)
+        if min_det is not None:
+            clauses.append("p.det > ?")
+            params.append(min_det)
+        if since is not None:
+            clauses.append("p.t >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("p.t < ?")
+            params.append(until)
+        if bbox is not None:
+            low, high = bbox
+            for axis, lo, hi in zip('xyz', low, high):
+                clauses.append(f"p.{axis} BETWEEN ? AND ?")
+                params.extend((lo, hi))
+
+        sql = "SELECT p.* FROM scan_points p"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY p.t"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self._fetch(sql, params)
+
+    def captures_for(self, point_id):
+        return self._fetch("SELECT kind, path FROM captures WHERE point_id = ?", (point_id,))
+
+    def sessions(self, part=None):
+        if part is None:
+            return self._fetch("SELECT * FROM sessions ORDER BY started_at", ())
+        return self._fetch("SELECT * FROM sessions WHERE part = ? ORDER BY started_at", (part,))
+
+    def _fetch(self, sql, params):
+        with self._reader_lock:
+            return [dict(row) for row in self._reader.execute(sql, params)]
+
+
+def _as_float(value):
+    return None if value is None else float(value)
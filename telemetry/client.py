@@ -0,0 +1,133 @@
+"""
+Cliente de referência da telemetria: recebe, decodifica e exibe os streams.
+
+Exemplo:
+    python -m telemetry.client --host 192.168.0.20 --port 5600
+"""
+import argparse
+import socket
+import time
+
+from telemetry.codec import HEADER, KIND_DEPTH, KIND_RGB, MAGIC, decode_depth, decode_rgb
+from telemetry.server import DEFAULT_PORT, STREAM_NAMES
+
+
+class TelemetryClient:
+    """
+    Conexão com um TelemetryServer. receive() bloqueia até a próxima
+    mensagem e retorna um dict com o frame já decodificado.
+    """
+
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, timeout=5.0):
+        self.connection = socket.create_connection((host, port), timeout=timeout)
+        # cena parada não gera frames: a espera por mensagens não tem prazo
+        self.connection.settimeout(None)
+        self.received_bytes = {kind: 0 for kind in STREAM_NAMES}
+        self.received_frames = {kind: 0 for kind in STREAM_NAMES}
+        self.decode_ms = {kind: 0.0 for kind in STREAM_NAMES}
+        self.latency_ms = {kind: 0.0 for kind in STREAM_NAMES}
+        self._started = time.perf_counter()
+
+    def _read_exactly(self, size):
+        buffer = bytearray(size)
+        view = memoryview(buffer)
+        received = 0
+        while received < size:
+            count = self.connection.recv_into(view[received:])
+            if count == 0:
+                raise ConnectionError("Servidor de telemetria encerrou a conexão")
+            received += count
+        return buffer
+
+    def receive(self):
+        magic, kind, device, seq, timestamp, length = HEADER.unpack(self._read_exactly(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError("Mensagem de telemetria inválida")
+        payload = self._read_exactly(length)
+
+        start = time.perf_counter()
+        message = {'kind': STREAM_NAMES.get(kind), 'device': device, 'seq': seq,
+                   'timestamp': timestamp}
+        if kind == KIND_DEPTH:
+            message['frame'], message['depth_range'] = decode_depth(payload)
+        elif kind == KIND_RGB:
+            message['frame'] = decode_rgb(payload)
+        else:
+            message['frame'] = None
+
+        if kind in STREAM_NAMES:
+            self.decode_ms[kind] = (time.perf_counter() - start) * 1000
+            # captura -> decodificado (o servidor envia o instante da captura);
+            # entre máquinas, só faz sentido com os relógios sincronizados
+            self.latency_ms[kind] = (time.time() - timestamp) * 1000
+            self.received_bytes[kind] += HEADER.size + length
+            self.received_frames[kind] += 1
+        return message
+
+    def __iter__(self):
+        while True:
+            yield self.receive()
+
+    def stats(self):
+        elapsed = max(time.perf_counter() - self._started, 1e-6)
+        return {
+            STREAM_NAMES[kind]: {
+                'frames': self.received_frames[kind],
+                'fps': self.received_frames[kind] / elapsed,
+                'kbps': self.received_bytes[kind] * 8 / 1000 / elapsed,
+                'decode_ms': self.decode_ms[kind],
+                'latency_ms': self.latency_ms[kind],
+            }
+            for kind in STREAM_NAMES
+        }
+
+    def close(self):
+        self.connection.close()
+
+
+def show_telemetry(host, port):
+    import cv2
+
+    from gui.plot_utils import depth_colormap
+    from vision.quality import DEPTH_MIN, DEPTH_MAX
+
+    client = TelemetryClient(host, port)
+    print(f"[INFO] Conectado à telemetria em {host}:{port} (q para sair)")
+    last_report = time.perf_counter()
+    try:
+        for message in client:
+            frame = message['frame']
+            if frame is None:
+                continue
+            if message['kind'] == 'depth':
+                min_depth, max_depth = message['depth_range']
+                if max_depth <= min_depth:
+                    min_depth, max_depth = DEPTH_MIN, DEPTH_MAX
+                frame = depth_colormap(frame, min_depth, max_depth)
+            cv2.imshow(f"{message['kind']} {message['device']}", frame)
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                break
+
+            if time.perf_counter() - last_report > 2.0:
+                last_report = time.perf_counter()
+                for name, stream in client.stats().items():
+                    print(f"[INFO] {name}: {stream['fps']:.1f} fps, {stream['kbps']:.0f} kbit/s, "
+                          f"decodificação {stream['decode_ms']:.1f} ms, "
+                          f"latência {stream['latency_ms']:.0f} ms")
+    except (ConnectionError, OSError) as e:
+        print(f"[INFO] {e}")
+    finally:
+        client.close()
+        cv2.destroyAllWindows()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cliente de telemetria do RAISE")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+    show_telemetry(args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Codificação dos frames de telemetria: profundidade em tiles de 16 bits
+delta-codificados e comprimidos sem perda, RGB em JPEG
+"""
+import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+MAGIC = b"RBT1"
+KIND_DEPTH = 1
+KIND_RGB = 2
+
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+
+# magic, tipo, dispositivo, sequência, instante da captura (time.time()), tamanho do payload
+HEADER = struct.Struct("<4sBBIdI")
+# altura, largura, lado do tile, compressor, faixa de trabalho (mm)
+DEPTH_HEADER = struct.Struct("<HHHBHH")
+TILE_LENGTH = struct.Struct("<I")
+
+# zlib e zstd liberam o GIL: os tiles são comprimidos em paralelo
+_tile_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="telemetry-tile")
+
+
+def default_codec():
+    return CODEC_ZSTD if zstandard is not None else CODEC_ZLIB
+
+
+def _compressor(codec, level):
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard não está instalado")
+        return zstandard.ZstdCompressor(level=level).compress
+    return lambda data: zlib.compress(data, level)
+
+
+def _decompressor(codec):
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard não está instalado")
+        return zstandard.ZstdDecompressor().decompress
+    return zlib.decompress
+
+
+def delta_planes(tile):
+    """
+    Delta horizontal (preditor = pixel à esquerda) em aritmética de 16 bits
+    com zigue-zague, separado em plano alto e plano baixo. Em superfícies
+    contínuas o plano alto é quase todo zero e comprime muito bem.
+    """
+    tile = tile.astype(np.uint16, copy=False)
+    delta = np.empty(tile.shape, dtype=np.int16)
+    delta[:, 0] = tile[:, 0].view(np.int16)
+    np.subtract(tile[:, 1:], tile[:, :-1], out=delta[:, 1:].view(np.uint16))
+    zigzag = ((delta << 1) ^ (delta >> 15)).view(np.uint16)
+    planes = np.empty((2,) + tile.shape, dtype=np.uint8)
+    np.right_shift(zigzag, 8, out=planes[0], casting='unsafe')
+    np.bitwise_and(zigzag, 0xFF, out=planes[1], casting='unsafe')
+    return planes.tobytes()
+
+
+def undo_delta_planes(data, shape):
+    planes = np.frombuffer(data, dtype=np.uint8).reshape((2,) + shape)
+    zigzag = (planes[0].astype(np.uint16) << 8) | planes[1]
+    delta = (zigzag >> 1) ^ -(zigzag & 1)
+    # soma acumulada módulo 2^16 desfaz o delta
+    return np.cumsum(delta, axis=1, dtype=np.uint16)
+
+
+def _tiles(height, width, tile):
+    for top in range(0, height, tile):
+        for left in range(0, width, tile):
+            yield slice(top, min(top + tile, height)), slice(left, min(left + tile, width))
+
+
+def encode_depth(depth_frame, depth_range=(0, 0), tile=128, codec=None, level=1):
+    """
+    Payload sem perda de um frame uint16: cabeçalho + tiles independentes
+    (tamanho + dados comprimidos), em ordem de varredura
+    """
+    codec = default_codec() if codec is None else codec
+    compress = _compressor(codec, level)
+    depth_frame = np.asarray(depth_frame)
+    height, width = depth_frame.shape
+
+    def encode_tile(region):
+        return compress(delta_planes(depth_frame[region]))
+
+    chunks = list(_tile_executor.map(encode_tile, _tiles(height, width, tile)))
+    parts = [DEPTH_HEADER.pack(height, width, tile, codec, *(int(v) for v in depth_range))]
+    for chunk in chunks:
+        parts.append(TILE_LENGTH.pack(len(chunk)))
+        parts.append(chunk)
+    return b"".join(parts)
+
+
+def decode_depth(payload):
+    """
+    Inverso de encode_depth. Retorna (frame uint16, faixa de trabalho)
+    """
+    height, width, tile, codec, min_depth, max_depth = DEPTH_HEADER.unpack_from(payload)
+    decompress = _decompressor(codec)
+    frame = np.empty((height, width), dtype=np.uint16)
+    offset = DEPTH_HEADER.size
+    for rows, cols in _tiles(height, width, tile):
+        (length,) = TILE_LENGTH.unpack_from(payload, offset)
+        offset += TILE_LENGTH.size
+        data = decompress(payload[offset:offset + length])
+        offset += length
+        shape = (rows.stop - rows.start, cols.stop - cols.start)
+        frame[rows, cols] = undo_delta_planes(data, shape)
+    return frame, (min_depth, max_depth)
+
+
+def encode_rgb(rgb_frame, quality=80):
+    import cv2
+
+    ok, data = cv2.imencode(".jpg", rgb_frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise RuntimeError("Falha ao codificar frame RGB em JPEG")
+    return data.tobytes()
+
+
+def decode_rgb(payload):
+    import cv2
+
+    return cv2.imdecode(np.frombuffer(payload, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+def pack_header(kind, device, seq, timestamp, length):
+    return HEADER.pack(MAGIC, kind, device, seq & 0xFFFFFFFF, timestamp, length)
@@ -0,0 +1,306 @@
+"""
+Servidor TCP de telemetria: transmite os frames do loop da câmera para
+clientes de monitoramento remoto
+"""
+import os
+import socket
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from telemetry.codec import (KIND_DEPTH, KIND_RGB, default_codec, encode_depth, encode_rgb,
+                             pack_header)
+
+# só a máquina local por padrão; "0.0.0.0" expõe os frames para a rede
+DEFAULT_HOST = os.environ.get("RAISE_TELEMETRY_HOST", "127.0.0.1")
+DEFAULT_PORT = 5600
+STREAM_NAMES = {KIND_DEPTH: 'depth', KIND_RGB: 'rgb'}
+
+
+class _ClientChannel:
+    """
+    Um cliente conectado: guarda só a mensagem mais recente de cada tipo.
+    Se o cliente ainda não terminou de receber a anterior, ela é substituída
+    (e contada como descartada) em vez de formar fila.
+    """
+
+    def __init__(self, connection, address, on_close):
+        self.connection = connection
+        self.address = address
+        self._on_close = on_close
+        self._pending = {}
+        self._condition = threading.Condition()
+        self._closed = False
+        self.dropped = {kind: 0 for kind in STREAM_NAMES}
+        self.sent_bytes = {kind: 0 for kind in STREAM_NAMES}
+        self.sent_frames = {kind: 0 for kind in STREAM_NAMES}
+        self._thread = threading.Thread(target=self._send_loop, name=f"telemetry-{address}",
+                                        daemon=True)
+        self._thread.start()
+
+    def offer(self, kind, header, payload):
+        with self._condition:
+            if kind in self._pending:
+                self.dropped[kind] += 1
+            self._pending[kind] = (header, payload)
+            self._condition.notify()
+
+    def _send_loop(self):
+        try:
+            while True:
+                with self._condition:
+                    while not self._pending and not self._closed:
+                        self._condition.wait()
+                    if self._closed:
+                        return
+                    messages, self._pending = self._pending, {}
+                for kind, (header, payload) in messages.items():
+                    self.connection.sendall(header)
+                    self.connection.sendall(payload)
+                    self.sent_bytes[kind] += len(header) + len(payload)
+                    self.sent_frames[kind] += 1
+        except OSError as e:
+            print(f"[INFO] Cliente de telemetria {self.address} desconectado: {e}")
+        finally:
+            self.close()
+
+    def close(self):
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+        try:
+            self.connection.close()
+        except OSError:
+            pass
+        self._on_close(self)
+
+
+class TelemetryServer:
+    """
+    publish() é chamado pelo loop da câmera e só copia os frames para um
+    slot "último frame": a codificação (profundidade em tiles sem perda,
+    RGB em JPEG) roda numa thread própria, uma vez por frame para todos os
+    clientes. Sem clientes conectados nada é copiado nem codificado.
+
+    A contrapressão é do tipo "o mais recente vence" em dois níveis: frames
+    publicados enquanto o codificador está ocupado e mensagens ainda não
+    enviadas a um cliente lento são substituídas pelas novas.
+
+    As taxas de envio são calculadas sobre os últimos rate_window segundos,
+    a partir de amostras que a thread de codificação registra: stats() só
+    lê, e vários leitores não interferem uns nos outros.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, jpeg_quality=80, tile=128,
+                 codec=None, level=1, smoothing=0.1, rate_window=2.0):
+        self.host = host
+        self.port = port
+        self.jpeg_quality = jpeg_quality
+        self.tile = tile
+        self.codec = default_codec() if codec is None else codec
+        self.level = level
+        self.smoothing = smoothing
+        self.rate_window = rate_window
+
+        self._socket = None
+        self._clients = []
+        self._clients_lock = threading.Lock()
+        self._slot = {}
+        self._slot_condition = threading.Condition()
+        self._running = False
+        self._threads = []
+
+        self.published = {kind: 0 for kind in STREAM_NAMES}
+        self.skipped = {kind: 0 for kind in STREAM_NAMES}
+        self.encoded = {kind: 0 for kind in STREAM_NAMES}
+        self.raw_bytes = {kind: 0 for kind in STREAM_NAMES}
+        self.encoded_bytes = {kind: 0 for kind in STREAM_NAMES}
+        self.encode_ms = {kind: 0.0 for kind in STREAM_NAMES}
+        self._closed_clients = {'dropped': {kind: 0 for kind in STREAM_NAMES},
+                                'sent_bytes': {kind: 0 for kind in STREAM_NAMES}}
+        # (instante, bytes enviados por stream), amostrados a cada rate_window / 8
+        self._rate_history = deque(maxlen=32)
+        self._rate_history.append((time.perf_counter(), {kind: 0 for kind in STREAM_NAMES}))
+
+    # ---------- ciclo de vida ----------
+
+    def start(self):
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind((self.host, self.port))
+        self._socket.listen()
+        # porta 0: o sistema escolhe uma livre
+        self.port = self._socket.getsockname()[1]
+        self._running = True
+        for target, name in ((self._accept_loop, "telemetry-accept"),
+                             (self._encode_loop, "telemetry-encoder")):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        print(f"[INFO] Servidor de telemetria ouvindo em {self.host}:{self.port}")
+        return self
+
+    def close(self):
+        self._running = False
+        with self._slot_condition:
+            self._slot_condition.notify()
+        try:
+            self._socket.close()
+        except (OSError, AttributeError):
+            pass
+        with self._clients_lock:
+            clients = list(self._clients)
+        for client in clients:
+            client.close()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        self._threads = []
+
+    @property
+    def client_count(self):
+        with self._clients_lock:
+            return len(self._clients)
+
+    def _accept_loop(self):
+        while self._running:
+            try:
+                connection, address = self._socket.accept()
+            except OSError:
+                break
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            address = f"{address[0]}:{address[1]}"
+            with self._clients_lock:
+                self._clients.append(_ClientChannel(connection, address, self._remove_client))
+            print(f"[INFO] Cliente de telemetria conectado: {address}")
+
+    def _remove_client(self, client):
+        with self._clients_lock:
+            if client not in self._clients:
+                return
+            self._clients.remove(client)
+            for kind in STREAM_NAMES:
+                self._closed_clients['dropped'][kind] += client.dropped[kind]
+                self._closed_clients['sent_bytes'][kind] += client.sent_bytes[kind]
+
+    # ---------- publicação e codificação ----------
+
+    def publish(self, device=0, rgb=None, depth=None, depth_range=(0, 0), timestamp=None):
+        """
+        Oferece os frames mais recentes de um dispositivo. Não bloqueia: os
+        frames (que podem ser buffers reaproveitados) são copiados e a
+        codificação acontece na thread do servidor. timestamp é o instante
+        da captura no relógio de parede (padrão: agora).
+        """
+        if not self._running or not self.client_count:
+            return
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._slot_condition:
+            for kind, frame, extra in ((KIND_RGB, rgb, None), (KIND_DEPTH, depth, depth_range)):
+                if frame is None:
+                    continue
+                self.published[kind] += 1
+                if (kind, device) in self._slot:
+                    self.skipped[kind] += 1
+                self._slot[(kind, device)] = (np.array(frame), extra, timestamp, self.published[kind])
+            self._slot_condition.notify()
+
+    def _encode_loop(self):
+        while True:
+            with self._slot_condition:
+                while not self._slot and self._running:
+                    self._slot_condition.wait()
+                if not self._running:
+                    return
+                slot, self._slot = self._slot, {}
+
+            for (kind, device), (frame, extra, timestamp, seq) in slot.items():
+                start = time.perf_counter()
+                try:
+                    if kind == KIND_DEPTH:
+                        payload = encode_depth(frame, extra, self.tile, self.codec, self.level)
+                    else:
+                        payload = encode_rgb(frame, self.jpeg_quality)
+                except Exception as e:
+                    print(f"[WARNING] Erro ao codificar frame de telemetria: {e}")
+                    continue
+                elapsed_ms = (time.perf_counter() - start) * 1000
+
+                self.encoded[kind] += 1
+                self.raw_bytes[kind] += frame.nbytes
+                self.encoded_bytes[kind] += len(payload)
+                self.encode_ms[kind] += self.smoothing * (elapsed_ms - self.encode_ms[kind])
+
+                header = pack_header(kind, device, seq, timestamp, len(payload))
+                with self._clients_lock:
+                    clients = list(self._clients)
+                for client in clients:
+                    client.offer(kind, header, payload)
+            self._sample_rates()
+
+    def _sample_rates(self):
+        now = time.perf_counter()
+        if now - self._rate_history[-1][0] >= self.rate_window / 8:
+            self._rate_history.append((now, self._sent_totals()[1]))
+
+    def _sent_totals(self):
+        """
+        Clientes conectados e bytes enviados/mensagens descartadas por stream,
+        incluindo os clientes já desconectados
+        """
+        with self._clients_lock:
+            clients = list(self._clients)
+            sent = {kind: self._closed_clients['sent_bytes'][kind] for kind in STREAM_NAMES}
+            dropped = {kind: self._closed_clients['dropped'][kind] for kind in STREAM_NAMES}
+        for client in clients:
+            for kind in STREAM_NAMES:
+                sent[kind] += client.sent_bytes[kind]
+                dropped[kind] += client.dropped[kind]
+        return clients, sent, dropped
+
+    # ---------- estatísticas ----------
+
+    def stats(self):
+        """
+        Por stream: taxa de envio (kbit/s, somando os clientes, nos últimos
+        rate_window segundos), razão de compressão, latência de codificação e
+        frames descartados. Não altera o estado do servidor.
+        """
+        clients, sent, dropped = self._sent_totals()
+
+        # amostra mais antiga dentro da janela (ou a mais recente antes dela)
+        now = time.perf_counter()
+        history = list(self._rate_history)
+        reference_time, reference_sent = history[-1]
+        for sample_time, sample_sent in history:
+            if sample_time >= now - self.rate_window:
+                reference_time, reference_sent = sample_time, sample_sent
+                break
+        elapsed = max(now - reference_time, 1e-6)
+
+        streams = {}
+        for kind, name in STREAM_NAMES.items():
+            streams[name] = {
+                'frames': self.encoded[kind],
+                'kbps': (sent[kind] - reference_sent[kind]) * 8 / 1000 / elapsed,
+                'compression_ratio': (self.raw_bytes[kind] / self.encoded_bytes[kind]
+                                      if self.encoded_bytes[kind] else 0.0),
+                'encode_ms': self.encode_ms[kind],
+                'skipped': self.skipped[kind],
+                'dropped': dropped[kind],
+            }
+        return {'clients': len(clients), 'streams': streams}
+
+    def summary(self):
+        """
+        Uma linha de status por stream
+        """
+        stats = self.stats()
+        parts = [f"{stats['clients']} cliente(s)"]
+        for name, stream in stats['streams'].items():
+            parts.append(f"{name}: {stream['kbps']:.0f} kbit/s, {stream['compression_ratio']:.1f}x, "
+                         f"{stream['encode_ms']:.1f} ms, {stream['skipped'] + stream['dropped']} descartados")
+        return " | ".join(parts)
@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+from sound.anomaly import BaselineModel, acoustic_features, score_signal
+from sound.fft_winding import sliding_windows
+from sound.rqa import rqa_metrics
+
+
+def naive_rqa(window, dimension, delay, radius, min_line):
+    """
+    RQA direto da definição: matriz de recorrência completa e diagonais
+    percorridas uma a uma
+    """
+    x = np.asarray(window, dtype=np.float64)
+    m = len(x) - (dimension - 1) * delay
+    embedded = np.stack([x[i * delay:i * delay + m] for i in range(dimension)], axis=1)
+    distances = np.linalg.norm(embedded[:, None, :] - embedded[None, :, :], axis=2)
+    recurrence = distances <= radius * x.std()
+
+    recurrent = recurrence.sum() - m
+    lengths = []
+    for offset in range(1, m):
+        run = 0
+        for value in list(np.diagonal(recurrence, offset)) + [False]:
+            if value:
+                run += 1
+            else:
+                if run >= min_line:
+                    lengths.append(run)
+                run = 0
+    det = sum(lengths) / (recurrent / 2) if recurrent else 0.0
+    if lengths:
+        _, counts = np.unique(lengths, return_counts=True)
+        p = counts / counts.sum()
+        entropy = float(-(p * np.log(p)).sum())
+    else:
+        entropy = 0.0
+    return recurrent / (m * m - m), det, entropy
+
+
+def test_rqa_matches_naive_recurrence_matrix():
+    rng = np.random.default_rng(3)
+    t = np.arange(96)
+    windows = np.stack([
+        np.sin(2 * np.pi * t / 16),
+        np.sin(2 * np.pi * t / 11) + 0.3 * rng.standard_normal(96),
+        rng.standard_normal(96),
+    ]).astype(np.float32)
+
+    metrics = rqa_metrics(windows, dimension=3, delay=2, radius=0.8, min_line=2, points=128, chunk=2)
+    for i, window in enumerate(windows):
+        rr, det, entropy = naive_rqa(window, dimension=3, delay=2, radius=0.8, min_line=2)
+        assert metrics['rr'][i] == pytest.approx(rr, abs=1e-5)
+        assert metrics['det'][i] == pytest.approx(det, abs=1e-5)
+        assert metrics['entropy'][i] == pytest.approx(entropy, abs=1e-5)
+
+
+def test_incremental_baseline_matches_numpy():
+    rng = np.random.default_rng(4)
+    features = rng.multivariate_normal([1.0, -2.0, 0.5], [[2.0, 0.3, 0.1], [0.3, 1.0, -0.2],
+                                                          [0.1, -0.2, 0.5]], size=500)
+    model = BaselineModel(shrinkage=0.0)
+    for batch in np.array_split(features, 7):
+        model.update(batch)
+
+    assert model.count == len(features)
+    np.testing.assert_allclose(model.mean, features.mean(axis=0), rtol=1e-10)
+    np.testing.assert_allclose(model.covariance, np.cov(features, rowvar=False), rtol=1e-8, atol=1e-8)
+
+    # Mahalanobis pela inversa da covariância, sem o fator de Cholesky
+    centered = features[:10] - features.mean(axis=0)
+    inverse = np.linalg.inv(np.cov(features, rowvar=False))
+    expected = np.sqrt(np.einsum('ij,jk,ik->i', centered, inverse, centered))
+    np.testing.assert_allclose(model.score(features[:10]), expected, rtol=1e-6)
+
+
+def test_shrinkage_and_zscore():
+    rng = np.random.default_rng(5)
+    features = rng.standard_normal((200, 2)) * [1.0, 4.0]
+    model = BaselineModel(method='zscore', shrinkage=0.5)
+    model.update(features)
+    covariance = np.cov(features, rowvar=False)
+    np.testing.assert_allclose(model.covariance[0, 1], 0.5 * covariance[0, 1], atol=1e-8)
+    z = np.abs((features[:5] - features.mean(axis=0)) / np.sqrt(np.diag(covariance))).max(axis=1)
+    np.testing.assert_allclose(model.score(features[:5]), z, rtol=1e-6)
+
+
+def test_scores_separate_anomalous_signal(tmp_path):
+    rng = np.random.default_rng(6)
+    sample_rate = 8000
+    t = np.arange(sample_rate * 2) / sample_rate
+    good = (np.sin(2 * np.pi * 440 * t) + 0.1 * rng.standard_normal(t.size)).astype(np.float32)
+    bad = (np.sin(2 * np.pi * 1500 * t) + 0.5 * rng.standard_normal(t.size)).astype(np.float32)
+
+    features, names = acoustic_features(sliding_windows(good, 512), sample_rate)
+    model = BaselineModel(names=names)
+    model.update(features)
+    model.calibrate(features)
+
+    path = tmp_path / "modelo.npz"
+    model.save(path)
+    loaded = BaselineModel.load(path)
+    assert loaded.threshold == model.threshold and loaded.names == names
+
+    assert score_signal(good, loaded, sample_rate, window_size=512)['passed'].mean() > 0.95
+    result = score_signal(bad, loaded, sample_rate, window_size=512)
+    assert not result['passed'].any()
+    assert set(result['metrics'][0]) == {'rr', 'det', 'entropy', 'anomaly_score'}
@@ -0,0 +1,71 @@
+import numpy as np
+
+from vision.change_detection import ChangeDetector
+
+
+def _scene(offset=0, noise=None, seed=0):
+    depth = np.full((240, 320), 600, dtype=np.uint16)
+    depth[80:160, 100 + offset:180 + offset] = 450  # objeto mais próximo
+    depth[:, :16] = 0  # borda sem medida
+    if noise:
+        rng = np.random.default_rng(seed)
+        valid = depth > 0
+        depth[valid] += rng.integers(-noise, noise + 1, size=int(valid.sum())).astype(np.uint16)
+    return depth
+
+
+def test_static_depth_frames_are_skipped():
+    detector = ChangeDetector(step=8, tolerance=3.0)
+    assert detector.changed(_scene())
+    # ruído de ±2 mm fica abaixo da tolerância
+    results = [detector.changed(_scene(noise=2, seed=i)) for i in range(10)]
+    assert not any(results)
+    assert detector.stats()['skipped'] == 10
+    assert detector.skip_rate == 10 / 11
+
+
+def test_moved_region_is_not_skipped():
+    detector = ChangeDetector(step=8, tolerance=3.0)
+    assert detector.changed(_scene())
+    assert not detector.changed(_scene())
+    assert detector.changed(_scene(offset=40))
+    # a referência passou a ser a nova posição
+    assert not detector.changed(_scene(offset=40))
+
+
+def test_validity_flip_counts_as_change():
+    detector = ChangeDetector(step=8, validity_tolerance=0.01)
+    scene = _scene()
+    assert detector.changed(scene)
+    occluded = scene.copy()
+    occluded[:, 16:64] = 0  # faixa perde a medida, profundidade do resto igual
+    assert detector.changed(occluded)
+    assert detector.last_difference == float('inf')
+
+
+def test_max_skip_forces_processing():
+    detector = ChangeDetector(max_skip=3)
+    scene = _scene()
+    results = [detector.changed(scene) for _ in range(9)]
+    assert results == [True, False, False, False, True, False, False, False, True]
+
+
+def test_reset_stats_counts_per_interval_and_keeps_reference():
+    detector = ChangeDetector()
+    scene = _scene()
+    for _ in range(5):
+        detector.changed(scene)
+    assert detector.stats()['frames'] == 5
+    assert detector.stats()['skipped'] == 4
+
+    detector.reset_stats()
+    assert detector.stats()['frames'] == 0
+    assert detector.skip_rate == 0.0
+    # a referência continua: o primeiro frame do intervalo já é pulado
+    assert not detector.changed(scene)
+    assert detector.changed(_scene(offset=40))
+    assert detector.stats() == {'frames': 2, 'skipped': 1, 'skip_rate': 0.5,
+                                'last_difference': detector.last_difference}
+
+    detector.reset()
+    assert detector.changed(_scene(offset=40))
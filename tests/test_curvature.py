@@ -0,0 +1,66 @@
+import numpy as np
+
+from vision.curvature import compute_curvature_maps, select_inspection_targets
+
+FOCAL = 525.0
+SHAPE = (240, 320)
+
+
+def paraboloid(radius, z0=300.0, center=None, cap=None):
+    """
+    z = z0 + r²/(2R) em coordenadas métricas (pixel = z0 / f): no vértice,
+    H = 1/R e K = 1/R². Com cap, a superfície fica plana além de r = cap mm.
+    """
+    height, width = SHAPE
+    cy, cx = (height / 2, width / 2) if center is None else center
+    v, u = np.mgrid[0:height, 0:width].astype(np.float64)
+    r2 = ((u - cx) ** 2 + (v - cy) ** 2) * (z0 / FOCAL) ** 2
+    if cap is not None:
+        r2 = np.minimum(r2, cap ** 2)
+    return z0 - r2 / (2 * radius) if cap is not None else z0 + r2 / (2 * radius)
+
+
+def _apex(curvature, name):
+    height, width = SHAPE
+    return float(np.nanmedian(curvature[name][height // 2 - 2:height // 2 + 3,
+                                              width // 2 - 2:width // 2 + 3]))
+
+
+def test_paraboloid_curvatures_match_analytic_values():
+    curvature = compute_curvature_maps(paraboloid(20.0).astype(np.float32), sigma=3.0,
+                                       min_depth=100, max_depth=5000, focal_length=FOCAL)
+    assert abs(_apex(curvature, 'mean') - 0.05) < 0.05 * 0.02
+    assert abs(_apex(curvature, 'gaussian') - 0.0025) < 0.0025 * 0.05
+    assert abs(_apex(curvature, 'k1') - 0.05) < 0.05 * 0.02
+    assert abs(_apex(curvature, 'k2') - 0.05) < 0.05 * 0.02
+
+
+def test_quantized_paraboloid_stays_close():
+    # frame uint16 real: degraus de 1 mm no vértice pedem sigma maior
+    depth = np.round(paraboloid(20.0)).astype(np.uint16)
+    curvature = compute_curvature_maps(depth, sigma=4.0, min_depth=100, max_depth=5000,
+                                       focal_length=FOCAL)
+    assert abs(_apex(curvature, 'mean') - 0.05) < 0.05 * 0.25
+    assert _apex(curvature, 'k2') > 0
+    assert _apex(curvature, 'gaussian') > 0
+
+
+def test_plane_has_no_curvature():
+    curvature = compute_curvature_maps(np.full(SHAPE, 300, dtype=np.uint16))
+    assert np.nanmax(np.abs(curvature['mean'])) < 1e-4
+    assert np.nanmax(np.abs(curvature['gaussian'])) < 1e-6
+
+
+def test_targets_start_at_the_sharpest_region():
+    # plano a 300 mm com uma calota suave e uma bem mais curva
+    sharp = (60, 240)
+    gentle = (150, 90)
+    depth = (paraboloid(8.0, center=sharp, cap=6.0) + paraboloid(80.0, center=gentle, cap=12.0)
+             - 300.0)
+    targets = select_inspection_targets(np.round(depth).astype(np.uint16), n_targets=5)
+    assert targets
+    first = targets[0]
+    assert first['kind'] == 'canto'
+    assert np.hypot(first['row'] - sharp[0], first['col'] - sharp[1]) < 8
+    assert first['score'] > 5 * targets[1]['score']
+    assert 290 <= first['depth'] <= 300
@@ -0,0 +1,39 @@
+import time
+
+from vision.acquisition import META_DEVICE
+from vision.devices import DeviceManager
+
+
+def test_simulated_devices_run_in_parallel():
+    manager = DeviceManager.simulated(2)
+    try:
+        manager.start()
+        manager.run()
+
+        # cada processo manda estatísticas a cada intervalo; espera as duas
+        deadline = time.monotonic() + 30.0
+        while not all('fps' in stats for stats in manager.throughput().values()):
+            assert time.monotonic() < deadline, manager.throughput()
+            manager.poll()
+            time.sleep(0.05)
+
+        frames = {}
+        while len(frames) < 2:
+            assert time.monotonic() < deadline, "sem frames de profundidade"
+            frames.update(manager.read_all_depth())
+            time.sleep(0.02)
+
+        assert set(frames) == set(manager.device_ids)
+        for index, device_id in enumerate(manager.device_ids):
+            frame, meta, skipped = frames[device_id]
+            assert frame.ndim == 2 and frame.size > 0
+            assert int(meta[META_DEVICE]) == index
+            assert skipped >= 0
+
+        summary = manager.summary()
+        for device_id, stats in manager.throughput().items():
+            assert stats['state'] == "running"
+            assert stats['fps'] > 0
+            assert device_id in summary
+    finally:
+        manager.close()
@@ -0,0 +1,31 @@
+import numpy as np
+
+from utils.buffers import BufferPool
+from vision.frame_context import DepthFrameContext
+from vision.simulate_stream import simulated_depth_frame
+
+
+def test_range_masks_do_not_grow_the_pool():
+    pool = BufferPool()
+    sizes = []
+    for i in range(60):
+        depth = simulated_depth_frame(i, base=300, amplitude=80)
+        pool.begin_frame()
+        ctx = DepthFrameContext(depth, pool=pool)
+        # faixa automática diferente a cada frame, mais a faixa fixa padrão
+        ctx.range_mask(200 + i, 400 + 2 * i)
+        ctx.range_mask(100, 1000)
+        pool.end_frame()
+        sizes.append((len(pool), pool.total_bytes))
+    assert len(set(sizes[1:])) == 1
+    assert pool.last_frame_bytes == 0
+
+
+def test_range_masks_in_the_same_frame_stay_distinct():
+    depth = np.array([[0, 150, 300, 450]], dtype=np.uint16)
+    ctx = DepthFrameContext(depth, pool=BufferPool())
+    near = ctx.range_mask(100, 200)
+    far = ctx.range_mask(250, 500)
+    assert near.tolist() == [[False, True, False, False]]
+    assert far.tolist() == [[False, False, True, True]]
+    assert ctx.range_mask(100, 200) is near
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from vision.frame_sync import DisplayLatency, FramePairer, LatencyHistogram
+
+MS = 1_000_000
+
+
+def test_matched_pair_is_released_together():
+    pairer = FramePairer(tolerance_ms=15)
+    pairer.push('depth', 0, 100 * MS, 'd0')
+    pairer.push('rgb', 0, 105 * MS, 'c0')
+    assert pairer.pop() == ('c0', 'd0', True)
+    assert pairer.pop() is None
+    assert pairer.stats()['skew']['count'] == 1
+
+
+def test_picks_the_closest_rgb_and_discards_older_ones():
+    pairer = FramePairer(tolerance_ms=15)
+    for seq, ts in enumerate((70, 90, 98)):
+        pairer.push('rgb', seq, ts * MS, f"c{seq}")
+    pairer.push('depth', 0, 100 * MS, 'd0')
+    assert pairer.pop() == ('c2', 'd0', True)
+    assert pairer.stats()['discarded']['rgb'] == 2
+
+
+def test_rgb_outside_tolerance_is_released_alone():
+    pairer = FramePairer(tolerance_ms=15)
+    pairer.push('rgb', 0, 100 * MS, 'c0')
+    # ainda pode parear: nada é liberado
+    assert pairer.pop() is None
+    pairer.push('depth', 0, 140 * MS, 'd0')
+    # o RGB expirou (a profundidade já passou dele + tolerância); a
+    # profundidade ainda espera um RGB até 155 ms
+    assert pairer.pop() == ('c0', None, False)
+    assert pairer.pop() is None
+    pairer.push('rgb', 1, 141 * MS, 'c1')
+    assert pairer.pop() == ('c1', 'd0', True)
+
+
+def test_depth_is_not_held_when_rgb_stops():
+    pairer = FramePairer(tolerance_ms=15, capacity=3)
+    for seq in range(3):
+        pairer.push('depth', seq, seq * 33 * MS, f"d{seq}")
+    released = pairer.pop()
+    assert released == (None, 'd2', False)
+    assert pairer.stats()['discarded']['depth'] == 2
+
+
+def test_hit_rate_and_stats_counts():
+    pairer = FramePairer(tolerance_ms=10)
+    released = []
+    for seq in range(4):
+        # o RGB 2 se perdeu: a profundidade 2 sai sozinha quando o RGB 3 chega
+        if seq != 2:
+            pairer.push('rgb', seq, seq * 33 * MS + 2 * MS, f"c{seq}")
+            released.append(pairer.pop())
+        pairer.push('depth', seq, seq * 33 * MS, f"d{seq}")
+        released.append(pairer.pop())
+    assert [r for r in released if r is not None] == [
+        ('c0', 'd0', True), ('c1', 'd1', True), (None, 'd2', False), ('c3', 'd3', True)]
+
+    stats = pairer.stats()
+    assert stats['pairs'] == 3
+    assert stats['unpaired'] == {'rgb': 0, 'depth': 1}
+    assert stats['hit_rate'] == pytest.approx(0.75)
+    assert stats['skew']['count'] == 3
+    assert stats['skew']['max_ms'] == pytest.approx(2.0)
+
+    pairer.reset_stats()
+    assert pairer.stats()['pairs'] == 0 and pairer.hit_rate == 0.0
+
+
+def test_sequence_key_pairs_by_sequence_number():
+    pairer = FramePairer(key='sequence')
+    pairer.push('rgb', 7, 0, 'c7')
+    pairer.push('depth', 7, 50 * MS, 'd7')
+    assert pairer.pop() == ('c7', 'd7', True)
+    with pytest.raises(ValueError):
+        FramePairer(key='clock')
+
+
+def test_latency_histogram_percentiles():
+    histogram = LatencyHistogram()
+    histogram.add(np.array([1.0] * 90 + [45.0] * 10))
+    assert histogram.count == 100
+    assert histogram.percentile(50) == 2
+    assert histogram.percentile(95) == 45.0
+    assert histogram.stats()['mean_ms'] == pytest.approx(5.4)
+
+
+def test_display_latency_segments():
+    latency = DisplayLatency()
+    latency.record(device_ts=100 * MS, host_ts=110 * MS, displayed_ns=130 * MS, rgb_matched=True)
+    latency.record(device_ts=0, host_ts=200 * MS, displayed_ns=205 * MS, rgb_matched=False)
+    stats = latency.stats()
+    assert stats['acquisition']['count'] == 1 and stats['total']['count'] == 1
+    assert stats['total']['max_ms'] == pytest.approx(30.0)
+    assert stats['display']['count'] == 2
+    assert stats['rgb_match_rate'] == 0.5
@@ -0,0 +1,60 @@
+import numpy as np
+
+from vision.fusion import TSDFVolume, default_intrinsics, pack_voxel_keys, unpack_voxel_keys
+
+SHAPE = (240, 320)
+
+
+def plane(depth_mm=300):
+    return np.full(SHAPE, depth_mm, dtype=np.uint16)
+
+
+def translation(x=0.0, y=0.0, z=0.0):
+    pose = np.eye(4)
+    pose[:3, 3] = (x, y, z)
+    return pose
+
+
+def test_voxel_keys_round_trip():
+    indices = np.array([[0, 0, 0], [-5, 12, 300], [-(1 << 20), (1 << 20) - 1, 7]])
+    assert np.array_equal(unpack_voxel_keys(pack_voxel_keys(indices)), indices)
+
+
+def test_fused_plane_surface_and_normals():
+    volume = TSDFVolume(voxel_size=2.0)
+    intrinsics = default_intrinsics(SHAPE[1], SHAPE[0])
+    for _ in range(3):
+        volume.integrate(plane(300), intrinsics)
+
+    surface = volume.extract_surface()
+    points, normals = surface['points'], surface['normals']
+    assert len(points) > 1000
+    # cruzamento de zero no plano z = 300 mm, dentro de um voxel
+    assert abs(np.median(points[:, 2]) - 300) < volume.voxel_size
+    assert np.percentile(np.abs(points[:, 2] - 300), 95) < volume.voxel_size
+    # a TSDF cresce em direção à câmera: normais apontam para -z
+    assert np.median(normals[:, 2]) < -0.9
+
+
+def test_repeated_views_do_not_allocate_new_voxels():
+    volume = TSDFVolume(voxel_size=2.0)
+    intrinsics = default_intrinsics(SHAPE[1], SHAPE[0])
+    volume.integrate(plane(), intrinsics)
+    count, memory = len(volume), volume.memory_bytes
+    for _ in range(5):
+        volume.integrate(plane(), intrinsics)
+    assert len(volume) == count
+    assert volume.memory_bytes == memory
+    # esparso: só a banda de truncamento em torno do plano é alocada
+    samples = int(np.ceil(2 * volume.truncation / volume.voxel_size)) + 1
+    assert count <= (SHAPE[0] // 4) * (SHAPE[1] // 4) * samples
+
+
+def test_max_voxels_bounds_the_volume():
+    volume = TSDFVolume(voxel_size=2.0, max_voxels=20_000)
+    intrinsics = default_intrinsics(SHAPE[1], SHAPE[0])
+    for step in range(10):
+        volume.integrate(plane(), intrinsics, pose=translation(x=40.0 * step))
+        assert len(volume) <= volume.max_voxels
+    # os voxels mantidos são os vistos por último
+    assert volume.last_seen.min() > 0
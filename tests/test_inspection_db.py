@@ -0,0 +1,64 @@
+import threading
+
+from storage.inspection_db import InspectionDatabase
+
+
+def test_queued_rows_survive_close_and_reopen(tmp_path):
+    path = str(tmp_path / "inspecoes.sqlite")
+    database = InspectionDatabase(path, batch_size=50)
+    session = database.start_session(part="flange", notes="teste")
+
+    ids = {}
+    for i in range(500):
+        point_id = database.add_point(session, pose=(i, 2 * i, 300.0, 0, 0, 90),
+                                      depth={'mean_depth': 300.0 + i}, acoustic={'det': i / 500},
+                                      captures={'depth': f"d{i}.npy"}, device_id="cam",
+                                      timestamp=1000.0 + i)
+        ids[point_id] = i
+    database.end_session(session)
+    # close() sem flush: o escritor precisa esvaziar a fila antes de encerrar
+    database.close()
+    assert sorted(ids) == list(range(1, 501))
+
+    reopened = InspectionDatabase(path)
+    try:
+        points = reopened.query_points(session_id=session)
+        assert len(points) == 500
+        for point in points:
+            i = ids[point['id']]
+            assert (point['x'], point['y'], point['mean_depth']) == (i, 2 * i, 300.0 + i)
+            assert point['t'] == 1000.0 + i
+            assert reopened.captures_for(point['id']) == [{'kind': 'depth', 'path': f"d{i}.npy"}]
+        assert [p['id'] for p in reopened.query_points(min_det=0.997)] == [500]
+        assert reopened.sessions(part="flange")[0]['ended_at'] is not None
+
+        # os ids pré-atribuídos continuam depois dos já gravados
+        assert reopened.add_point(session) == 501
+    finally:
+        reopened.close()
+
+
+def test_concurrent_writers_get_unique_ids(tmp_path):
+    database = InspectionDatabase(str(tmp_path / "inspecoes.sqlite"))
+    session = database.start_session()
+    ids = []
+    lock = threading.Lock()
+
+    def writer():
+        for _ in range(200):
+            point_id = database.add_point(session, depth={'mean_depth': 1.0})
+            with lock:
+                ids.append(point_id)
+
+    threads = [threading.Thread(target=writer) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    database.flush()
+    try:
+        assert len(set(ids)) == 800
+        assert len(database.query_points(session_id=session)) == 800
+        assert database.batches_written < 800
+    finally:
+        database.close()
@@ -0,0 +1,46 @@
+import numpy as np
+
+from vision.quality import DEPTH_MAX, DEPTH_MIN, DepthQualityMonitor
+
+SHAPE = (240, 320)
+
+
+def bimodal(near=200, far=350, invalid_fraction=0.0):
+    depth = np.full(SHAPE, far, dtype=np.uint16)
+    depth[:, :SHAPE[1] // 2] = near
+    if invalid_fraction:
+        depth[:int(SHAPE[0] * invalid_fraction)] = 0
+    return depth
+
+
+def test_bimodal_histogram_spans_both_modes_with_margin():
+    monitor = DepthQualityMonitor(window=5, margin=15)
+    for _ in range(5):
+        working_range = monitor.update(bimodal(200, 350, invalid_fraction=0.25))
+    assert working_range == (185, 365)
+    stats = monitor.stats()
+    assert stats['working_range'] == (185, 365)
+    assert stats['mean_validity'] == 0.75
+    assert stats['temporal_noise'] == 0.0
+
+
+def test_narrow_scene_keeps_min_span_inside_limits():
+    monitor = DepthQualityMonitor(window=3, margin=0, min_span=40)
+    assert monitor.update(np.full(SHAPE, 300, dtype=np.uint16)) == (280, 320)
+    monitor = DepthQualityMonitor(window=3, margin=0, min_span=40)
+    assert monitor.update(np.full(SHAPE, DEPTH_MAX - 5, dtype=np.uint16)) == (DEPTH_MAX - 40, DEPTH_MAX)
+
+
+def test_empty_or_invalid_window_falls_back_to_limits():
+    monitor = DepthQualityMonitor(window=4)
+    assert monitor.update(np.zeros(SHAPE, dtype=np.uint16)) == (DEPTH_MIN, DEPTH_MAX)
+    # tudo além dos limites também não conta
+    assert monitor.update(np.full(SHAPE, 2000, dtype=np.uint16)) == (DEPTH_MIN, DEPTH_MAX)
+
+    for _ in range(4):
+        monitor.update(bimodal())
+    assert monitor.working_range != (DEPTH_MIN, DEPTH_MAX)
+    # quando a janela inteira fica sem pixels válidos, a faixa volta aos limites
+    for _ in range(4):
+        working_range = monitor.update(np.zeros(SHAPE, dtype=np.uint16))
+    assert working_range == (DEPTH_MIN, DEPTH_MAX)
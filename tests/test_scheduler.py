@@ -0,0 +1,33 @@
+from gui.scheduler import create_display_governor
+
+
+def _overloaded_frames(governor, count):
+    for _ in range(count):
+        governor.begin_frame()
+        governor.frame_cost = 1.0  # muito acima do período de 33 ms
+        governor._frame_start = None
+        governor.end_frame(queue_depth=3)
+
+
+def test_requested_stage_runs_under_load():
+    governor = create_display_governor()
+    _overloaded_frames(governor, 200)
+    assert governor.stats()['stages']['profile']['interval'] > 3
+
+    governor.request("surface")
+    assert governor.pending("surface")
+    governor.begin_frame()
+    assert governor.due("surface")
+    assert not governor.pending("surface")
+    assert not governor.due("surface")
+
+
+def test_periodic_stages_recover_when_load_drops():
+    governor = create_display_governor()
+    _overloaded_frames(governor, 200)
+    for _ in range(200):
+        governor.begin_frame()
+        governor.frame_cost = 0.0
+        governor._frame_start = None
+        governor.end_frame()
+    assert governor.stats()['stages']['profile']['interval'] == 3
@@ -0,0 +1,65 @@
+import numpy as np
+
+from vision.segmentation import ObjectTracker, depth_discontinuities, segment_objects
+
+
+def two_boxes(shift=0):
+    """
+    Fundo a 800 mm (fora da faixa próxima) com duas caixas: uma grande a
+    250 mm e uma menor a 350 mm, deslocadas shift pixels na horizontal
+    """
+    depth = np.full((240, 320), 800, dtype=np.uint16)
+    depth[40:140, 30 + shift:130 + shift] = 250
+    depth[100:180, 200 + shift:260 + shift] = 350
+    return depth
+
+
+def test_discontinuities_mark_box_borders():
+    edges = depth_discontinuities(two_boxes())
+    assert edges[40, 80] and edges[139, 80]
+    assert edges[90, 30] and edges[90, 129]
+    assert not edges[90, 80]
+    assert not edges[10, 10]
+
+
+def test_segment_objects_finds_both_boxes():
+    regions = segment_objects(two_boxes())
+    assert len(regions) == 2
+    large, small = regions
+    # as bordas de profundidade ficam fora das regiões: um pixel a menos por lado
+    assert large['bbox'] == (31, 41, 98, 98)
+    assert small['bbox'] == (201, 101, 58, 78)
+    assert large['mean_depth'] == 250
+    assert small['mean_depth'] == 350
+    assert large['area'] > small['area']
+
+
+def test_small_regions_are_dropped():
+    depth = two_boxes()
+    depth[10:20, 280:290] = 300
+    assert len(segment_objects(depth)) == 2
+    assert len(segment_objects(depth, min_area=50)) == 3
+
+
+def test_tracker_keeps_ids_while_objects_move():
+    tracker = ObjectTracker()
+    first = {region['bbox']: region['track_id'] for region in tracker.update(segment_objects(two_boxes()))}
+    assert sorted(first.values()) == [1, 2]
+    large_id = tracker.update(segment_objects(two_boxes()))[0]['track_id']
+
+    for shift in range(2, 12, 2):
+        regions = tracker.update(segment_objects(two_boxes(shift)))
+        assert [region['track_id'] for region in regions] == [large_id, 3 - large_id]
+    assert tracker.primary()['track_id'] == large_id
+    assert tracker.primary()['age'] == 6
+
+
+def test_tracker_drops_objects_after_max_missed():
+    tracker = ObjectTracker(max_missed=2)
+    tracker.update(segment_objects(two_boxes()))
+    for _ in range(3):
+        tracker.update([])
+    assert tracker.tracks == {}
+    assert tracker.primary() is None
+    new = tracker.update(segment_objects(two_boxes()))
+    assert {region['track_id'] for region in new} == {3, 4}
@@ -0,0 +1,87 @@
+import multiprocessing as mp
+
+import types
+
+import numpy as np
+
+import vision.shared_frames as shared_frames
+from vision.shared_frames import SharedFrameRing
+
+SHAPE = (240, 320)
+
+
+def _write_frames(spec, count, done):
+    ring = SharedFrameRing.attach(spec['name'], spec['capacity'], spec['dtype'], spec['slots'])
+    try:
+        frame = np.empty(SHAPE, dtype=np.uint16)
+        for i in range(count):
+            frame.fill(i % 60000 + 1)
+            ring.write(frame, device_ts=i)
+    finally:
+        done.set()
+        ring.close()
+
+
+def test_round_trip_and_after_seq():
+    ring = SharedFrameRing.create(SHAPE[0] * SHAPE[1], np.uint16)
+    try:
+        assert ring.read_latest() is None
+        frame = np.arange(SHAPE[0] * SHAPE[1], dtype=np.uint16).reshape(SHAPE)
+        seq = ring.write(frame, device_ts=7, meta=[1, 2, 3])
+        result = ring.read_latest()
+        assert result[0] == seq and result[2] == 7
+        assert np.array_equal(result[1], frame)
+        assert result[4][:3].tolist() == [1, 2, 3]
+        assert ring.read_latest(after_seq=seq) is None
+    finally:
+        ring.close()
+
+
+def test_readers_never_see_a_mixed_frame():
+    ring = SharedFrameRing.create(SHAPE[0] * SHAPE[1], np.uint16, slots=2)
+    context = mp.get_context("spawn")
+    done = context.Event()
+    writer = context.Process(target=_write_frames, args=(ring.spec(), 3000, done))
+    writer.start()
+    try:
+        out = np.empty(ring.capacity, dtype=np.uint16)
+        last_seq, last_value, reads = -1, None, 0
+        while not done.is_set() or ring.latest_seq > last_seq:
+            result = ring.read_latest(last_seq, out=out)
+            if result is None:
+                # leitura descartada ou sem frame novo: out continua com o último frame válido
+                if last_value is not None:
+                    assert (out[:SHAPE[0] * SHAPE[1]] == last_value).all()
+                continue
+            seq, frame, device_ts, _, _ = result
+            value = frame[0, 0]
+            assert (frame == value).all(), f"frame {seq} misturado"
+            assert value == device_ts % 60000 + 1
+            last_seq, last_value = seq, value
+            reads += 1
+        assert reads > 0
+    finally:
+        writer.join(timeout=10)
+        ring.close()
+
+
+def test_discarded_read_keeps_the_caller_buffer(monkeypatch):
+    ring = SharedFrameRing.create(16, np.uint16, slots=1)
+    try:
+        out = np.empty(16, dtype=np.uint16)
+        ring.write(np.full(16, 1, dtype=np.uint16))
+        seq, frame, _, _, _ = ring.read_latest(out=out)
+        ring.write(np.full(16, 2, dtype=np.uint16))
+
+        # o escritor reaproveita o slot no meio da cópia do leitor
+        def copy_during_write(dst, src, **kwargs):
+            np.copyto(dst, src, **kwargs)
+            monkeypatch.setattr(shared_frames, "np", np)
+            ring.write(np.full(16, 3, dtype=np.uint16))
+
+        monkeypatch.setattr(shared_frames, "np", types.SimpleNamespace(
+            copyto=copy_during_write, prod=np.prod, empty=np.empty))
+        assert ring.read_latest(seq, retries=1, out=out) is None
+        assert (frame == 1).all()
+    finally:
+        ring.close()
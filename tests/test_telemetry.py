@@ -0,0 +1,64 @@
+import time
+
+import numpy as np
+
+from telemetry.client import TelemetryClient
+from telemetry.codec import KIND_DEPTH
+from telemetry.server import TelemetryServer
+
+
+def _wait_for_client(server, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not server.client_count:
+        assert time.monotonic() < deadline, "cliente não conectou"
+        time.sleep(0.01)
+
+
+def test_depth_round_trip_is_bit_exact():
+    server = TelemetryServer(host="127.0.0.1", port=0).start()
+    client = TelemetryClient("127.0.0.1", server.port)
+    client.connection.settimeout(5.0)
+    try:
+        _wait_for_client(server)
+        rng = np.random.default_rng(0)
+        depth = rng.integers(0, 65535, size=(120, 200), dtype=np.uint16)
+        depth[:40] = 0
+        captured_at = time.time() - 0.25
+
+        server.publish(device=1, depth=depth, depth_range=(150, 800), timestamp=captured_at)
+        message = client.receive()
+
+        assert message['kind'] == 'depth'
+        assert message['device'] == 1
+        assert message['timestamp'] == captured_at
+        assert tuple(message['depth_range']) == (150, 800)
+        assert message['frame'].dtype == np.uint16
+        assert np.array_equal(message['frame'], depth)
+        # a latência do cliente parte do instante da captura, não da publicação
+        assert client.latency_ms[KIND_DEPTH] >= 250
+    finally:
+        client.close()
+        server.close()
+
+
+def test_stats_is_read_only_between_callers():
+    server = TelemetryServer(host="127.0.0.1", port=0).start()
+    client = TelemetryClient("127.0.0.1", server.port)
+    client.connection.settimeout(5.0)
+    try:
+        _wait_for_client(server)
+        rng = np.random.default_rng(1)
+        for _ in range(5):
+            depth = rng.integers(0, 65535, size=(120, 200), dtype=np.uint16)
+            server.publish(device=1, depth=depth, depth_range=(150, 800))
+            client.receive()
+            time.sleep(0.05)
+
+        # duas leituras seguidas (ex.: GUI e log) veem a mesma janela de taxa
+        first = server.stats()['streams']['depth']['kbps']
+        second = server.stats()['streams']['depth']['kbps']
+        assert first > 0
+        assert second > 0.9 * first
+    finally:
+        client.close()
+        server.close()
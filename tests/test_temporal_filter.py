@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from vision.temporal_filter import TemporalDepthFilter
+
+
+def test_median_matches_reference_over_valid_samples():
+    rng = np.random.default_rng(1)
+    history, shape = 5, (12, 16)
+    frames = rng.integers(100, 1000, size=(40,) + shape).astype(np.uint16)
+    frames[rng.random(frames.shape) < 0.3] = 0
+    temporal = TemporalDepthFilter(shape, history=history, mode="median")
+
+    for i, frame in enumerate(frames):
+        output = temporal.update(frame)
+        window = frames[max(0, i - history + 1):i + 1]
+        for y in range(shape[0]):
+            for x in range(shape[1]):
+                valid = window[:, y, x][window[:, y, x] > 0]
+                if len(valid) == 0:
+                    assert output[y, x] == 0
+                    continue
+                # mediana inferior: em contagens pares, o menor dos dois centrais
+                expected = np.sort(valid)[(len(valid) - 1) // 2]
+                assert output[y, x] == expected
+                if len(valid) % 2:
+                    assert output[y, x] == np.median(valid)
+
+
+@pytest.mark.parametrize("history,min_valid", [(5, 3), (6, 2), (4, 4)])
+def test_persistence_holds_value_for_history_minus_min_valid_frames(history, min_valid):
+    temporal = TemporalDepthFilter((1, 1), history=history, mode="persistence", min_valid=min_valid)
+    # só passa a valer depois de min_valid frames válidos
+    outputs = [temporal.update(np.array([[420]], dtype=np.uint16))[0, 0] for _ in range(history)]
+    assert outputs == [0] * (min_valid - 1) + [420] * (history - min_valid + 1)
+
+    held = 0
+    while temporal.update(np.zeros((1, 1), dtype=np.uint16))[0, 0] == 420:
+        held += 1
+    assert held == history - min_valid
+
+
+def test_ema_follows_small_changes_and_restarts_on_jumps():
+    temporal = TemporalDepthFilter((1, 1), history=3, mode="ema", alpha=0.5, delta=20)
+    assert temporal.update(np.array([[300]], dtype=np.uint16))[0, 0] == 300
+    assert temporal.update(np.array([[310]], dtype=np.uint16))[0, 0] == 305
+    assert temporal.update(np.array([[400]], dtype=np.uint16))[0, 0] == 400
+
+
+def test_rejects_unknown_mode_and_shape():
+    with pytest.raises(ValueError):
+        TemporalDepthFilter((2, 2), mode="mean")
+    with pytest.raises(ValueError):
+        TemporalDepthFilter((2, 2)).update(np.zeros((3, 3), dtype=np.uint16))
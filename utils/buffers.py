@@ -0,0 +1,135 @@
+"""
+Pool de buffers pré-alocados para os estágios do pipeline de visão
+"""
+import tracemalloc
+from contextlib import contextmanager
+
+import numpy as np
+
+
+class BufferPool:
+    """
+    Buffers reaproveitados entre frames, identificados por nome e dtype.
+
+    Cada buffer guarda uma área contígua que só cresce; get() devolve uma
+    view com a forma pedida, então ROIs de tamanho variável não geram novas
+    alocações. Os estágios escrevem nesses buffers com out=/dst= e operações
+    no lugar. O conteúdo de um buffer só vale até o próximo get() com o mesmo
+    nome: quem precisar guardar o resultado deve copiar.
+
+    begin_frame()/end_frame() contabilizam só o crescimento do próprio pool
+    (zero em regime); os temporários alocados fora dele são medidos pelo
+    AllocationSampler.
+    """
+
+    def __init__(self):
+        self._buffers = {}
+        self.total_bytes = 0
+        self.frame_bytes = 0
+        self.last_frame_bytes = 0
+        self.frames = 0
+
+    def __len__(self):
+        return len(self._buffers)
+
+    def get(self, name, shape, dtype):
+        """
+        View (não inicializada) de forma shape sobre o buffer name
+        """
+        dtype = np.dtype(dtype)
+        shape = tuple(shape)
+        size = int(np.prod(shape))
+        key = (name, dtype.str)
+
+        buffer = self._buffers.get(key)
+        if buffer is None or buffer.size < size:
+            if buffer is not None:
+                self.total_bytes -= buffer.nbytes
+            buffer = np.empty(size, dtype=dtype)
+            self._buffers[key] = buffer
+            self.total_bytes += buffer.nbytes
+            self.frame_bytes += buffer.nbytes
+
+        view = buffer[:size].reshape(shape)
+        view.flags.writeable = True
+        return view
+
+    def zeros(self, name, shape, dtype):
+        view = self.get(name, shape, dtype)
+        view.fill(0)
+        return view
+
+    def begin_frame(self):
+        self.frame_bytes = 0
+
+    def end_frame(self):
+        """
+        Fecha a contabilidade do frame e retorna os bytes alocados nele
+        """
+        self.last_frame_bytes = self.frame_bytes
+        self.frames += 1
+        return self.last_frame_bytes
+
+    def stats(self):
+        return {
+            'buffers': len(self._buffers),
+            'total_bytes': self.total_bytes,
+            'last_frame_bytes': self.last_frame_bytes,
+            'frames': self.frames,
+        }
+
+    def clear(self):
+        self._buffers.clear()
+        self.total_bytes = 0
+
+
+class AllocationSampler:
+    """
+    Mede as alocações reais de um frame com tracemalloc (o numpy reporta
+    seus buffers a ele), um frame a cada every, para não pagar o custo do
+    rastreamento em todos. last_peak_bytes é o pico de memória alocada
+    durante o frame medido (temporários incluídos); last_retained_bytes é o
+    que continuou alocado ao fim dele.
+    """
+
+    def __init__(self, every=30):
+        self.every = every
+        self.frames = 0
+        self.samples = 0
+        self.last_peak_bytes = 0
+        self.last_retained_bytes = 0
+
+    @contextmanager
+    def measure(self):
+        sampled = self.frames % self.every == 0
+        self.frames += 1
+        if not sampled:
+            yield
+            return
+
+        # se outro código já rastreia, só zera o pico e não encerra no fim
+        owner = not tracemalloc.is_tracing()
+        if owner:
+            tracemalloc.start()
+        else:
+            tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            if owner:
+                tracemalloc.stop()
+            self.last_peak_bytes = max(0, peak - baseline)
+            self.last_retained_bytes = max(0, current - baseline)
+            self.samples += 1
+
+
+def pool_buffer(pool, name, shape, dtype):
+    """
+    Buffer do pool, ou um array novo quando não há pool (chamadas avulsas,
+    como no modo batch, continuam recebendo resultados próprios)
+    """
+    if pool is None:
+        return np.empty(shape, dtype=dtype)
+    return pool.get(name, shape, dtype)
@@ -1,3 +1,103 @@
-""" 
+"""
 Transformações NumPy <-> OpenCV, etc.
-"""
\ No newline at end of file
+"""
+import warnings
+
+import numpy as np
+import cv2
+from PIL import Image, ImageTk
+
+# tamanhos (largura, altura) das vistas ao vivo, iguais para câmera e simulação
+# (um tamanho diferente recriaria a PhotoImage e mudaria o tamanho do rótulo)
+RGB_VIEW_SIZE = (440, 350)
+DEPTH_VIEW_SIZE = (440, 300)
+
+
+class DisplaySurface:
+    """
+    Superfície de exibição persistente de um widget Tk.
+
+    Redimensiona cada frame uma única vez (cv2.INTER_AREA) para buffers
+    reaproveitados, faz a troca de canais como view e atualiza sempre a
+    mesma PhotoImage no lugar, sem reconfigurar o widget a cada frame.
+
+    A PhotoImage é usada de propósito no lugar de CTkImage: a CTkImage
+    recria a PhotoImage a partir da imagem PIL a cada atualização, o que
+    anularia o paste() no lugar. Os frames são exibidos no tamanho em pixels
+    pedido, sem a escala HiDPI do customtkinter, e o aviso que o CTkLabel
+    emite por isso é suprimido na configuração.
+    """
+
+    def __init__(self, widget, size):
+        self.widget = widget
+        self.size = tuple(size)  # (largura, altura)
+        width, height = self.size
+        self._rgb = np.zeros((height, width, 3), dtype=np.uint8)
+        self._resized = {}  # buffers intermediários por número de canais
+        self._photo = None
+
+    def _resize_into(self, frame, dst=None):
+        width, height = self.size
+        if dst is None:
+            channels = 1 if frame.ndim == 2 else frame.shape[2]
+            dst = self._resized.get(channels)
+            if dst is None:
+                shape = (height, width) if channels == 1 else (height, width, channels)
+                dst = np.empty(shape, dtype=np.uint8)
+                self._resized[channels] = dst
+        if frame.shape[:2] == (height, width):
+            np.copyto(dst, frame)
+        else:
+            cv2.resize(frame, (width, height), dst=dst, interpolation=cv2.INTER_AREA)
+        return dst
+
+    def update(self, frame, order="rgb"):
+        """
+        Exibe um frame uint8. order: "rgb", "bgr", "rgba" ou "gray"
+        """
+        if order == "rgb":
+            self._resize_into(frame, dst=self._rgb)
+        elif order == "bgr":
+            resized = self._resize_into(frame)
+            np.copyto(self._rgb, resized[..., ::-1])  # troca BGR->RGB como view
+        elif order == "rgba":
+            resized = self._resize_into(frame)
+            np.copyto(self._rgb, resized[..., :3])
+        elif order == "gray":
+            resized = self._resize_into(frame)
+            cv2.cvtColor(resized, cv2.COLOR_GRAY2RGB, dst=self._rgb)
+        else:
+            raise ValueError(f"Ordem de canais desconhecida: {order}")
+
+        self._present()
+
+    def _present(self):
+        width, height = self.size
+        image = Image.frombuffer("RGB", (width, height), self._rgb, "raw", "RGB", 0, 1)
+        if self._photo is None:
+            self._photo = ImageTk.PhotoImage(image)
+            with warnings.catch_warnings():
+                warnings.filterwarnings("ignore", message=".*is not CTkImage.*")
+                self.widget.configure(image=self._photo, text="")
+            self.widget.image = self._photo
+        else:
+            self._photo.paste(image)
+
+
+def get_display_surface(widget, size):
+    """
+    Retorna a superfície associada ao widget, criando-a no primeiro uso
+    """
+    surface = getattr(widget, 'display_surface', None)
+    if surface is None or surface.size != tuple(size):
+        surface = DisplaySurface(widget, size)
+        widget.display_surface = surface
+    return surface
+
+
+def figure_to_rgba(fig):
+    """
+    Renderiza uma figura matplotlib e retorna o buffer RGBA como array, sem PNG
+    """
+    fig.canvas.draw()
+    return np.asarray(fig.canvas.buffer_rgba())
@@ -0,0 +1,82 @@
+"""
+Importação preguiçosa de subsistemas pesados e relatório de tempo de inicialização
+"""
+import importlib
+import sys
+import threading
+import time
+
+_PROCESS_START = time.perf_counter()
+
+# módulos pesados carregados só quando o sistema de visão é usado
+VISION_BACKEND_MODULES = (
+    "numpy",
+    "cv2",
+    "PIL.Image",
+    "scipy.ndimage",
+    "matplotlib",
+    "depthai",
+)
+
+_import_times = {}
+_milestones = {}
+_lock = threading.Lock()
+
+
+def lazy_import(module_name):
+    """
+    Importa um módulo sob demanda, registrando o tempo gasto na primeira carga
+    """
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    elapsed = time.perf_counter() - start
+
+    with _lock:
+        _import_times.setdefault(module_name, elapsed)
+    return module
+
+
+def load_vision_backend():
+    """
+    Carrega as dependências pesadas da visão uma a uma, para que o relatório
+    mostre o custo de cada biblioteca separadamente
+    """
+    for module_name in VISION_BACKEND_MODULES:
+        try:
+            lazy_import(module_name)
+        except ImportError as e:
+            print(f"[WARNING] Módulo {module_name} indisponível: {e}")
+
+
+def mark_milestone(label):
+    """
+    Registra um marco (ex.: janela pronta) em segundos desde o início do processo
+    """
+    with _lock:
+        _milestones.setdefault(label, time.perf_counter() - _PROCESS_START)
+
+
+def startup_report():
+    """
+    Retorna os tempos de importação e os marcos registrados até agora
+    """
+    with _lock:
+        return {
+            'imports': dict(_import_times),
+            'milestones': dict(_milestones),
+        }
+
+
+def print_startup_report():
+    report = startup_report()
+    print("[INFO] Tempo de inicialização:")
+    for label, seconds in sorted(report['milestones'].items(), key=lambda item: item[1]):
+        print(f"  {label}: {seconds * 1000:.0f} ms")
+    if report['imports']:
+        print("[INFO] Importações (ms):")
+        for name, seconds in sorted(report['imports'].items(), key=lambda item: -item[1]):
+            print(f"  {name}: {seconds * 1000:.0f} ms")
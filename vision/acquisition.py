@@ -0,0 +1,479 @@
+"""
+Processo de aquisição: dono do dai.Device, filtra a profundidade e publica os
+frames em memória compartilhada. A interface só mapeia e exibe; uma queda ou
+reset USB no processo de aquisição não derruba a janela.
+"""
+import multiprocessing as mp
+import queue
+import time
+
+import numpy as np
+
+from vision.shared_frames import SharedFrameRing
+from vision.change_detection import ChangeDetector
+from vision.frame_sync import FramePairer
+from utils.buffers import AllocationSampler
+
+RGB_CAPACITY = 1080 * 1920 * 3
+DEPTH_CAPACITY = 1080 * 1920
+
+# metadados do frame de profundidade no ring
+META_ROI = slice(0, 4)   # y0, y1, x0, x1 (-1 quando não há ROI)
+META_LINE_Y = 4          # linha do perfil (centro do objeto principal)
+META_DEVICE = 5          # índice do dispositivo que gerou o frame
+META_RANGE = slice(6, 8) # faixa de trabalho (min_depth, max_depth) do monitor de qualidade
+META_RGB_SEQ = 8         # seq no ring RGB do frame pareado com este (-1 sem par)
+META_SIZE = 9
+
+STATS_INTERVAL = 1.0     # s entre relatórios de estatística
+RESTART_BACKOFF = (1.0, 2.0, 5.0)
+
+DEVICE_ERROR_ADVICE = (
+    "- Verifique se o cabo USB está conectado",
+    "- Tente uma porta USB diferente",
+    "- Reinicie o dispositivo",
+    "- Verifique se não há outro processo usando a câmera",
+)
+
+
+class DepthProcessor:
+    """
+    Filtragem do frame de profundidade no processo de aquisição: filtro
+    temporal no host (pipeline simplificado), faixa de trabalho automática,
+    segmentação com ROI e filter_depth_range restrito à ROI e à faixa
+    """
+
+    def __init__(self, host_temporal_filter=False):
+        from vision.segmentation import ObjectTracker
+        from vision.quality import DepthQualityMonitor
+        from utils.buffers import BufferPool
+
+        self.host_temporal_filter = host_temporal_filter
+        self.temporal_filter = None
+        self.object_tracker = ObjectTracker()
+        self.quality_monitor = DepthQualityMonitor()
+        self.pool = BufferPool()
+
+    def process(self, depth_frame):
+        from vision.depth_stream import filter_depth_range
+        from vision.frame_context import DepthFrameContext
+        from vision.segmentation import segment_objects, union_roi
+        from vision.temporal_filter import TemporalDepthFilter
+
+        self.pool.begin_frame()
+        bilateral = True
+        if self.host_temporal_filter:
+            if self.temporal_filter is None or self.temporal_filter.shape != depth_frame.shape:
+                self.temporal_filter = TemporalDepthFilter(depth_frame.shape, history=5, mode="median")
+            # estabilizado no tempo: dispensa o bilateral por frame
+            depth_frame = self.temporal_filter.update(depth_frame)
+            bilateral = False
+
+        # segmentação no frame cru: os estágios seguintes rodam só na ROI do objeto
+        ctx = DepthFrameContext(depth_frame, pool=self.pool)
+        # a faixa de trabalho vale para todos os estágios seguintes
+        min_depth, max_depth = self.quality_monitor.update(ctx)
+        regions = self.object_tracker.update(segment_objects(ctx, min_depth, max_depth))
+        roi = union_roi(regions, ctx.shape)
+        primary = self.object_tracker.primary()
+
+        meta = np.full(META_SIZE, -1, dtype=np.int64)
+        if roi is not None:
+            meta[META_ROI] = (roi[0].start, roi[0].stop, roi[1].start, roi[1].stop)
+        if primary is not None:
+            meta[META_LINE_Y] = int(primary['centroid'][1])
+        meta[META_RANGE] = (min_depth, max_depth)
+
+        filtered = filter_depth_range(ctx, min_depth, max_depth, bilateral=bilateral, roi=roi,
+                                      pool=self.pool)
+        self.pool.end_frame()
+        return filtered, meta
+
+
+def meta_roi(meta):
+    """
+    ROI (slices) gravada nos metadados do frame, ou None
+    """
+    y0, y1, x0, x1 = (int(v) for v in meta[META_ROI])
+    if y0 < 0:
+        return None
+    return slice(y0, y1), slice(x0, x1)
+
+
+def meta_depth_range(meta):
+    """
+    Faixa de trabalho gravada nos metadados do frame, ou a faixa padrão
+    """
+    from vision.quality import DEPTH_MIN, DEPTH_MAX
+
+    min_depth, max_depth = (int(v) for v in meta[META_RANGE])
+    if min_depth < 0:
+        return DEPTH_MIN, DEPTH_MAX
+    return min_depth, max_depth
+
+
+class CameraSource:
+    """
+    Fonte DepthAI. O pipeline é criado no construtor (em standby) e o
+    dispositivo só é aberto em open().
+    """
+
+    def __init__(self, device_id=None, pairer=None):
+        from vision.depth_stream import create_pipeline, create_simple_pipeline
+
+        self.device_id = device_id
+        self.device = None
+        self.pairer = pairer or FramePairer()
+        self.host_temporal_filter = False
+        try:
+            print("[INFO] Tentando criar pipeline otimizado...")
+            self.pipeline = create_pipeline()
+        except Exception as e:
+            print(f"[WARNING] Falha no pipeline otimizado: {e}")
+            print("[INFO] Tentando pipeline simplificado...")
+            self.pipeline = create_simple_pipeline()
+            # o pipeline simplificado não tem filtro temporal no dispositivo
+            self.host_temporal_filter = True
+            print("[INFO] Filtro temporal no host ativado")
+
+    def open(self):
+        import depthai as dai
+
+        print("[INFO] Conectando ao dispositivo...")
+        if self.device_id:
+            self.device = dai.Device(self.pipeline, dai.DeviceInfo(self.device_id))
+        else:
+            self.device = dai.Device(self.pipeline)
+
+        print("[INFO] Configurando filas de saída...")
+        self.rgb_queue = self.device.getOutputQueue(name="rgb", maxSize=4, blocking=False)
+        self.depth_queue = self.device.getOutputQueue(name="depth", maxSize=4, blocking=False)
+
+    def read(self):
+        """
+        Retorna (rgb, depth, rgb_ts, depth_ts, pendentes, pareado); frames
+        ausentes vêm como None. As mensagens passam pelo pareador, e só o
+        par mais recente é convertido em imagem.
+        """
+        depth_messages = self.depth_queue.tryGetAll()
+        for stream, messages in (('rgb', self.rgb_queue.tryGetAll()), ('depth', depth_messages)):
+            for message in messages:
+                self.pairer.push(stream, message.getSequenceNum(),
+                                 _timestamp_ns(message.getTimestamp()), message)
+        pending = len(depth_messages)
+
+        result = self.pairer.pop()
+        if result is None:
+            return None, None, 0, 0, pending, False
+        rgb_message, depth_message, paired = result
+        rgb = depth = None
+        rgb_ts = depth_ts = 0
+        if rgb_message is not None:
+            rgb = rgb_message.getCvFrame()
+            rgb_ts = _timestamp_ns(rgb_message.getTimestamp())
+        if depth_message is not None:
+            depth = depth_message.getFrame()
+            depth_ts = _timestamp_ns(depth_message.getTimestamp())
+        return rgb, depth, rgb_ts, depth_ts, pending, paired
+
+    def close(self):
+        if self.device is not None:
+            self.device.close()
+            self.device = None
+
+
+class SimulatedSource:
+    """
+    Fonte sintética com o mesmo contrato da CameraSource, no ritmo de fps.
+    Cada device_index gera uma cena com fase e distância diferentes, para
+    simular várias câmeras vendo o mesmo objeto.
+    """
+
+    host_temporal_filter = False
+
+    def __init__(self, device_id=None, fps=30, device_index=0, pairer=None):
+        self.device_id = device_id or "simulado"
+        self.pairer = pairer or FramePairer()
+        self.period = 1.0 / fps
+        self.base = 300 + 20 * device_index
+        self.frame_index = 15 * device_index
+        self._next_time = None
+
+    def open(self):
+        self._next_time = time.monotonic()
+
+    def read(self):
+        from vision.simulate_stream import simulated_depth_frame, simulated_rgb_frame
+
+        now = time.monotonic()
+        if now < self._next_time:
+            return None, None, 0, 0, 0, False
+        self._next_time += self.period
+
+        timestamp = time.monotonic_ns()
+        self.pairer.push('rgb', self.frame_index, timestamp, simulated_rgb_frame())
+        self.pairer.push('depth', self.frame_index, timestamp,
+                         simulated_depth_frame(self.frame_index, base=self.base, amplitude=80))
+        self.frame_index += 1
+        rgb, depth, paired = self.pairer.pop()
+        return rgb, depth, timestamp, timestamp, 1, paired
+
+    def close(self):
+        pass
+
+
+def _timestamp_ns(timestamp):
+    return int(timestamp.total_seconds() * 1e9)
+
+
+def acquisition_main(config, ring_specs, status_queue, start_event, stop_event):
+    """
+    Laço do processo de aquisição
+    """
+    rgb_ring = SharedFrameRing.attach(**ring_specs['rgb'])
+    depth_ring = SharedFrameRing.attach(**ring_specs['depth'])
+    source = None
+    try:
+        device_index = config.get('device_index', 0)
+        pairer = FramePairer(tolerance_ms=config.get('pair_tolerance_ms', 15.0),
+                             key=config.get('pair_key', 'timestamp'))
+        if config.get('simulated'):
+            source = SimulatedSource(config.get('device_id'), fps=config.get('fps', 30),
+                                     device_index=device_index, pairer=pairer)
+        else:
+            source = CameraSource(config.get('device_id'), pairer=pairer)
+        status_queue.put(('standby', {}))
+
+        # pipeline já criado; aguarda o pedido de início
+        while not start_event.wait(0.1):
+            if stop_event.is_set():
+                return
+
+        source.open()
+        processor = DepthProcessor(source.host_temporal_filter)
+        status_queue.put(('running', {'host_temporal_filter': source.host_temporal_filter}))
+
+        # cena parada: frames iguais ao último publicado não são refiltrados
+        # nem republicados, e a interface mantém o que já exibiu
+        tolerance = config.get('change_tolerance')
+        depth_detector = rgb_detector = None
+        if tolerance is not None:
+            depth_detector = ChangeDetector(tolerance=tolerance)
+            rgb_detector = ChangeDetector(tolerance=config.get('rgb_change_tolerance', 4.0))
+
+        # alocação real por frame (tracemalloc amostrado), além do crescimento do pool
+        sampler = AllocationSampler(every=config.get('allocation_sample_every', 30))
+        frames = processed = dropped = pool_growth = 0
+        processing = 0.0
+        last_report = time.monotonic()
+        while not stop_event.is_set():
+            rgb, depth, rgb_ts, depth_ts, pending, paired = source.read()
+            if rgb is None and depth is None:
+                time.sleep(0.002)
+                continue
+
+            # RGB antes da profundidade do mesmo par: quem lê a profundidade
+            # nova já encontra o RGB correspondente publicado. Se o detector
+            # pulou o RGB do par, o ring guarda outro frame: sem par nos metadados
+            paired_rgb_seq = -1
+            if rgb is not None and (rgb_detector is None or rgb_detector.changed(rgb)):
+                rgb_ring.write(rgb, device_ts=rgb_ts)
+                if paired:
+                    paired_rgb_seq = rgb_ring.latest_seq
+            if depth is not None and depth.size > 0:
+                frames += 1
+                dropped += max(0, pending - 1)
+                if depth_detector is None or depth_detector.changed(depth):
+                    start = time.perf_counter()
+                    with sampler.measure():
+                        filtered, meta = processor.process(depth)
+                    meta[META_DEVICE] = device_index
+                    meta[META_RGB_SEQ] = paired_rgb_seq
+                    depth_ring.write(filtered, device_ts=depth_ts, meta=meta)
+                    processing += time.perf_counter() - start
+                    pool_growth += processor.pool.last_frame_bytes
+                    processed += 1
+
+            now = time.monotonic()
+            if now - last_report >= STATS_INTERVAL:
+                status_queue.put(('stats', {
+                    'fps': frames / (now - last_report),
+                    'dropped': dropped,
+                    'processing_ms': processing / processed * 1000 if processed else 0.0,
+                    'allocated_bytes': sampler.last_peak_bytes,
+                    'pool_growth_bytes': pool_growth // processed if processed else 0,
+                    'skip_rate': 1.0 - processed / frames if frames else 0.0,
+                    'rgb_skip_rate': rgb_detector.skip_rate if rgb_detector else 0.0,
+                    'quality': processor.quality_monitor.stats(),
+                    'pairing': pairer.stats(),
+                }))
+                pairer.reset_stats()
+                if rgb_detector is not None:
+                    rgb_detector.reset_stats()
+                frames = processed = dropped = pool_growth = 0
+                processing = 0.0
+                last_report = now
+
+    except Exception as e:
+        status_queue.put(('error', f"{type(e).__name__}: {e}"))
+        raise SystemExit(1)
+    finally:
+        if source is not None:
+            try:
+                source.close()
+            except Exception as e:
+                print(f"[WARNING] Erro ao fechar dispositivo: {e}")
+        rgb_ring.close()
+        depth_ring.close()
+
+
+class AcquisitionProcess:
+    """
+    Lado da interface: cria os rings, inicia e supervisiona o processo de
+    aquisição (reiniciando-o se cair) e lê os frames mais recentes.
+    """
+
+    def __init__(self, device_id=None, simulated=False, fps=30, device_index=0, change_tolerance=3.0):
+        """
+        change_tolerance: diferença média (mm) abaixo da qual um frame de
+        profundidade é considerado igual ao anterior; None desativa
+        """
+        self.config = {'device_id': device_id, 'simulated': simulated, 'fps': fps,
+                       'device_index': device_index, 'change_tolerance': change_tolerance}
+        self.device_id = device_id
+        self.device_index = device_index
+        self.rgb_ring = SharedFrameRing.create(RGB_CAPACITY, np.uint8)
+        self.depth_ring = SharedFrameRing.create(DEPTH_CAPACITY, np.uint16)
+
+        self._context = mp.get_context("spawn")
+        self.status_queue = self._context.Queue()
+        self.start_event = self._context.Event()
+        self.stop_event = self._context.Event()
+        self.process = None
+        self.state = "stopped"
+        self.stats = {}
+        self.restarts = 0
+        self._died_at = None
+        self._last_rgb_seq = -1
+        self._last_depth_seq = -1
+        # (device_ts, host_ts) dos últimos frames de profundidade e RGB lidos
+        self.last_depth_timing = (0, 0)
+        self.last_rgb_timing = (0, 0)
+
+    def start(self):
+        """
+        Inicia o processo em standby: pipeline criado, dispositivo fechado
+        """
+        self.stop_event.clear()
+        self.process = self._context.Process(
+            target=acquisition_main,
+            args=(self.config,
+                  {'rgb': self.rgb_ring.spec(), 'depth': self.depth_ring.spec()},
+                  self.status_queue, self.start_event, self.stop_event),
+            daemon=True)
+        self.process.start()
+        self.state = "starting"
+
+    def run(self):
+        """
+        Libera o processo para abrir o dispositivo e começar a publicar frames
+        """
+        if self.process is None:
+            self.start()
+        self.start_event.set()
+
+    def poll(self):
+        """
+        Processa mensagens de status e reinicia o processo se ele tiver caído.
+        Retorna True quando chegaram estatísticas novas.
+        """
+        stats_updated = False
+        while True:
+            try:
+                kind, payload = self.status_queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'stats':
+                self.stats = payload
+                stats_updated = True
+            elif kind == 'error':
+                print(f"[ERROR] Erro no processo de aquisição: {payload}")
+                print("[INFO] Possíveis soluções:")
+                for advice in DEVICE_ERROR_ADVICE:
+                    print(advice)
+            else:
+                self.state = kind
+                label = f"Aquisição ({self.device_id})" if self.device_id else "Aquisição"
+                print(f"[INFO] {label}: {kind}")
+
+        if self.process is not None and not self.process.is_alive() and not self.stop_event.is_set():
+            now = time.monotonic()
+            if self._died_at is None:
+                self._died_at = now
+                self.state = "crashed"
+                print(f"[WARNING] Processo de aquisição encerrou (código {self.process.exitcode})")
+            backoff = RESTART_BACKOFF[min(self.restarts, len(RESTART_BACKOFF) - 1)]
+            if now - self._died_at >= backoff:
+                print("[INFO] Reiniciando processo de aquisição...")
+                self.restarts += 1
+                self._died_at = None
+                self.start()
+        return stats_updated
+
+    def read_rgb(self, pool=None):
+        out = None if pool is None else pool.get(f"ring.rgb{self.device_index}", (RGB_CAPACITY,), np.uint8)
+        result = self.rgb_ring.read_latest(self._last_rgb_seq, out=out)
+        if result is None:
+            return None
+        seq, frame, device_ts, host_ts, meta = result
+        self._last_rgb_seq = seq
+        self.last_rgb_timing = (device_ts, host_ts)
+        return frame
+
+    def read_depth(self, pool=None):
+        """
+        Retorna (frame, meta, frames_pulados) do frame mais recente ou None.
+        Com pool, o frame é copiado para um buffer reaproveitado.
+        """
+        previous = self._last_depth_seq
+        out = None if pool is None else pool.get(f"ring.depth{self.device_index}", (DEPTH_CAPACITY,), np.uint16)
+        result = self.depth_ring.read_latest(previous, out=out)
+        if result is None:
+            return None
+        seq, frame, device_ts, host_ts, meta = result
+        self._last_depth_seq = seq
+        self.last_depth_timing = (device_ts, host_ts)
+        skipped = seq - previous - 1 if previous >= 0 else 0
+        return frame, meta, skipped
+
+    def rgb_matches(self, meta):
+        """
+        Indica se o último RGB lido é o pareado com o frame de profundidade de meta
+        """
+        rgb_seq = int(meta[META_RGB_SEQ])
+        return rgb_seq >= 0 and rgb_seq == self._last_rgb_seq
+
+    def snapshot(self):
+        """
+        Cópia dos últimos frames publicados, sem alterar a leitura do stream.
+        Retorna (rgb, depth, meta); frames ainda não publicados vêm como None.
+        """
+        rgb = self.rgb_ring.read_latest()
+        depth = self.depth_ring.read_latest()
+        return (None if rgb is None else rgb[1],
+                None if depth is None else depth[1],
+                None if depth is None else depth[4])
+
+    def stop(self, timeout=2.0):
+        self.stop_event.set()
+        if self.process is not None:
+            self.process.join(timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+            self.process = None
+        self.state = "stopped"
+
+    def close(self):
+        self.stop()
+        self.rgb_ring.close()
+        self.depth_ring.close()
@@ -1,151 +1,204 @@
-import depthai as dai
-import cv2
+import threading
 import numpy as np
-from PIL import Image, ImageTk
-from vision.depth_stream import create_pipeline, create_simple_pipeline, filter_depth_range
-from gui.plot_utils import render_profile_plot, render_depth_colormap
-from customtkinter import CTkImage
+from vision.depth_stream import local_surface_analysis
+from vision.curvature import select_inspection_targets
+from gui.plot_utils import render_profile_plot, render_depth_colormap, render_surface_scan
+from vision.frame_context import DepthFrameContext
+from vision.acquisition import meta_roi, meta_depth_range, META_LINE_Y
+from vision.devices import DeviceManager
+from utils.conversions import get_display_surface, RGB_VIEW_SIZE
+from gui.scheduler import create_display_governor
+from utils.buffers import BufferPool
+from vision.frame_sync import DisplayLatency, capture_wall_time
+
+_acquisition_lock = threading.Lock()
+
+
+def prepare_acquisition(gui, devices=None):
+    """
+    Cria (uma única vez) um processo de aquisição em standby por dispositivo:
+    os pipelines já ficam prontos, mas os dispositivos só são abertos em
+    start_camera_stream
+    """
+    with _acquisition_lock:
+        if getattr(gui, 'devices', None) is None:
+            gui.devices = devices if devices is not None else DeviceManager.from_connected()
+            gui.devices.start()
+            device_ids = gui.devices.device_ids
+            gui.after(0, lambda: gui.set_devices(device_ids))
+        return gui.devices
 
 
 def start_camera_stream(gui):
     """
-    Inicia o stream da câmera com tratamento de erros melhorado
+    Inicia o stream da câmera. DepthAI e filtragem rodam no processo de
+    aquisição; aqui só lemos a memória compartilhada e exibimos.
     """
     try:
-        print("[INFO] Tentando criar pipeline otimizado...")
-        pipeline = create_pipeline()
+        devices = prepare_acquisition(gui)
+        devices.run()
     except Exception as e:
-        print(f"[WARNING] Falha no pipeline otimizado: {e}")
-        print("[INFO] Tentando pipeline simplificado...")
-        try:
-            pipeline = create_simple_pipeline()
-        except Exception as e2:
-            print(f"[ERROR] Falha também no pipeline simplificado: {e2}")
-            print(
-                "[ERROR] Não foi possível inicializar a câmera. Verifique a conexão do dispositivo.")
-            return
+        print(f"[ERROR] Não foi possível iniciar o processo de aquisição: {e}")
+        return
 
-    try:
-        print("[INFO] Conectando ao dispositivo...")
-        gui.device = dai.Device(pipeline)
-
-        print("[INFO] Configurando filas de saída...")
-        gui.rgb_queue = gui.device.getOutputQueue(
-            name="rgb", maxSize=4, blocking=False)
-        gui.depth_queue = gui.device.getOutputQueue(
-            name="depth", maxSize=4, blocking=False)
-
-        print("[INFO] Iniciando atualização de frames...")
-        update_camera_frames(gui)
-        print("[INFO] Stream da câmera iniciado com sucesso!")
-
-    except Exception as e:
-        print(f"[ERROR] Erro ao conectar com o dispositivo: {e}")
-        print("[INFO] Possíveis soluções:")
-        print("- Verifique se o cabo USB está conectado")
-        print("- Tente uma porta USB diferente")
-        print("- Reinicie o dispositivo")
-        print("- Verifique se não há outro processo usando a câmera")
+    print("[INFO] Iniciando atualização de frames...")
+    gui.governor = create_display_governor()
+    gui.buffer_pool = BufferPool()
+    gui.latency = DisplayLatency()
+    update_camera_frames(gui)
+    print("[INFO] Stream da câmera iniciado com sucesso!")
 
 
 def update_camera_frames(gui):
     """
-    Atualiza os frames da câmera com tratamento de erros
+    Atualiza os frames da câmera com tratamento de erros.
+    O próximo tick e os estágios executados são decididos pelo gui.governor.
     """
+    governor = gui.governor
+    pool = gui.buffer_pool
+    governor.begin_frame()
+    pool.begin_frame()
+    queue_depth = 0
+
     try:
-        # RGB
-        if hasattr(gui, 'rgb_queue') and gui.rgb_queue:
-            in_rgb = gui.rgb_queue.tryGet()
-            if in_rgb:
-                try:
-                    rgb_frame = in_rgb.getCvFrame()
-                    img = Image.fromarray(cv2.cvtColor(
-                        rgb_frame, cv2.COLOR_BGR2RGB))
-                    imgtk = CTkImage(light_image=img, size=(440, 350))
-                    gui.rgb_canvas.configure(image=imgtk, text="")
-                    gui.rgb_canvas.image = imgtk
-                except Exception as e:
-                    print(f"[WARNING] Erro ao processar frame RGB: {e}")
+        # status, estatísticas e reinício dos processos de aquisição
+        devices = gui.devices
+        telemetry = getattr(gui, 'telemetry', None)
+        if devices.poll():
+            status = devices.summary() + " | latência: " + gui.latency.summary()
+            gui.latency.reset()
+            if telemetry is not None:
+                status += " | telemetria: " + telemetry.summary()
+            gui.set_status(status)
+
+        # RGB do dispositivo selecionado
+        rgb_frame = devices.read_rgb(pool)
+        if rgb_frame is not None:
+            try:
+                get_display_surface(gui.rgb_canvas, RGB_VIEW_SIZE).update(
+                    rgb_frame, order="bgr")
+            except Exception as e:
+                print(f"[WARNING] Erro ao processar frame RGB: {e}")
 
         # Depth
-        if hasattr(gui, 'depth_queue') and gui.depth_queue:
-            in_depth = gui.depth_queue.tryGet()
-            if in_depth:
-                try:
-                    depth_frame = in_depth.getFrame()
-
-                    if depth_frame is not None and depth_frame.size > 0:
-                        depth_frame = filter_depth_range(depth_frame)
-                        depth_frame = depth_frame.astype(np.uint16)
-
-                        try:
-                            render_profile_plot(
-                                depth_frame, gui.normals_canvas, gui)
-                        except Exception as e:
-                            print(
-                                f"[WARNING] Erro ao renderizar plot de perfil: {e}")
-
-                        depth_clip = np.clip(
-                            depth_frame, gui.min_depth, gui.max_depth)
-
-                        depth_range = gui.max_depth - gui.min_depth
-                        if depth_range > 0:
-                            depth_norm = (
-                                (depth_clip - gui.min_depth) / depth_range * 255).astype(np.uint8)
-                        else:
-                            depth_norm = np.zeros_like(
-                                depth_clip, dtype=np.uint8)
-
-                        depth_colormap = cv2.applyColorMap(
-                            depth_norm, cv2.COLORMAP_JET)
-
-                        img = Image.fromarray(depth_colormap)
-                        imgtk = CTkImage(light_image=img, size=(440, 350))
-                        #gui.depth_canvas.configure(image=imgtk, text="")
-                        render_depth_colormap(
-                            depth_frame, gui.depth_canvas, gui)
-
-                        gui.depth_canvas.image = imgtk
-                    else:
-                        print("[WARNING] Frame de profundidade inválido recebido")
-
-                except Exception as e:
-                    print(
-                        f"[WARNING] Erro ao processar frame de profundidade: {e}")
+        depth = devices.read_depth(pool)
+        if depth is not None:
+            depth_frame, meta, skipped = depth
+            queue_depth = skipped + 1
+            try:
+                if depth_frame.size > 0:
+                    process_depth_frame(gui, depth_frame, meta)
+                    gui.last_depth = (depth_frame, meta)
+                    # captura -> exibição, medido depois de renderizar
+                    gui.latency.record(*devices.current.last_depth_timing,
+                                       rgb_matched=devices.current.rgb_matches(meta))
+                else:
+                    print("[WARNING] Frame de profundidade inválido recebido")
+
+            except Exception as e:
+                print(
+                    f"[WARNING] Erro ao processar frame de profundidade: {e}")
+        elif governor.pending("surface") and getattr(gui, 'last_depth', None) is not None:
+            # cena parada (nenhum frame novo publicado): a análise pedida
+            # roda sobre o último frame recebido
+            process_depth_frame(gui, *gui.last_depth)
+
+        # telemetria: o servidor copia os frames e codifica na thread dele;
+        # o timestamp é o da captura, para o cliente medir a latência total
+        if telemetry is not None:
+            current = devices.current
+            if depth is not None:
+                telemetry.publish(current.device_index, rgb_frame, depth[0],
+                                  meta_depth_range(depth[1]),
+                                  timestamp=capture_wall_time(*current.last_depth_timing))
+            elif rgb_frame is not None:
+                telemetry.publish(current.device_index, rgb_frame,
+                                  timestamp=capture_wall_time(*current.last_rgb_timing))
 
     except Exception as e:
         print(f"[ERROR] Erro geral na atualização de frames: {e}")
 
+    pool.end_frame()
+    delay_ms = governor.end_frame(queue_depth)
     try:
-        gui.after(30, lambda: update_camera_frames(gui))
+        gui.after(delay_ms, lambda: update_camera_frames(gui))
     except Exception as e:
         print(f"[ERROR] Erro ao agendar próxima atualização: {e}")
 
 
-def cleanup_camera_stream(gui):
+def process_depth_frame(gui, depth_frame, meta):
     """
-    Limpa recursos da câmera
+    Estágios de exibição de um frame de profundidade já filtrado pelo
+    processo de aquisição, na ordem de prioridade
     """
-    try:
-        if hasattr(gui, 'device') and gui.device:
-            gui.device.close()
-            print("[INFO] Dispositivo fechado com sucesso")
-    except Exception as e:
-        print(f"[WARNING] Erro ao fechar dispositivo: {e}")
+    governor = gui.governor
+    roi = meta_roi(meta)
+    line_y = int(meta[META_LINE_Y]) if meta[META_LINE_Y] >= 0 else 240
+    # faixa de trabalho do monitor de qualidade: os pixels fora dela já
+    # chegam zerados, e colormap e perfis usam a mesma faixa
+    min_depth, max_depth = meta_depth_range(meta)
+    gui.min_depth, gui.max_depth = min_depth, max_depth
+
+    # um contexto por frame: os produtos derivados são calculados uma vez
+    # e compartilhados por todos os estágios abaixo
+    depth_frame = DepthFrameContext(depth_frame, pool=gui.buffer_pool)
+    gui.set_frame_height(depth_frame.shape[0])
+
+    with governor.measure("colormap"):
+        render_depth_colormap(depth_frame, gui.depth_canvas, gui, min_depth, max_depth)
+
+    if governor.due("profile"):
+        with governor.measure("profile"):
+            try:
+                if getattr(gui, 'surface_scan_mode', False):
+                    render_surface_scan(depth_frame, gui.normals_canvas, gui,
+                                        cursor_row=gui.scan_cursor_row,
+                                        min_depth=min_depth, max_depth=max_depth)
+                else:
+                    render_profile_plot(depth_frame, gui.normals_canvas, gui, line_y=line_y,
+                                        min_depth=min_depth, max_depth=max_depth)
+            except Exception as e:
+                print(
+                    f"[WARNING] Erro ao renderizar plot de perfil: {e}")
+
+    if governor.due("surface"):
+        with governor.measure("surface"):
+            surface = depth_frame if roi is None else depth_frame.raw[roi]
+            rugosity, curvature = local_surface_analysis(surface)
+            targets = select_inspection_targets(depth_frame, min_depth=min_depth, max_depth=max_depth)
+            gui.surface_analysis = {
+                'rugosity': rugosity,
+                'curvature': curvature,
+                'roi': roi,
+                'targets': targets,
+            }
+            print(f"[INFO] Análise de superfície: rugosidade média "
+                  f"{np.nanmean(rugosity):.2f} mm, curvatura média {np.nanmean(curvature):.2f}")
+            for target in targets:
+                print(f"  alvo ({target['kind']}): linha {target['row']}, coluna {target['col']}, "
+                      f"{target['depth']:.0f} mm")
+
 
+def cleanup_camera_stream(gui):
+    """
+    Encerra os processos de aquisição e libera a memória compartilhada
+    """
     try:
-        if hasattr(gui, 'rgb_queue'):
-            gui.rgb_queue = None
-        if hasattr(gui, 'depth_queue'):
-            gui.depth_queue = None
+        devices = getattr(gui, 'devices', None)
+        if devices is not None:
+            devices.close()
+            gui.devices = None
+            print("[INFO] Processos de aquisição encerrados")
     except Exception as e:
-        print(f"[WARNING] Erro ao limpar filas: {e}")
+        print(f"[WARNING] Erro ao encerrar aquisição: {e}")
 
 
 def check_device_connection():
     """
     Verifica se há dispositivos DepthAI conectados
     """
+    import depthai as dai
+
     try:
         devices = dai.Device.getAllAvailableDevices()
         if len(devices) == 0:
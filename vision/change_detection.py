@@ -0,0 +1,91 @@
+"""
+Detecção de mudança entre frames para pular o reprocessamento de cenas paradas
+"""
+import numpy as np
+
+
+class ChangeDetector:
+    """
+    Compara uma assinatura reduzida (amostragem a cada step pixels) do frame
+    novo com a do último frame processado. Para profundidade (uint16), o
+    pixel zero é inválido: a diferença média usa só os pixels válidos nos
+    dois frames e a fração de pixels que trocaram de validade conta à parte.
+
+    Como a referência só avança quando um frame é processado, mudanças
+    lentas se acumulam até passar da tolerância. max_skip força o
+    processamento depois de muitos frames pulados seguidos.
+    """
+
+    def __init__(self, step=8, tolerance=3.0, validity_tolerance=0.01, max_skip=60):
+        self.step = step
+        self.tolerance = tolerance
+        self.validity_tolerance = validity_tolerance
+        self.max_skip = max_skip
+
+        self._reference = None
+        self._skipped_in_row = 0
+        self.frames = 0
+        self.skipped = 0
+        self.last_difference = 0.0
+
+    def reset(self):
+        self._reference = None
+        self._skipped_in_row = 0
+
+    def reset_stats(self):
+        """
+        Zera as contagens (não a referência), para taxas por intervalo
+        """
+        self.frames = 0
+        self.skipped = 0
+
+    def changed(self, frame):
+        """
+        True quando o frame deve ser processado; False quando pode reaproveitar
+        os resultados do último frame processado
+        """
+        signature = np.asarray(frame)[::self.step, ::self.step]
+        self.frames += 1
+
+        if (self._reference is None or self._reference.shape != signature.shape
+                or self._skipped_in_row >= self.max_skip
+                or self._differs(signature)):
+            self._reference = signature.astype(np.int32)
+            self._skipped_in_row = 0
+            return True
+
+        self._skipped_in_row += 1
+        self.skipped += 1
+        return False
+
+    def _differs(self, signature):
+        current = signature.astype(np.int32)
+        reference = self._reference
+
+        if signature.dtype == np.uint16:
+            valid_now = current > 0
+            valid_before = reference > 0
+            flipped = np.count_nonzero(valid_now != valid_before) / current.size
+            if flipped > self.validity_tolerance:
+                self.last_difference = float('inf')
+                return True
+            both = valid_now & valid_before
+            if not np.any(both):
+                self.last_difference = 0.0
+                return False
+            self.last_difference = float(np.abs(current[both] - reference[both]).mean())
+        else:
+            self.last_difference = float(np.abs(current - reference).mean())
+        return self.last_difference > self.tolerance
+
+    @property
+    def skip_rate(self):
+        return self.skipped / self.frames if self.frames else 0.0
+
+    def stats(self):
+        return {
+            'frames': self.frames,
+            'skipped': self.skipped,
+            'skip_rate': self.skip_rate,
+            'last_difference': self.last_difference,
+        }
@@ -0,0 +1,179 @@
+"""
+Curvatura 2D da superfície (média, gaussiana e principais) e pontos de
+interesse para escolher alvos de inspeção
+"""
+import numpy as np
+import cv2
+
+from vision.frame_context import as_frame_context
+from vision.quality import DEPTH_MIN, DEPTH_MAX
+
+
+def _gaussian_kernels(sigma):
+    """
+    Núcleos 1D da gaussiana e das suas derivadas de 1ª e 2ª ordem
+    """
+    radius = max(1, int(np.ceil(3 * sigma)))
+    x = np.arange(-radius, radius + 1, dtype=np.float32)
+    g0 = np.exp(-x ** 2 / (2 * sigma ** 2))
+    g0 /= g0.sum()
+    # sinais para correlação (sepFilter2D não espelha o núcleo)
+    g1 = x / sigma ** 2 * g0
+    g2 = (x ** 2 / sigma ** 4 - 1 / sigma ** 2) * g0
+    g2 -= g2.mean()  # resposta nula para superfícies planas
+    # normalização discreta: resposta exata a x e a x²/2
+    g1 /= np.dot(g1, x)
+    g2 *= 2.0 / np.dot(g2, x ** 2)
+    return g0, g1, g2
+
+
+def surface_derivatives(depth_frame, sigma=3.0, min_depth=DEPTH_MIN, max_depth=DEPTH_MAX,
+                        focal_length=525.0, min_support=0.95, level=0):
+    """
+    Derivadas de 1ª e 2ª ordem (fx, fy, fxx, fxy, fyy) do mapa de
+    profundidade, com filtros separáveis de derivada de gaussiana.
+
+    Buracos são preenchidos por convolução normalizada antes de derivar, e
+    pixels cuja vizinhança tem menos de min_support de pontos válidos saem
+    como inválidos. Com focal_length, as derivadas são convertidas para
+    unidades métricas (tamanho do pixel = z / f), e as curvaturas saem em 1/mm.
+
+    sigma (em pixels do nível usado) precisa cobrir os degraus de 1 mm do
+    frame uint16; com sigma < 2 superfícies suaves parecem planas por partes.
+    level > 0 usa a pirâmide reduzida do frame (2**level menor).
+    """
+    ctx = as_frame_context(depth_frame)
+    if level:
+        ctx = as_frame_context(ctx.downsampled(level))
+        if focal_length:
+            focal_length = focal_length / 2 ** level
+    valid = ctx.range_mask(min_depth, max_depth).astype(np.float32)
+    depth = ctx.float_view * valid
+
+    g0, g1, g2 = _gaussian_kernels(sigma)
+    support = cv2.sepFilter2D(valid, cv2.CV_32F, g0, g0, borderType=cv2.BORDER_REPLICATE)
+    smoothed = cv2.sepFilter2D(depth, cv2.CV_32F, g0, g0, borderType=cv2.BORDER_REPLICATE)
+    filled = np.where(valid > 0, depth, smoothed / np.maximum(support, 1e-6))
+
+    def derivative(kx, ky):
+        return cv2.sepFilter2D(filled, cv2.CV_32F, kx, ky, borderType=cv2.BORDER_REPLICATE)
+
+    fx, fy = derivative(g1, g0), derivative(g0, g1)
+    fxx, fxy, fyy = derivative(g2, g0), derivative(g1, g1), derivative(g0, g2)
+
+    if focal_length:
+        pixel_size = np.maximum(filled, 1.0) / focal_length  # mm por pixel
+        fx /= pixel_size
+        fy /= pixel_size
+        pixel_area = pixel_size ** 2
+        fxx /= pixel_area
+        fxy /= pixel_area
+        fyy /= pixel_area
+
+    mask = (valid > 0) & (support >= min_support)
+    return {'fx': fx, 'fy': fy, 'fxx': fxx, 'fxy': fxy, 'fyy': fyy, 'mask': mask}
+
+
+def compute_curvature_maps(depth_frame, sigma=3.0, min_depth=DEPTH_MIN, max_depth=DEPTH_MAX,
+                           focal_length=525.0, level=0):
+    """
+    Curvaturas de todos os pixels em uma passada vetorizada, tratando a
+    profundidade como superfície z = f(u, v):
+
+        K = (fxx fyy - fxy²) / (1 + fx² + fy²)²
+        H = ((1 + fx²) fyy - 2 fx fy fxy + (1 + fy²) fxx) / (2 (1 + fx² + fy²)^(3/2))
+        k1, k2 = H ± sqrt(H² - K)
+
+    Pixels inválidos saem como NaN. Os mapas têm a resolução do nível usado.
+    """
+    d = surface_derivatives(depth_frame, sigma, min_depth, max_depth, focal_length, level=level)
+    fx, fy, fxx, fxy, fyy = d['fx'], d['fy'], d['fxx'], d['fxy'], d['fyy']
+
+    grad_sq = 1.0 + fx * fx + fy * fy
+    gaussian = (fxx * fyy - fxy * fxy) / (grad_sq * grad_sq)
+    mean = ((1.0 + fx * fx) * fyy - 2.0 * fx * fy * fxy + (1.0 + fy * fy) * fxx) / (2.0 * grad_sq ** 1.5)
+    spread = np.sqrt(np.maximum(mean * mean - gaussian, 0.0))
+    k1 = mean + spread
+    k2 = mean - spread
+
+    invalid = ~d['mask']
+    for curvature in (gaussian, mean, k1, k2):
+        curvature[invalid] = np.nan
+
+    return {
+        'mean': mean,
+        'gaussian': gaussian,
+        'k1': k1,
+        'k2': k2,
+        'mask': d['mask'],
+    }
+
+
+def _top_candidates(score, count, suppression=7):
+    """
+    Até count máximos locais de score (supressão de não-máximos com
+    dilatação), escolhidos por seleção O(n) com argpartition
+    """
+    score = np.nan_to_num(score, nan=0.0)
+    local_max = score >= cv2.dilate(score, np.ones((suppression, suppression), np.uint8))
+    candidates = np.flatnonzero(local_max & (score > 0))
+    if len(candidates) == 0:
+        return np.empty((0, 2), dtype=np.intp), np.empty(0, dtype=np.float32)
+
+    values = score.ravel()[candidates]
+    if len(candidates) > count:
+        keep = np.argpartition(values, -count)[-count:]
+        candidates, values = candidates[keep], values[keep]
+    order = np.argsort(values)[::-1]  # só os count escolhidos são ordenados
+    rows, cols = np.unravel_index(candidates[order], score.shape)
+    return np.stack([rows, cols], axis=1), values[order]
+
+
+def curvature_features(curvature, n_edges=200, n_corners=20, suppression=7):
+    """
+    Candidatos a borda (uma curvatura principal alta, a outra baixa) e a
+    canto (as duas altas, |K| grande)
+    """
+    k1 = np.abs(curvature['k1'])
+    k2 = np.abs(curvature['k2'])
+    strong = np.fmax(k1, k2)
+    weak = np.fmin(k1, k2)
+
+    edges, edge_scores = _top_candidates(strong - weak, n_edges, suppression)
+    corners, corner_scores = _top_candidates(np.abs(curvature['gaussian']), n_corners, suppression)
+    return {
+        'edges': edges,
+        'edge_scores': edge_scores,
+        'corners': corners,
+        'corner_scores': corner_scores,
+    }
+
+
+def select_inspection_targets(depth_frame, n_targets=5, sigma=2.0, min_depth=DEPTH_MIN,
+                              max_depth=DEPTH_MAX, focal_length=525.0, suppression=9, level=1):
+    """
+    Alvos de inspeção do frame: cantos primeiro, depois as bordas mais
+    fortes. Retorna lista de dicts com linha, coluna (no frame original),
+    profundidade e tipo. Por padrão roda na metade da resolução, para caber
+    no tempo de um frame.
+    """
+    ctx = as_frame_context(depth_frame)
+    curvature = compute_curvature_maps(ctx, sigma, min_depth, max_depth, focal_length, level=level)
+    features = curvature_features(curvature, n_edges=n_targets, n_corners=n_targets,
+                                  suppression=suppression)
+
+    targets = []
+    for kind, points, scores in (('canto', features['corners'], features['corner_scores']),
+                                 ('borda', features['edges'], features['edge_scores'])):
+        for (row, col), score in zip(points, scores):
+            if len(targets) >= n_targets:
+                break
+            row, col = row << level, col << level
+            targets.append({
+                'row': int(row),
+                'col': int(col),
+                'depth': float(ctx.raw[row, col]),
+                'kind': kind,
+                'score': float(score),
+            })
+    return targets
@@ -14,41 +14,28 @@ Ajustes adicionais foram aplicados empiricamente com base na prática em laborat
 dos mapas de profundidade.
 """
 
-import depthai as dai
 import numpy as np
 import cv2
 from scipy.ndimage import gaussian_filter1d, uniform_filter
+from vision.frame_context import as_frame_context
+from utils.buffers import pool_buffer
+from vision.quality import DEPTH_MIN, DEPTH_MAX, depth_histogram, histogram_stats
 
 
-DEPTH_MIN = 100   # mm 
-DEPTH_MAX = 430   # mm 
 CONFIDENCE_THRESHOLD = 255  # Mais permissivo
 LR_CHECK_THRESHOLD = 4      # Mais tolerante
 
-def extract_stable_profile_line(depth_frame, line_y=240, window_size=5):
-    height, width = depth_frame.shape
-    start_y = max(0, line_y - window_size // 2)
-    end_y = min(height, line_y + window_size // 2 + 1)
-    lines = depth_frame[start_y:end_y, :].astype(np.float32)
-    lines[lines == 0] = np.nan
-    profile_line = np.nanmedian(lines, axis=0)
-    valid_mask = ~np.isnan(profile_line)
-    if np.sum(valid_mask) > 20:
-        x_coords = np.arange(len(profile_line))
-        valid_coords = x_coords[valid_mask]
-        valid_values = profile_line[valid_mask]
-        if len(valid_values) > 10:
-            profile_line = np.interp(x_coords, valid_coords, valid_values)
-            profile_line = gaussian_filter1d(profile_line, sigma=1.5)
-    return profile_line
+def extract_vertical_profile(depth_frame, col_x=320, window_size=5):
+    ctx = as_frame_context(depth_frame)
+    return ctx.profile(('vertical', col_x, window_size),
+                       lambda: _stable_vertical_profile(ctx, col_x, window_size)).copy()
 
 
-def extract_vertical_profile(depth_frame, col_x=320, window_size=5):
-    height, width = depth_frame.shape
+def _stable_vertical_profile(ctx, col_x, window_size):
+    height, width = ctx.shape
     start_x = max(0, col_x - window_size // 2)
     end_x = min(width, col_x + window_size // 2 + 1)
-    columns = depth_frame[:, start_x:end_x].astype(np.float32)
-    columns[columns == 0] = np.nan
+    columns = ctx.nan_view[:, start_x:end_x]
     profile_column = np.nanmedian(columns, axis=1)
     valid_mask = ~np.isnan(profile_column)
     if np.sum(valid_mask) > 20:
@@ -61,8 +48,7 @@ def extract_vertical_profile(depth_frame, col_x=320, window_size=5):
 
 
 def local_surface_analysis(depth_frame, window_size=21):
-    depth = depth_frame.astype(np.float32)
-    depth[depth == 0] = np.nan
+    depth = as_frame_context(depth_frame).nan_view
     mean = uniform_filter(depth, size=window_size, mode='constant')
     sq_mean = uniform_filter(depth**2, size=window_size, mode='constant')
     var = sq_mean - mean**2
@@ -78,6 +64,8 @@ def create_pipeline():
     Pipeline otimizado especificamente para detecção estável
     de objetos próximos com OAK-D-Lite
     """
+    import depthai as dai
+
     pipeline = dai.Pipeline()
 
     # RGB Camera
@@ -183,6 +171,8 @@ def create_simple_pipeline():
     """
     Pipeline simplificado para máxima compatibilidade
     """
+    import depthai as dai
+
     pipeline = dai.Pipeline()
 
     cam_rgb = pipeline.create(dai.node.ColorCamera)
@@ -227,43 +217,68 @@ def create_simple_pipeline():
     return pipeline
 
 
-def filter_depth_range(depth_frame, min_depth=DEPTH_MIN, max_depth=DEPTH_MAX):
+def filter_depth_range(depth_frame, min_depth=DEPTH_MIN, max_depth=DEPTH_MAX, bilateral=True, roi=None,
+                       pool=None):
     """
     Filtragem avançada para estabilizar profundidade em objetos próximos.
     Corrige erro do bilateralFilter usando float32.
+    bilateral=False só aplica a faixa (quando já há filtragem temporal).
+    roi=(slice_linhas, slice_colunas) filtra só a região do objeto; o resto sai zerado.
+    Com pool (BufferPool), todos os intermediários e a saída vêm do pool.
     """
-    filtered = depth_frame.astype(np.float32)
+    ctx = as_frame_context(depth_frame)
+
+    if roi is not None:
+        if pool is None:
+            filtered = np.zeros(ctx.shape, dtype=np.uint16)
+        else:
+            filtered = pool.zeros("filter.frame", ctx.shape, np.uint16)
+        filtered[roi] = filter_depth_range(ctx.raw[roi], min_depth, max_depth, bilateral, pool=pool)
+        return filtered
 
     #  máscara de validade
-    mask = (filtered >= min_depth) & (filtered <= max_depth)
-    filtered[~mask] = np.nan
+    depth = ctx.raw
+    mask = pool_buffer(pool, "filter.mask", depth.shape, bool)
+    np.greater_equal(depth, min_depth, out=mask)
+    mask &= np.less_equal(depth, max_depth, out=pool_buffer(pool, "filter.scratch", depth.shape, bool))
+    outside = np.logical_not(mask, out=pool_buffer(pool, "filter.outside", depth.shape, bool))
+
+    #  zera os pixels fora da faixa (float32 é ok para o bilateralFilter)
+    valid = pool_buffer(pool, "filter.valid", depth.shape, np.float32)
+    np.copyto(valid, depth, casting='unsafe')
+    np.copyto(valid, 0, where=outside)
+
+    if bilateral and np.count_nonzero(mask) > 100:
+        smoothed = pool_buffer(pool, "filter.bilateral", depth.shape, np.float32)
+        cv2.bilateralFilter(valid, d=9, sigmaColor=75, sigmaSpace=75, dst=smoothed)
+        np.copyto(smoothed, 0, where=outside)  # Restaura os nulos originais
+        valid = smoothed
 
-    if np.count_nonzero(mask) > 100:
-        #  filtro bilateral com float32 (ok para OpenCV)
-        valid = np.copy(filtered)
-        valid[np.isnan(valid)] = 0  # zera os NaNs para filtrar
-        valid = cv2.bilateralFilter(valid, d=9, sigmaColor=75, sigmaSpace=75)
-        valid[np.isnan(filtered)] = 0  # Restaura os nulos originais
-        return valid.astype(np.uint16)
-    else:
-        filtered[np.isnan(filtered)] = 0
-        return filtered.astype(np.uint16)
+    output = pool_buffer(pool, "filter.output", depth.shape, np.uint16)
+    np.copyto(output, valid, casting='unsafe')
+    return output
 
 
 
 def extract_stable_profile_line(depth_frame, line_y=240, window_size=5):
     """
     Extrai linha de profundidade estável usando média de múltiplas linhas
-    Para usar no plot_utils.py
+    Para usar no plot_utils.py. Aceita array ou DepthFrameContext; o perfil
+    é calculado uma vez por frame e cada chamada recebe uma cópia.
     """
-    height, width = depth_frame.shape
+    ctx = as_frame_context(depth_frame)
+    return ctx.profile(('horizontal', line_y, window_size),
+                       lambda: _stable_profile_line(ctx, line_y, window_size)).copy()
+
+
+def _stable_profile_line(ctx, line_y, window_size):
+    height, width = ctx.shape
 
     start_y = max(0, line_y - window_size // 2)
     end_y = min(height, line_y + window_size // 2 + 1)
 
-    # extraindo múltiplas linhas
-    lines = depth_frame[start_y:end_y, :].astype(np.float32)
-    lines[lines == 0] = np.nan
+    # extraindo múltiplas linhas (zeros já como NaN)
+    lines = ctx.nan_view[start_y:end_y, :]
 
     #  mediana ao longo do eixo Y
     profile_line = np.nanmedian(lines, axis=0)
@@ -298,24 +313,9 @@ def optimize_device_settings(device):
     except Exception as e:
         print(f"[INFO] Configurações IR não disponíveis: {e}")
 
-def analyze_depth_quality(depth_frame, line_y=240):
+def analyze_depth_quality(depth_frame, min_depth=DEPTH_MIN, max_depth=DEPTH_MAX):
     """
-    Analisa qualidade da detecção de profundidade
+    Analisa qualidade da detecção de profundidade no frame inteiro,
+    a partir de um único histograma de 1 mm
     """
-    profile = depth_frame[line_y, :].astype(np.float32)
-    profile[profile == 0] = np.nan
-
-    valid_points = np.sum(~np.isnan(profile))
-    close_points = np.sum((profile > 200) & (profile < 600))
-
-    stats = {
-        'total_pixels': len(profile),
-        'valid_points': valid_points,
-        'close_points': close_points,
-        'validity_ratio': valid_points / len(profile),
-        'close_ratio': close_points / len(profile) if valid_points > 0 else 0,
-        'mean_depth': np.nanmean(profile),
-        'depth_std': np.nanstd(profile)
-    }
-
-    return stats
+    return histogram_stats(depth_histogram(depth_frame), min_depth, max_depth)
@@ -0,0 +1,134 @@
+"""
+Gerenciamento de múltiplas câmeras OAK: um processo de aquisição (pipeline,
+filtragem e ring próprios) por MxID, todos rodando em paralelo
+"""
+from vision.acquisition import AcquisitionProcess
+
+
+def list_device_ids():
+    """
+    MxIDs dos dispositivos DepthAI disponíveis
+    """
+    import depthai as dai
+
+    return [device.getMxId() for device in dai.Device.getAllAvailableDevices()]
+
+
+class DeviceManager:
+    """
+    Mantém um AcquisitionProcess por dispositivo. Os frames ficam separados
+    por dispositivo (um ring por câmera, índice gravado nos metadados) e a
+    interface escolhe qual stream exibir com select().
+    """
+
+    def __init__(self, device_ids, simulated=False, fps=30):
+        if not device_ids:
+            raise ValueError("Nenhum dispositivo informado")
+        self.device_ids = list(device_ids)
+        self.acquisitions = {
+            device_id: AcquisitionProcess(device_id, simulated=simulated, fps=fps,
+                                          device_index=index)
+            for index, device_id in enumerate(self.device_ids)
+        }
+        self.selected = self.device_ids[0]
+
+    @classmethod
+    def from_connected(cls, fps=30):
+        """
+        Um processo por MxID listado; sem nenhum listado, um único processo
+        sem MxID (o erro de conexão é reportado por ele, como antes)
+        """
+        device_ids = list_device_ids()
+        if not device_ids:
+            print("[WARNING] Nenhum dispositivo DepthAI encontrado")
+            return cls([None], fps=fps)
+        print(f"[INFO] {len(device_ids)} dispositivo(s) encontrado(s): {', '.join(device_ids)}")
+        return cls(device_ids, fps=fps)
+
+    @classmethod
+    def simulated(cls, count=2, fps=30):
+        """
+        count câmeras sintéticas no lugar dos dispositivos reais
+        """
+        return cls([f"simulado-{i}" for i in range(count)], simulated=True, fps=fps)
+
+    def __len__(self):
+        return len(self.device_ids)
+
+    @property
+    def current(self):
+        return self.acquisitions[self.selected]
+
+    def select(self, device_id):
+        if device_id not in self.acquisitions:
+            raise KeyError(f"Dispositivo desconhecido: {device_id}")
+        self.selected = device_id
+        print(f"[INFO] Exibindo dispositivo {device_id}")
+
+    def start(self):
+        for acquisition in self.acquisitions.values():
+            acquisition.start()
+
+    def run(self):
+        for acquisition in self.acquisitions.values():
+            acquisition.run()
+
+    def poll(self):
+        """
+        Supervisiona todos os processos; True quando há estatísticas novas
+        """
+        updated = False
+        for acquisition in self.acquisitions.values():
+            updated |= acquisition.poll()
+        return updated
+
+    def read_rgb(self, pool=None):
+        return self.current.read_rgb(pool)
+
+    def read_depth(self, pool=None):
+        return self.current.read_depth(pool)
+
+    def read_all_depth(self, pool=None):
+        """
+        Frame de profundidade mais recente de cada dispositivo que tenha um
+        novo: {device_id: (frame, meta, frames_pulados)}
+        """
+        frames = {}
+        for device_id, acquisition in self.acquisitions.items():
+            result = acquisition.read_depth(pool)
+            if result is not None:
+                frames[device_id] = result
+        return frames
+
+    def throughput(self):
+        """
+        Estado e estatísticas do último intervalo por dispositivo
+        """
+        return {
+            device_id: dict(acquisition.stats, state=acquisition.state,
+                            restarts=acquisition.restarts)
+            for device_id, acquisition in self.acquisitions.items()
+        }
+
+    def summary(self):
+        parts = []
+        for device_id, stats in self.throughput().items():
+            label = device_id or "câmera"
+            if 'fps' in stats:
+                quality = stats['quality']
+                min_depth, max_depth = quality['working_range']
+                parts.append(f"{label}: {stats['fps']:.1f} fps, "
+                             f"{stats['processing_ms']:.0f} ms, {stats['dropped']} desc., "
+                             f"{stats['allocated_bytes'] / 1024:.0f} KB alocados/frame, "
+                             f"{stats['skip_rate']:.0%} pulados, "
+                             f"faixa {min_depth}-{max_depth} mm, "
+                             f"validade {quality['mean_validity']:.0%}, "
+                             f"ruído {quality['temporal_noise']:.1f} mm, "
+                             f"pareamento {stats['pairing']['hit_rate']:.0%}")
+            else:
+                parts.append(f"{label}: {stats['state']}")
+        return " | ".join(parts)
+
+    def close(self):
+        for acquisition in self.acquisitions.values():
+            acquisition.close()
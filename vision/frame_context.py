@@ -0,0 +1,105 @@
+"""
+Contexto por frame de profundidade: produtos derivados calculados uma única vez
+"""
+from functools import cached_property
+
+import numpy as np
+
+from utils.buffers import pool_buffer
+
+
+class DepthFrameContext:
+    """
+    Envolve um frame de profundidade (uint16, mm) e memoriza os produtos
+    derivados usados pelos vários consumidores do pipeline: visão float,
+    máscara de validade, visão com NaN, pirâmide reduzida e perfis extraídos.
+
+    Os arrays memorizados são somente leitura; quem precisar alterar deve copiar.
+    Com um BufferPool, eles são escritos nos buffers do pool e valem só até
+    o próximo frame criado com o mesmo pool.
+    """
+
+    def __init__(self, depth_frame, pool=None):
+        self.raw = depth_frame
+        self.pool = pool
+        self._range_masks = {}
+        self._pyramid = [depth_frame]
+        self._profiles = {}
+
+    @property
+    def shape(self):
+        return self.raw.shape
+
+    def _buffer(self, name, dtype):
+        return pool_buffer(self.pool, name, self.shape, dtype)
+
+    @cached_property
+    def float_view(self):
+        view = self._buffer("ctx.float", np.float32)
+        np.copyto(view, self.raw, casting='unsafe')
+        return _read_only(view)
+
+    @cached_property
+    def valid_mask(self):
+        mask = np.not_equal(self.raw, 0, out=self._buffer("ctx.valid", bool))
+        return _read_only(mask)
+
+    @cached_property
+    def nan_view(self):
+        view = self._buffer("ctx.nan", np.float32)
+        np.copyto(view, self.raw, casting='unsafe')
+        invalid = np.equal(self.raw, 0, out=self._buffer("ctx.scratch", bool))
+        np.copyto(view, np.nan, where=invalid)
+        return _read_only(view)
+
+    def range_mask(self, min_depth, max_depth):
+        """
+        Pixels válidos dentro de [min_depth, max_depth]
+        """
+        key = (min_depth, max_depth)
+        mask = self._range_masks.get(key)
+        if mask is None:
+            # buffer pela ordem de uso no frame, não pela faixa: a faixa
+            # automática muda quase todo frame e não pode criar buffers novos
+            name = f"ctx.range{len(self._range_masks)}"
+            mask = np.greater_equal(self.raw, min_depth, out=self._buffer(name, bool))
+            mask &= np.less_equal(self.raw, max_depth, out=self._buffer("ctx.scratch", bool))
+            if min_depth <= 0:
+                mask &= self.valid_mask
+            mask = _read_only(mask)
+            self._range_masks[key] = mask
+        return mask
+
+    def downsampled(self, level):
+        """
+        Nível da pirâmide reduzida por 2**level (amostragem por vizinho mais
+        próximo, para não misturar pixels inválidos com válidos)
+        """
+        while len(self._pyramid) <= level:
+            self._pyramid.append(self._pyramid[-1][::2, ::2])
+        return self._pyramid[level]
+
+    def profile(self, key, compute):
+        """
+        Memoriza um perfil extraído; compute() só é chamado na primeira vez
+        """
+        profile = self._profiles.get(key)
+        if profile is None:
+            profile = compute()
+            self._profiles[key] = profile
+        return profile
+
+
+def _read_only(array):
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+def as_frame_context(depth_frame):
+    """
+    Aceita um array cru ou um DepthFrameContext e retorna sempre o contexto
+    """
+    if isinstance(depth_frame, DepthFrameContext):
+        return depth_frame
+    return DepthFrameContext(depth_frame)
@@ -0,0 +1,235 @@
+"""
+Pareamento de RGB e profundidade pelo relógio do dispositivo e medição da
+latência da captura até a exibição
+"""
+import time
+from collections import deque
+
+import numpy as np
+
+# limites das faixas dos histogramas de latência (ms)
+LATENCY_EDGES_MS = (0, 2, 5, 10, 15, 20, 30, 40, 50, 75, 100, 150, 200, 300, 500, 1000, np.inf)
+
+
+def capture_wall_time(device_ts, host_ts):
+    """
+    Instante da captura no relógio de parede (s), para comparar com outra
+    máquina. Usa o timestamp do dispositivo quando existe, senão o da
+    publicação no ring; ambos são do relógio monotônico do host.
+    """
+    captured_ns = device_ts if device_ts > 0 else host_ts
+    return time.time() - (time.monotonic_ns() - captured_ns) / 1e9
+
+
+class LatencyHistogram:
+    """
+    Histograma de faixas fixas: adicionar custa O(1) por amostra e os
+    percentis saem das contagens acumuladas, sem guardar as amostras
+    """
+
+    def __init__(self, edges=LATENCY_EDGES_MS):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.counts = np.zeros(len(self.edges) - 1, dtype=np.int64)
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def add(self, values_ms):
+        values = np.atleast_1d(np.asarray(values_ms, dtype=np.float64))
+        if values.size == 0:
+            return
+        bins = np.clip(np.searchsorted(self.edges, values, side='right') - 1, 0, len(self.counts) - 1)
+        self.counts += np.bincount(bins, minlength=len(self.counts))
+        self.total += float(values.sum())
+        self.maximum = max(self.maximum, float(values.max()))
+
+    @property
+    def count(self):
+        return int(self.counts.sum())
+
+    def percentile(self, q):
+        """
+        Limite superior da faixa que contém o percentil q (0-100)
+        """
+        count = self.count
+        if count == 0:
+            return 0.0
+        index = int(np.searchsorted(np.cumsum(self.counts), q / 100 * count))
+        return float(min(self.edges[index + 1], self.maximum))
+
+    def reset(self):
+        self.counts[:] = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def stats(self):
+        count = self.count
+        return {
+            'count': count,
+            'mean_ms': self.total / count if count else 0.0,
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'max_ms': self.maximum,
+            'histogram': [(float(edge), int(n)) for edge, n in zip(self.edges[:-1], self.counts)],
+        }
+
+
+class FramePairer:
+    """
+    Guarda as últimas capacity mensagens de cada stream ('rgb' e 'depth') e
+    entrega o par mais recente cujo timestamp do dispositivo difere de no
+    máximo tolerance_ms (ou, com key='sequence', com o mesmo número de
+    sequência, quando os sensores são sincronizados).
+
+    Como cada stream chega em ordem, uma mensagem expira quando o outro
+    stream já entregou algo mais novo que ela + tolerância: ela é liberada
+    sozinha (sem par) para a profundidade nunca travar esperando um RGB.
+    Mensagens mais antigas que o par entregue são descartadas.
+    """
+
+    STREAMS = ('rgb', 'depth')
+
+    def __init__(self, tolerance_ms=15.0, capacity=4, key='timestamp'):
+        if key not in ('timestamp', 'sequence'):
+            raise ValueError(f"Chave de pareamento desconhecida: {key}")
+        self.tolerance_ns = int(tolerance_ms * 1e6)
+        self.capacity = capacity
+        self.key = key
+        self._buffers = {stream: deque() for stream in self.STREAMS}
+        self.skew = LatencyHistogram()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.pairs = 0
+        self.unpaired = {stream: 0 for stream in self.STREAMS}
+        self.discarded = {stream: 0 for stream in self.STREAMS}
+        self.skew.reset()
+
+    def push(self, stream, seq, device_ts, item):
+        buffer = self._buffers[stream]
+        if len(buffer) >= self.capacity:
+            buffer.popleft()
+            self.discarded[stream] += 1
+        buffer.append((seq, device_ts, item))
+
+    def _distance(self, a, b):
+        if self.key == 'sequence':
+            return abs(a[0] - b[0]) * (self.tolerance_ns + 1)
+        return abs(a[1] - b[1])
+
+    def _newer(self, a, b):
+        """
+        a é posterior a b além da tolerância (b não pode mais parear com nada depois de a)
+        """
+        if self.key == 'sequence':
+            return a[0] > b[0]
+        return a[1] > b[1] + self.tolerance_ns
+
+    def _take(self, stream, index):
+        buffer = self._buffers[stream]
+        for _ in range(index):
+            buffer.popleft()
+            self.discarded[stream] += 1
+        return buffer.popleft()
+
+    def pop(self):
+        """
+        Retorna (rgb, depth, pareado) ou None quando nada pode ser liberado
+        ainda. Sem par, o stream que faltou vem como None.
+        """
+        rgb_buffer, depth_buffer = self._buffers['rgb'], self._buffers['depth']
+
+        # par mais recente: profundidade mais nova com um RGB dentro da tolerância
+        for depth_index in range(len(depth_buffer) - 1, -1, -1):
+            depth = depth_buffer[depth_index]
+            best_index, best_distance = None, None
+            for rgb_index, rgb in enumerate(rgb_buffer):
+                distance = self._distance(rgb, depth)
+                if distance <= self.tolerance_ns and (best_distance is None or distance < best_distance):
+                    best_index, best_distance = rgb_index, distance
+            if best_index is not None:
+                rgb = self._take('rgb', best_index)
+                depth = self._take('depth', depth_index)
+                self.pairs += 1
+                self.skew.add(abs(rgb[1] - depth[1]) / 1e6)
+                return rgb[2], depth[2], True
+
+        # sem par: libera o mais novo de cada stream que já expirou
+        released = {}
+        for stream, other in (('rgb', 'depth'), ('depth', 'rgb')):
+            buffer, other_buffer = self._buffers[stream], self._buffers[other]
+            expired = None
+            for index, message in enumerate(buffer):
+                if other_buffer and self._newer(other_buffer[-1], message):
+                    expired = index
+            if expired is None and len(buffer) >= self.capacity:
+                # o outro stream parou de chegar: não segura o buffer cheio
+                expired = len(buffer) - 1
+            if expired is not None:
+                released[stream] = self._take(stream, expired)[2]
+                self.unpaired[stream] += 1
+        if not released:
+            return None
+        return released.get('rgb'), released.get('depth'), False
+
+    @property
+    def hit_rate(self):
+        total = self.pairs + self.unpaired['depth']
+        return self.pairs / total if total else 0.0
+
+    def stats(self):
+        return {
+            'pairs': self.pairs,
+            'hit_rate': self.hit_rate,
+            'unpaired': dict(self.unpaired),
+            'discarded': dict(self.discarded),
+            'skew': self.skew.stats(),
+        }
+
+
+class DisplayLatency:
+    """
+    Latência por frame exibido, em três trechos do mesmo relógio
+    monotônico (os timestamps DepthAI são sincronizados com o host):
+    captura -> publicação no ring (USB, filas, pareamento e filtragem),
+    publicação -> exibição (espera pela interface e renderização) e total.
+    Também conta quantos frames foram exibidos com o RGB do próprio par.
+    """
+
+    SEGMENTS = ('acquisition', 'display', 'total')
+
+    def __init__(self):
+        self.histograms = {segment: LatencyHistogram() for segment in self.SEGMENTS}
+        self.frames = 0
+        self.matched = 0
+
+    def record(self, device_ts, host_ts, displayed_ns=None, rgb_matched=None):
+        displayed_ns = time.monotonic_ns() if displayed_ns is None else displayed_ns
+        if device_ts > 0:
+            self.histograms['acquisition'].add((host_ts - device_ts) / 1e6)
+            self.histograms['total'].add((displayed_ns - device_ts) / 1e6)
+        self.histograms['display'].add((displayed_ns - host_ts) / 1e6)
+        if rgb_matched is not None:
+            self.frames += 1
+            self.matched += bool(rgb_matched)
+
+    @property
+    def match_rate(self):
+        return self.matched / self.frames if self.frames else 0.0
+
+    def reset(self):
+        for histogram in self.histograms.values():
+            histogram.reset()
+        self.frames = self.matched = 0
+
+    def stats(self):
+        stats = {segment: histogram.stats() for segment, histogram in self.histograms.items()}
+        stats['rgb_match_rate'] = self.match_rate
+        return stats
+
+    def summary(self):
+        parts = []
+        for segment, label in (('acquisition', 'aquisição'), ('display', 'exibição'), ('total', 'total')):
+            histogram = self.histograms[segment]
+            parts.append(f"{label} p50 {histogram.percentile(50):.0f}/p95 {histogram.percentile(95):.0f} ms")
+        parts.append(f"RGB pareado {self.match_rate:.0%}")
+        return ", ".join(parts)
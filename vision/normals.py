@@ -1,3 +1,131 @@
 """ 
 Cálculo das normais
-"""
\ No newline at end of file
+"""
+import numpy as np
+from scipy.ndimage import gaussian_filter1d
+from vision.depth_stream import extract_stable_profile_line
+from vision.quality import DEPTH_MIN, DEPTH_MAX
+from vision.frame_context import as_frame_context
+
+
+def compute_profile_normals(depth_frame, line_y=240, window_size=7, min_depth=DEPTH_MIN, max_depth=DEPTH_MAX):
+    """
+    Extrai o perfil de uma linha, interpola falhas e calcula gradiente e normais 2D.
+    Não depende de interface gráfica: usado pelo plot de perfil e pelo modo batch.
+    Retorna None quando não há pontos suficientes.
+    """
+    z_raw = extract_stable_profile_line(depth_frame, line_y=line_y, window_size=window_size)
+
+    z_raw[z_raw == 0] = np.nan # Converter zeros para nan
+
+    # Filtrando apenas objetos próximos com tolerância maior
+    z_raw[(z_raw < min_depth) | (z_raw > max_depth)] = np.nan
+
+    # Verificando se há pontos suficientes
+    valid_count = np.count_nonzero(~np.isnan(z_raw))
+    if valid_count < 15:
+        print(f"[AVISO] Apenas {valid_count} pontos válidos. Pulando frame.")
+        return None
+
+    z = np.copy(z_raw)
+
+    # Interpolando melhor pontos faltantes
+    valid_mask = ~np.isnan(z)
+    if np.sum(valid_mask) > 10:
+        x_coords = np.arange(len(z))
+        valid_coords = x_coords[valid_mask]
+        valid_values = z[valid_mask]
+
+        try:
+            # Interp. linear
+            z = np.interp(x_coords, valid_coords, valid_values)
+
+            # filtro gaussiano para suavizar - revisar depois
+            z = gaussian_filter1d(z, sigma=2.0)
+
+        except Exception as e:
+            print(f"[ERRO] Falha na interpolação: {e}")
+            return None
+    else:
+        print("[AVISO] Poucos pontos válidos para interpolação.")
+        return None
+
+    # Detectar região de interesse (objetos próximos)
+    close_mask = (z > min_depth) & (z < max_depth)
+    close_points = np.sum(close_mask)
+
+    if close_points < 10:
+        print(f"[AVISO] Apenas {close_points} pontos próximos detectados.")
+        return None
+
+    """Calcular normais de forma mais estável
+    Usar janela maior para gradiente mais suave"""
+    dx = 2  # Espaçamento para os gradientes
+    dz = np.gradient(z, dx)
+
+    # Limitando gradientes extremos
+    dz = np.clip(dz, -40, 40)
+    # Suavizanso gradiente
+    dz = gaussian_filter1d(dz, sigma=1.0)
+    # Calculando normais 2D
+    normals = np.stack([-dz, np.ones_like(dz)], axis=1)
+    # Normalizando os vetores
+    norms = np.linalg.norm(normals, axis=1, keepdims=True)
+    norms[norms == 0] = 1  # Evitar divisão por zero
+    normals = normals / norms
+
+    return {
+        'profile': z,
+        'gradient': dz,
+        'normals': normals,
+        'close_mask': close_mask,
+        'valid_count': valid_count,
+        'close_points': close_points,
+    }
+
+
+def extract_surface_profiles(depth_frame, row_step=4, min_depth=DEPTH_MIN, max_depth=DEPTH_MAX, sigma=2.0,
+                             min_valid=15):
+    """
+    Versão de superfície inteira do perfil: extrai, interpola e suaviza todas
+    as linhas (ou uma a cada row_step) de uma vez, sem laço por linha.
+    Linhas com menos de min_valid pontos válidos saem como NaN.
+    """
+    ctx = as_frame_context(depth_frame)
+    rows = np.arange(0, ctx.shape[0], row_step)
+    z = np.where(ctx.range_mask(min_depth, max_depth)[rows], ctx.float_view[rows], np.nan)
+
+    valid = ~np.isnan(z)
+    width = z.shape[1]
+    x = np.arange(width)
+
+    # índice do último válido à esquerda e do próximo válido à direita de cada pixel
+    prev_idx = np.maximum.accumulate(np.where(valid, x, -1), axis=1)
+    next_idx = np.minimum.accumulate(np.where(valid, x, width)[:, ::-1], axis=1)[:, ::-1]
+    has_prev = prev_idx >= 0
+    has_next = next_idx < width
+
+    z_prev = np.take_along_axis(z, np.clip(prev_idx, 0, width - 1), axis=1)
+    z_next = np.take_along_axis(z, np.clip(next_idx, 0, width - 1), axis=1)
+
+    # interpolação linear entre vizinhos válidos; extremos repetem o valor da borda
+    span = np.maximum(next_idx - prev_idx, 1)
+    t = (x - prev_idx) / span
+    profiles = np.where(has_prev & has_next, z_prev + (z_next - z_prev) * t,
+                        np.where(has_prev, z_prev, z_next))
+
+    valid_rows = valid.sum(axis=1) >= min_valid
+    profiles[~valid_rows] = np.nan
+    profiles[valid_rows] = gaussian_filter1d(profiles[valid_rows], sigma=sigma, axis=1)
+
+    # mesmo tratamento de gradiente do perfil de linha única
+    gradients = np.gradient(profiles, 2, axis=1)
+    gradients = np.clip(gradients, -40, 40)
+    gradients[valid_rows] = gaussian_filter1d(gradients[valid_rows], sigma=1.0, axis=1)
+
+    return {
+        'rows': rows,
+        'profiles': profiles.astype(np.float32),
+        'gradients': gradients.astype(np.float32),
+        'valid_rows': valid_rows,
+    }
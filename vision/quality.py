@@ -0,0 +1,157 @@
+"""
+Qualidade da profundidade no frame inteiro e faixa de trabalho automática
+"""
+from collections import deque
+
+import numpy as np
+
+from vision.frame_context import as_frame_context
+from utils.buffers import pool_buffer
+
+DEPTH_MIN = 100   # mm, limite inferior do threshold do dispositivo
+DEPTH_MAX = 430   # mm, limite superior do threshold do dispositivo
+
+
+def depth_histogram(depth_frame, max_depth=None):
+    """
+    Histograma de profundidade com bins de 1 mm em um único bincount.
+    O bin 0 conta os pixels inválidos; com max_depth, valores acima caem
+    no último bin.
+    """
+    ctx = as_frame_context(depth_frame)
+    values = ctx.raw
+    if max_depth is not None:
+        values = np.minimum(values, max_depth,
+                            out=pool_buffer(ctx.pool, "quality.clipped", ctx.shape, values.dtype))
+        return np.bincount(values.ravel(), minlength=max_depth + 1)
+    return np.bincount(values.ravel())
+
+
+def histogram_stats(histogram, min_depth=DEPTH_MIN, max_depth=DEPTH_MAX):
+    """
+    Contagens, média e desvio padrão exatos a partir do histograma de 1 mm
+    """
+    total = int(histogram.sum())
+    counts = histogram[1:]
+    depths = np.arange(1, len(histogram), dtype=np.float64)
+
+    valid_points = int(counts.sum())
+    close_points = int(histogram[min_depth:max_depth + 1].sum())
+    if valid_points > 0:
+        mean = float(np.dot(counts, depths) / valid_points)
+        variance = float(np.dot(counts, (depths - mean) ** 2) / valid_points)
+    else:
+        mean = variance = float('nan')
+
+    return {
+        'total_pixels': total,
+        'valid_points': valid_points,
+        'close_points': close_points,
+        'validity_ratio': valid_points / total if total else 0.0,
+        'close_ratio': close_points / total if total else 0.0,
+        'mean_depth': mean,
+        'depth_std': float(np.sqrt(variance)),
+    }
+
+
+class DepthQualityMonitor:
+    """
+    Estatísticas de qualidade incrementais sobre os últimos window frames:
+    histograma do frame inteiro (um bincount por frame) somado em janela
+    deslizante, validade média e ruído temporal (diferença média entre
+    frames consecutivos, na pirâmide reduzida).
+
+    Do histograma acumulado sai a faixa de trabalho automática: os quantis
+    coverage dos pixels dentro de limits, com margem e largura mínima.
+    Ela alimenta threshold, colormap e perfis, para que os pixels fora de
+    faixa sejam descartados uma vez, logo no início do pipeline.
+    """
+
+    def __init__(self, window=30, limits=(DEPTH_MIN, DEPTH_MAX), coverage=(0.02, 0.98),
+                 margin=15, min_span=40, min_pixels=500, noise_level=2):
+        self.window = window
+        self.limits = limits
+        self.coverage = coverage
+        self.margin = margin
+        self.min_span = min_span
+        self.min_pixels = min_pixels
+        self.noise_level = noise_level
+
+        n_bins = limits[1] + 1
+        self._histograms = np.zeros((window, n_bins), dtype=np.int32)
+        self._histogram_sum = np.zeros(n_bins, dtype=np.int64)
+        self._index = 0
+        self._validity = deque(maxlen=window)
+        self._noise = deque(maxlen=window)
+        self._previous = None
+        self.frames = 0
+        self.working_range = limits
+        self.last_stats = None
+
+    def update(self, depth_frame):
+        """
+        Adiciona um frame e retorna a faixa de trabalho (min_depth, max_depth)
+        """
+        ctx = as_frame_context(depth_frame)
+        lo, hi = self.limits
+
+        # pixels além do limite caem no último bin (entram na média como hi + 1)
+        histogram = depth_histogram(ctx, max_depth=hi + 1)
+        self.last_stats = histogram_stats(histogram, lo, hi)
+        self._validity.append(self.last_stats['validity_ratio'])
+
+        # janela deslizante: sai o histograma mais antigo, entra o novo
+        in_limits = histogram[:hi + 1]
+        self._histogram_sum -= self._histograms[self._index]
+        self._histograms[self._index] = in_limits
+        self._histogram_sum += in_limits
+        self._index = (self._index + 1) % self.window
+
+        self._update_noise(ctx)
+        self.frames += 1
+        self.working_range = self._derive_range()
+        return self.working_range
+
+    def _update_noise(self, ctx):
+        current = ctx.downsampled(self.noise_level)
+        lo, hi = self.limits
+        if self._previous is not None and self._previous.shape == current.shape:
+            both = (current >= lo) & (current <= hi) & (self._previous >= lo) & (self._previous <= hi)
+            if np.any(both):
+                diff = np.abs(current[both].astype(np.int32) - self._previous[both])
+                self._noise.append(float(diff.mean()))
+        self._previous = np.array(current)
+
+    def _derive_range(self):
+        lo, hi = self.limits
+        counts = self._histogram_sum[lo:hi + 1]
+        total = int(counts.sum())
+        if total == 0:
+            # janela sem nenhum pixel dentro dos limites: volta à faixa inteira
+            return lo, hi
+        if total < self.min_pixels * min(self.frames, self.window):
+            return self.working_range
+
+        cumulative = np.cumsum(counts)
+        low = lo + int(np.searchsorted(cumulative, self.coverage[0] * total))
+        high = lo + int(np.searchsorted(cumulative, self.coverage[1] * total))
+        low = max(lo, low - self.margin)
+        high = min(hi, high + self.margin)
+
+        # largura mínima em torno do centro, sem sair dos limites
+        if high - low < self.min_span:
+            center = (low + high) // 2
+            low = max(lo, center - self.min_span // 2)
+            high = min(hi, low + self.min_span)
+            low = max(lo, high - self.min_span)
+        return int(low), int(high)
+
+    def stats(self):
+        stats = dict(self.last_stats or {})
+        stats.update({
+            'frames': self.frames,
+            'working_range': self.working_range,
+            'mean_validity': float(np.mean(self._validity)) if self._validity else 0.0,
+            'temporal_noise': float(np.mean(self._noise)) if self._noise else float('nan'),
+        })
+        return stats
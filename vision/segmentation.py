@@ -0,0 +1,152 @@
+"""
+Segmentação de objetos por descontinuidade de profundidade e ROIs para os
+estágios seguintes do pipeline
+"""
+import numpy as np
+import cv2
+
+from vision.frame_context import as_frame_context
+from vision.quality import DEPTH_MIN, DEPTH_MAX
+
+
+def depth_discontinuities(depth_frame, abs_threshold=15, rel_threshold=0.03):
+    """
+    Marca pixels em bordas de profundidade, direto no frame uint16 (mm).
+    Um salto entre vizinhos é borda quando passa de
+    max(abs_threshold, rel_threshold * profundidade); a transição entre
+    pixel válido e inválido também conta como borda.
+    """
+    ctx = as_frame_context(depth_frame)
+    depth = ctx.raw.astype(np.int32)  # int32: diferenças sem estouro do uint16
+    valid = ctx.valid_mask
+
+    edges = np.zeros(depth.shape, dtype=bool)
+    for axis in (0, 1):
+        a = depth[:-1, :] if axis == 0 else depth[:, :-1]
+        b = depth[1:, :] if axis == 0 else depth[:, 1:]
+        va = valid[:-1, :] if axis == 0 else valid[:, :-1]
+        vb = valid[1:, :] if axis == 0 else valid[:, 1:]
+
+        threshold = np.maximum(abs_threshold, rel_threshold * np.minimum(a, b))
+        jump = (va & vb & (np.abs(a - b) > threshold)) | (va != vb)
+
+        if axis == 0:
+            edges[:-1, :] |= jump
+            edges[1:, :] |= jump
+        else:
+            edges[:, :-1] |= jump
+            edges[:, 1:] |= jump
+    return edges & valid
+
+
+def segment_objects(depth_frame, min_depth=DEPTH_MIN, max_depth=DEPTH_MAX, min_area=400,
+                    abs_threshold=15, rel_threshold=0.03):
+    """
+    Rotula regiões conexas dentro da faixa próxima, separadas pelas bordas
+    de profundidade. Retorna uma lista de regiões (dicts) ordenada por área.
+    """
+    ctx = as_frame_context(depth_frame)
+    edges = depth_discontinuities(ctx, abs_threshold, rel_threshold)
+    mask = (ctx.range_mask(min_depth, max_depth) & ~edges).astype(np.uint8)
+
+    n_labels, labels, stats, centroids = cv2.connectedComponentsWithStats(mask, connectivity=4)
+    if n_labels <= 1:
+        return []
+
+    # profundidade média por componente com um único bincount
+    depth_sums = np.bincount(labels.ravel(), weights=ctx.raw.ravel(), minlength=n_labels)
+
+    regions = []
+    for label in range(1, n_labels):
+        x, y, w, h, area = stats[label]
+        if area < min_area:
+            continue
+        regions.append({
+            'label': label,
+            'bbox': (int(x), int(y), int(w), int(h)),
+            'area': int(area),
+            'centroid': (float(centroids[label][0]), float(centroids[label][1])),
+            'mean_depth': float(depth_sums[label] / area),
+        })
+    regions.sort(key=lambda region: region['area'], reverse=True)
+    return regions
+
+
+def region_slices(bbox, shape, margin=0):
+    """
+    Converte (x, y, w, h) em slices (linhas, colunas) com margem, limitados ao frame
+    """
+    x, y, w, h = bbox
+    height, width = shape
+    return (slice(max(0, y - margin), min(height, y + h + margin)),
+            slice(max(0, x - margin), min(width, x + w + margin)))
+
+
+def union_roi(regions, shape, margin=8):
+    """
+    Menor ROI que contém todas as regiões, ou None se não houver nenhuma
+    """
+    if not regions:
+        return None
+    x0 = min(r['bbox'][0] for r in regions)
+    y0 = min(r['bbox'][1] for r in regions)
+    x1 = max(r['bbox'][0] + r['bbox'][2] for r in regions)
+    y1 = max(r['bbox'][1] + r['bbox'][3] for r in regions)
+    return region_slices((x0, y0, x1 - x0, y1 - y0), shape, margin)
+
+
+def _bbox_iou(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    iw = min(ax + aw, bx + bw) - max(ax, bx)
+    ih = min(ay + ah, by + bh) - max(ay, by)
+    if iw <= 0 or ih <= 0:
+        return 0.0
+    inter = iw * ih
+    return inter / float(aw * ah + bw * bh - inter)
+
+
+class ObjectTracker:
+    """
+    Associa regiões entre frames por sobreposição de bounding box (IoU guloso)
+    e mantém um id estável por objeto
+    """
+
+    def __init__(self, min_iou=0.3, max_missed=5):
+        self.min_iou = min_iou
+        self.max_missed = max_missed
+        self.tracks = {}
+        self._next_id = 1
+
+    def update(self, regions):
+        unmatched = set(self.tracks)
+        for region in regions:
+            best_id, best_iou = None, self.min_iou
+            for track_id in unmatched:
+                iou = _bbox_iou(self.tracks[track_id]['bbox'], region['bbox'])
+                if iou >= best_iou:
+                    best_id, best_iou = track_id, iou
+            if best_id is None:
+                best_id = self._next_id
+                self._next_id += 1
+                age = 0
+            else:
+                unmatched.discard(best_id)
+                age = self.tracks[best_id]['age'] + 1
+            region['track_id'] = best_id
+            self.tracks[best_id] = dict(region, age=age, missed=0)
+
+        for track_id in unmatched:
+            self.tracks[track_id]['missed'] += 1
+            if self.tracks[track_id]['missed'] > self.max_missed:
+                del self.tracks[track_id]
+        return regions
+
+    def primary(self):
+        """
+        Objeto rastreado visível há mais tempo (o alvo da inspeção)
+        """
+        visible = [t for t in self.tracks.values() if t['missed'] == 0]
+        if not visible:
+            return None
+        return max(visible, key=lambda t: (t['age'], t['area']))
@@ -0,0 +1,154 @@
+"""
+Ring de frames em memória compartilhada entre o processo de aquisição e a interface
+"""
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# campos int64 por slot no cabeçalho
+SLOT_SEQ = 0
+SLOT_SHAPE = slice(1, 4)       # (altura, largura, canais; 0 para 2D)
+SLOT_DEVICE_TS = 4             # timestamp do dispositivo (ns)
+SLOT_HOST_TS = 5               # timestamp de escrita no host (ns, time.monotonic_ns)
+SLOT_META = slice(6, 16)       # metadados livres do estágio que escreveu
+SLOT_FIELDS = 16
+META_FIELDS = SLOT_META.stop - SLOT_META.start
+
+_HEADER_ALIGN = 64
+_WRITING = -1
+
+
+class SharedFrameRing:
+    """
+    Ring de N slots (triplo buffer por padrão) em multiprocessing.shared_memory,
+    com um único escritor e leitores que só mapeiam a memória.
+
+    Cada slot tem um número de sequência que funciona como seqlock: o escritor
+    marca o slot como "escrevendo", copia o frame e publica a nova sequência;
+    o leitor confere a sequência antes e depois da cópia e descarta leituras
+    que foram sobrescritas no meio.
+
+    O frame pode ter qualquer forma que caiba em capacity elementos.
+    """
+
+    def __init__(self, name, capacity, dtype, slots=3, create=False):
+        self.dtype = np.dtype(dtype)
+        self.capacity = int(capacity)
+        self.slots = slots
+
+        header_bytes = (1 + slots * SLOT_FIELDS) * 8
+        self._data_offset = -(-header_bytes // _HEADER_ALIGN) * _HEADER_ALIGN
+        self._slot_bytes = self.capacity * self.dtype.itemsize
+        size = self._data_offset + slots * self._slot_bytes
+
+        self._owner = create
+        self._scratch = None
+        self._shm = shared_memory.SharedMemory(name=name, create=create, size=size if create else 0)
+        self.name = self._shm.name
+
+        self._latest = np.ndarray((1,), dtype=np.int64, buffer=self._shm.buf, offset=0)
+        self._header = np.ndarray((slots, SLOT_FIELDS), dtype=np.int64,
+                                  buffer=self._shm.buf, offset=8)
+        self._data = np.ndarray((slots, self.capacity), dtype=self.dtype,
+                                buffer=self._shm.buf, offset=self._data_offset)
+        if create:
+            self._latest[0] = -1
+            self._header[:] = 0
+            self._header[:, SLOT_SEQ] = -1
+
+    @classmethod
+    def create(cls, capacity, dtype, slots=3):
+        return cls(None, capacity, dtype, slots, create=True)
+
+    @classmethod
+    def attach(cls, name, capacity, dtype, slots=3):
+        return cls(name, capacity, dtype, slots, create=False)
+
+    def spec(self):
+        """
+        Parâmetros para outro processo mapear o mesmo ring
+        """
+        return {'name': self.name, 'capacity': self.capacity,
+                'dtype': self.dtype.str, 'slots': self.slots}
+
+    @property
+    def latest_seq(self):
+        return int(self._latest[0])
+
+    def write(self, frame, device_ts=0, meta=None):
+        """
+        Publica um frame e retorna o número de sequência atribuído (escritor único)
+        """
+        frame = np.asarray(frame)
+        if frame.size > self.capacity:
+            raise ValueError(f"Frame {frame.shape} excede a capacidade do ring ({self.capacity})")
+
+        seq = self.latest_seq + 1
+        slot = seq % self.slots
+        header = self._header[slot]
+
+        header[SLOT_SEQ] = _WRITING
+        shape = frame.shape + (0,) * (3 - frame.ndim)
+        header[SLOT_SHAPE] = shape
+        header[SLOT_DEVICE_TS] = device_ts
+        header[SLOT_HOST_TS] = time.monotonic_ns()
+        header[SLOT_META] = -1
+        if meta is not None:
+            header[SLOT_META][:len(meta)] = meta
+        np.copyto(self._data[slot, :frame.size].reshape(frame.shape), frame, casting='unsafe')
+
+        header[SLOT_SEQ] = seq
+        self._latest[0] = seq
+        return seq
+
+    def read_latest(self, after_seq=-1, retries=3, out=None):
+        """
+        Copia o frame mais recente se for mais novo que after_seq.
+        out: buffer plano com pelo menos capacity elementos para receber a
+        cópia (o frame retornado é uma view dele). out só é escrito depois
+        que a leitura foi validada: numa leitura descartada ou sem frame novo,
+        ele continua com o frame retornado antes.
+        Retorna (seq, frame, device_ts, host_ts, meta) ou None.
+        """
+        for _ in range(retries):
+            seq = self.latest_seq
+            if seq <= after_seq:
+                return None
+            slot = seq % self.slots
+            header = self._header[slot]
+            if header[SLOT_SEQ] != seq:
+                continue
+
+            shape = tuple(int(n) for n in header[SLOT_SHAPE] if n > 0)
+            device_ts = int(header[SLOT_DEVICE_TS])
+            host_ts = int(header[SLOT_HOST_TS])
+            meta = header[SLOT_META].copy()
+            size = int(np.prod(shape))
+            if out is None:
+                frame = self._data[slot, :size].reshape(shape).copy()
+            else:
+                # cópia num buffer próprio: out só recebe a leitura validada
+                if self._scratch is None:
+                    self._scratch = np.empty(self.capacity, dtype=self.dtype)
+                frame = self._scratch[:size].reshape(shape)
+                np.copyto(frame, self._data[slot, :size].reshape(shape))
+
+            # o escritor pode ter reaproveitado o slot durante a cópia
+            if header[SLOT_SEQ] == seq:
+                if out is not None:
+                    validated = out[:size].reshape(shape)
+                    np.copyto(validated, frame)
+                    frame = validated
+                return seq, frame, device_ts, host_ts, meta
+        return None
+
+    def close(self):
+        # as views precisam ser liberadas antes de fechar o mapeamento
+        self._latest = self._header = self._data = None
+        self._shm.close()
+        if self._owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
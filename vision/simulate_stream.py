@@ -1,41 +1,73 @@
-import cv2
 import numpy as np
-from PIL import Image, ImageTk
-from gui.plot_utils import render_profile_plot
-from customtkinter import CTkImage
+
+
+def simulated_rgb_frame(width=640, height=480):
+    rgb_frame = np.zeros((height, width, 3), dtype=np.uint8)
+    for i in range(3):
+        rgb_frame[..., i] = np.linspace(0, 255, width, dtype=np.uint8)
+    return rgb_frame
+
+
+def simulated_depth_frame(frame_index=0, width=640, height=480, base=3000, amplitude=1000):
+    """
+    Superfície senoidal sintética; frame_index desloca a fase para gerar
+    sequências (usado também pelo modo batch, sem interface gráfica)
+    """
+    x = np.linspace(0, 2 * np.pi, width)
+    z = base + amplitude * np.sin(3 * x + 0.1 * frame_index)
+    return np.tile(z, (height, 1)).astype(np.uint16)
 
 
 def start_simulated_stream(gui):
+    from gui.scheduler import create_display_governor
+    from utils.buffers import BufferPool
+    from vision.quality import DepthQualityMonitor
+
     print("Modo simulado iniciado")
     gui.rgb_queue = None
     gui.depth_queue = None
+    gui.governor = create_display_governor()
+    gui.buffer_pool = BufferPool()
+    gui.quality_monitor = DepthQualityMonitor()
+    gui.simulated_frame_index = 0
     update_simulated_frames(gui)
 
 
 def update_simulated_frames(gui):
-    rgb_frame = np.zeros((480, 640, 3), dtype=np.uint8)
-    for i in range(3):
-        rgb_frame[..., i] = np.linspace(0, 255, 640, dtype=np.uint8)
+    # imports da interface só aqui, para o gerador funcionar sem Tk
+    from gui.plot_utils import render_profile_plot, render_surface_scan, render_depth_colormap
+    from utils.conversions import get_display_surface, RGB_VIEW_SIZE
+    from vision.frame_context import DepthFrameContext
 
-    img_rgb = Image.fromarray(rgb_frame)
-    #imgtk_rgb = ImageTk.PhotoImage(image=img_rgb.resize((440, 350)))
-    imgtk_rgb = CTkImage(light_image=img_rgb, size=(440, 350))
-    gui.rgb_canvas.configure(image=imgtk_rgb, text="")
-    gui.rgb_canvas.image = imgtk_rgb
+    governor = gui.governor
+    pool = gui.buffer_pool
+    governor.begin_frame()
+    pool.begin_frame()
 
-    x = np.linspace(0, 2 * np.pi, 640)
-    z = 3000 + 1000 * np.sin(3 * x)
-    depth_frame = np.tile(z, (480, 1)).astype(np.uint16)
+    rgb_frame = simulated_rgb_frame()
+    get_display_surface(gui.rgb_canvas, RGB_VIEW_SIZE).update(rgb_frame, order="rgb")
 
-    render_profile_plot(depth_frame, gui.normals_canvas, gui)
+    # cena dentro da faixa de objetos próximos, como a fonte simulada da aquisição
+    depth_frame = DepthFrameContext(
+        simulated_depth_frame(gui.simulated_frame_index, base=300, amplitude=80), pool=pool)
+    gui.simulated_frame_index += 1
+    gui.set_frame_height(depth_frame.shape[0])
+    gui.last_depth = (depth_frame.raw, None)
+    gui.min_depth, gui.max_depth = gui.quality_monitor.update(depth_frame)
 
-    depth_clip = np.clip(depth_frame, gui.min_depth, gui.max_depth)
-    depth_norm = ((depth_clip - gui.min_depth) / (gui.max_depth - gui.min_depth) * 255).astype(np.uint8)
-    depth_colormap = cv2.applyColorMap(depth_norm, cv2.COLORMAP_JET)
+    if governor.due("profile"):
+        with governor.measure("profile"):
+            if getattr(gui, 'surface_scan_mode', False):
+                render_surface_scan(depth_frame, gui.normals_canvas, gui,
+                                    cursor_row=gui.scan_cursor_row,
+                                    min_depth=gui.min_depth, max_depth=gui.max_depth)
+            else:
+                render_profile_plot(depth_frame, gui.normals_canvas, gui,
+                                    min_depth=gui.min_depth, max_depth=gui.max_depth)
 
-    img_depth = Image.fromarray(depth_colormap)
-    imgtk_depth = CTkImage(light_image=img_depth, size=(440, 350))
-    gui.depth_canvas.configure(image=imgtk_depth, text="")
-    gui.depth_canvas.image = imgtk_depth
+    with governor.measure("colormap"):
+        render_depth_colormap(depth_frame, gui.depth_canvas, gui, gui.min_depth, gui.max_depth)
 
-    gui.after(30, lambda: update_simulated_frames(gui))
+    pool.end_frame()
+    delay_ms = governor.end_frame()
+    gui.after(delay_ms, lambda: update_simulated_frames(gui))
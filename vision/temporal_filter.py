@@ -0,0 +1,127 @@
+"""
+Filtro temporal de profundidade no host (substitui o filtro temporal do
+dispositivo quando o pipeline simplificado é usado)
+"""
+import numpy as np
+
+TEMPORAL_MODES = ("median", "ema", "persistence")
+
+
+class TemporalDepthFilter:
+    """
+    Mantém os últimos K frames (uint16, mm) em um ring buffer (K, H, W)
+    pré-alocado e estabiliza cada pixel ao longo do tempo.
+
+    Modos:
+    - "median": mediana móvel dos valores válidos. Uma cópia ordenada do
+      ring é atualizada a cada frame (remove o valor que sai e insere o novo),
+      custo O(K) por pixel em vez de reordenar os K frames.
+    - "ema": média exponencial com reinício em saltos maiores que delta,
+      como o filtro temporal do DepthAI.
+    - "persistence": repete o último valor válido enquanto o pixel foi
+      válido em pelo menos min_valid dos últimos K frames.
+
+    Em todos os modos, pixels válidos em menos de min_valid frames saem como 0.
+    """
+
+    def __init__(self, shape, history=5, mode="median", alpha=0.4, delta=20, min_valid=None):
+        if mode not in TEMPORAL_MODES:
+            raise ValueError(f"Modo temporal desconhecido: {mode}")
+        height, width = shape
+        self.shape = (height, width)
+        self.history = history
+        self.mode = mode
+        self.alpha = alpha
+        self.delta = delta
+        if min_valid is None:
+            min_valid = history // 2 + 1 if mode == "persistence" else 1
+        self.min_valid = min_valid
+
+        self._ring = np.zeros((history, height, width), dtype=np.uint16)
+        self._sorted = np.zeros((history, height, width), dtype=np.uint16)
+        self._scratch = np.zeros((history, height, width), dtype=np.uint16)
+        self._valid_count = np.zeros((height, width), dtype=np.uint8)
+        self._ema = np.zeros((height, width), dtype=np.float32)
+        self._last_valid = np.zeros((height, width), dtype=np.uint16)
+        self._output = np.zeros((height, width), dtype=np.uint16)
+        self._levels = np.arange(history, dtype=np.intp)[:, None, None]
+        self._index = 0
+        self.frames_seen = 0
+
+    def reset(self):
+        for buffer in (self._ring, self._sorted, self._valid_count, self._ema, self._last_valid):
+            buffer.fill(0)
+        self._index = 0
+        self.frames_seen = 0
+
+    def update(self, depth_frame):
+        """
+        Adiciona um frame e retorna a profundidade estabilizada (uint16).
+        O array retornado é reaproveitado no próximo update.
+        """
+        new = np.asarray(depth_frame, dtype=np.uint16)
+        if new.shape != self.shape:
+            raise ValueError(f"Frame {new.shape} incompatível com o filtro {self.shape}")
+
+        old = self._ring[self._index]
+        new_valid = new > 0
+
+        # contagem de validade incremental: entra o novo, sai o mais antigo
+        self._valid_count += new_valid
+        self._valid_count -= old > 0
+
+        if self.mode == "median":
+            self._update_sorted(old, new)
+        elif self.mode == "ema":
+            self._update_ema(new, new_valid)
+        np.copyto(self._last_valid, new, where=new_valid)
+
+        self._ring[self._index] = new
+        self._index = (self._index + 1) % self.history
+        self.frames_seen += 1
+
+        return self._compose_output()
+
+    def _update_sorted(self, old, new):
+        k = self._levels
+        sorted_stack = self._sorted
+        removed = self._scratch[:-1]
+
+        # remove o valor que sai do ring (primeira ocorrência na pilha ordenada)
+        old_pos = np.sum(sorted_stack < old, axis=0)
+        removed[...] = sorted_stack[:-1]
+        np.copyto(removed, sorted_stack[1:], where=k[:-1] >= old_pos)
+
+        # insere o novo valor na posição que mantém a ordem
+        new_pos = np.sum(removed < new, axis=0)
+        sorted_stack[:-1] = removed
+        sorted_stack[-1] = new
+        np.copyto(sorted_stack[1:], removed, where=k[1:] > new_pos)
+        np.copyto(sorted_stack, new, where=k == new_pos)
+
+    def _update_ema(self, new, new_valid):
+        current = new.astype(np.float32)
+        had_value = self._ema > 0
+        close = had_value & new_valid & (np.abs(current - self._ema) <= self.delta)
+        self._ema[close] += self.alpha * (current[close] - self._ema[close])
+        # pixel sem histórico ou salto grande: recomeça a partir do valor novo
+        restart = new_valid & ~close
+        self._ema[restart] = current[restart]
+
+    def _compose_output(self):
+        persistent = self._valid_count >= self.min_valid
+        output = self._output
+
+        if self.mode == "median":
+            # zeros ficam no início da pilha ordenada; mediana dos n válidos
+            n_valid = self._valid_count.astype(np.intp)
+            median_idx = np.minimum((self.history - n_valid) + np.maximum(n_valid - 1, 0) // 2,
+                                    self.history - 1)
+            np.copyto(output, np.take_along_axis(self._sorted, median_idx[None], axis=0)[0])
+        elif self.mode == "ema":
+            np.copyto(output, self._ema, casting='unsafe')
+        else:
+            np.copyto(output, self._last_valid)
+
+        output[~persistent] = 0
+        return output